@@ -17,6 +17,14 @@ class Config:
     SELENIUM_GRID_IP: str = "127.0.0.1"
     SELENIUM_GRID_PORT: int = 4444
 
+    # Record/replay proxy between browser and site (override with: behave -D proxy_mode=replay)
+    PROXY_MODE: str = "off"  # Options: 'off', 'live', 'record', 'replay'
+    PROXY_STORE_DIR: str = "recordings"
+
+    # Data oracle for the data-driven admin steps (override with: behave -D oracle_db=other.db)
+    ORACLE_DB: str = "../lab-0/sample-site/data/Main.db"
+    ORACLE_SEED: str = "config/oracle_seed.json"  # used for tables ORACLE_DB lacks
+
     # Logging config
     NUMBER_OF_DAYS_TO_KEEP_LOG_FILES: int = 7
 
@@ -0,0 +1,124 @@
+import random
+import re
+from dataclasses import dataclass
+
+# issuer -> (prefixes, card number length)
+ISSUERS = {
+    'visa': (('4',), 16),
+    'mastercard': (('51', '52', '53', '54', '55', '2221', '2720'), 16),
+    'amex': (('34', '37'), 15),
+    'discover': (('6011', '65'), 16),
+    'diners': (('36',), 14),
+    'jcb': (('3528', '3589'), 16),
+}
+
+NOT_NUMERIC = ('Attention!', 'The input for card number cannot be empty and needs to be numeric!')
+INVALID = ('Attention!', 'The card number is invalid.')
+OTHER = ('Attention!', 'Something else is not right...')
+
+# the test cards the response page knows by number (views/response-cc.twig)
+KNOWN_CARDS = {
+    4242424242424242: ('Success.', 'Cool! You are using VISA.'),
+    5555555555554444: ('Success.', 'Cool! You are using MASTERCARD.'),
+    4000000000009995: ('Declined.', 'My dear.. You have insufficient funds.'),
+    4000000000009987: ('Declined.', 'Because... This card has been reported as lost.'),
+    4000000000009979: ('Declined.', 'Because... This card has been reported as stolen.'),
+}
+
+NON_NUMERIC_INPUTS = ('', '   ', '0', 'abcd', '4242 4242 4242 4242', '4242-4242-4242-4242', '42424242424242x2')
+
+_PHP_NUMERIC = re.compile(r'^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?\s*$')
+
+
+@dataclass(frozen=True)
+class CardCase:
+    number: str
+    issuer: str
+    kind: str  # 'valid', a mutation of a valid number, 'known' or 'non-numeric'
+    expected_response: str
+    expected_reason: str
+
+
+def luhn_check_digit(body):
+    """Return the digit that makes body + digit pass the Luhn check."""
+    total = 0
+    for i, c in enumerate(reversed(body)):
+        d = int(c)
+        if i % 2 == 0:
+            d = d * 2 - 9 if d > 4 else d * 2
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def luhn_valid(number):
+    return len(number) > 1 and luhn_check_digit(number[:-1]) == number[-1]
+
+
+def expected_response(card_number):
+    """Return (response, reason) the response page shows for a POSTed card number.
+
+    Mirrors responseccController: a trimmed non-numeric or empty ("0" counts as empty in PHP)
+    input is rejected, the known test cards get their own message, then the Luhn check decides.
+    """
+    number = card_number.strip()
+    if not number or number == '0' or not _PHP_NUMERIC.match(number):
+        return NOT_NUMERIC
+    if number.isdigit() and int(number) in KNOWN_CARDS:
+        return KNOWN_CARDS[int(number)]
+    return OTHER if luhn_valid(number) else INVALID
+
+
+def _mutations(number, rnd):
+    """Yield (kind, number) variants of a valid number that differ in one typing error."""
+    body, check = number[:-1], number[-1]
+    yield 'wrong-check-digit', body + str((int(check) + rnd.randint(1, 9)) % 10)
+    i = rnd.randrange(len(number))
+    yield 'substituted-digit', number[:i] + str((int(number[i]) + rnd.randint(1, 9)) % 10) + number[i + 1:]
+    # swapping two equal digits would not change the number
+    swappable = [i for i in range(len(number) - 1) if number[i] != number[i + 1]] or [0]
+    i = rnd.choice(swappable)
+    yield 'transposed-digits', number[:i] + number[i + 1] + number[i] + number[i + 2:]
+
+
+def generate_cards(per_issuer, seed=0):
+    """Return per_issuer valid numbers per issuer, as many one-error variants, the known cards and non-numeric inputs.
+
+    Expected outcomes come from expected_response(), so a mutation that happens to pass the
+    Luhn check (e.g. a transposition of 0 and 9) is expected to pass.
+    """
+    rnd = random.Random(seed)
+    cases = []
+    for issuer, (prefixes, length) in ISSUERS.items():
+        for n in range(per_issuer):
+            prefix = prefixes[n % len(prefixes)]
+            body = prefix + ''.join(rnd.choice('0123456789') for _ in range(length - len(prefix) - 1))
+            number = body + luhn_check_digit(body)
+            cases.append(CardCase(number, issuer, 'valid', *expected_response(number)))
+            kind, variant = list(_mutations(number, rnd))[n % 3]
+            cases.append(CardCase(variant, issuer, kind, *expected_response(variant)))
+    cases += [CardCase(str(number), 'test-card', 'known', *expected_response(str(number))) for number in KNOWN_CARDS]
+    cases += [CardCase(value, 'none', 'non-numeric', *expected_response(value)) for value in NON_NUMERIC_INPUTS]
+    return cases
+
+
+def sample_cases(cases, size, seed=0):
+    """Pick size cases, covering every expected reason first."""
+    rnd = random.Random(seed)
+    by_reason = {}
+    for case in cases:
+        by_reason.setdefault(case.expected_reason, []).append(case)
+    sample = [rnd.choice(group) for _, group in sorted(by_reason.items())][:size]
+    rest = [c for c in cases if c not in sample]
+    return sample + rnd.sample(rest, min(len(rest), max(0, size - len(sample))))
+
+
+def find_mismatches(cases, actual_results):
+    """Return (case, actual response, actual reason) where the page disagrees with the oracle.
+
+    Like the outline steps, the response has to start with and the reason contain the expectation.
+    """
+    return [
+        (case, response, reason)
+        for case, (response, reason) in zip(cases, actual_results)
+        if not (response or '').startswith(case.expected_response) or case.expected_reason not in (reason or '')
+    ]
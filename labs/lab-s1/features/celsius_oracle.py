@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+# values where conversions and their formatting typically go wrong
+BOUNDARY_VALUES = (
+    '-273.15', '-459.67', '-40', '-17.7777777777778', '0', '-0', '0.1', '37', '100',
+    '0.00001', '-0.00001', '1e-7', '123456789', '99999999999999', '1e20', '-1e20',
+)
+
+
+def php_float_to_string(value):
+    """Render a float the way PHP (precision=14) prints it: 86.0 -> "86", 1e-05 -> "1.0E-5"."""
+    text = '%.14G' % value
+    if 'E' not in text:
+        return text
+    mantissa, exponent = text.split('E')
+    if '.' not in mantissa:
+        mantissa += '.0'
+    exponent = int(exponent)
+    return f"{mantissa}E{'+' if exponent >= 0 else '-'}{abs(exponent)}"
+
+
+def expected_fahrenheit(celsius_values):
+    """Return what the form6 page shows for each Celsius input (PHP: $celsius * 1.8 + 32)."""
+    return [php_float_to_string(float(c) * 1.8 + 32) for c in celsius_values]
+
+
+def celsius_sweep(start, stop, step, extra=BOUNDARY_VALUES):
+    """Return the inputs from start to stop (inclusive) in steps, plus the boundary values.
+
+    Decimal arithmetic keeps the inputs exactly as a user would type them ("0.3", not
+    "0.30000000000000004").
+    """
+    start, stop, step = Decimal(start), Decimal(stop), Decimal(step)
+    if step <= 0:
+        raise ValueError("step must be positive")
+    values, current = [], start
+    while current <= stop:
+        values.append(format(current.normalize(), 'f') if current != 0 else '0')
+        current += step
+    seen = set(values)
+    return values + [v for v in extra if v not in seen]
+
+
+def find_mismatches(celsius_values, actual_values):
+    """Return (celsius, actual, expected) for every input whose result differs from the oracle."""
+    expected = expected_fahrenheit(celsius_values)
+    return [
+        (celsius, actual, want)
+        for celsius, actual, want in zip(celsius_values, actual_values, expected)
+        if actual != want
+    ]
@@ -5,14 +5,18 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.options import Options as EdgeOptions
 from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.common.proxy import Proxy, ProxyType
+
+from features.httpdriver import HttpDriver
 
 
 class SeleniumDriverFactory:
     """Driver factory to provide a Selenium WebDriver for supported browsers."""
 
-    def __init__(self, browser='firefox', headless=False):
+    def __init__(self, browser='firefox', headless=False, proxy_url=None):
         self.browser = browser.lower()
         self.headless = headless
+        self.proxy_url = proxy_url
 
     def get_driver(self):
         driver_method = getattr(self, f"_get_{self.browser}_driver", None)
@@ -20,6 +24,16 @@ class SeleniumDriverFactory:
             return driver_method()
         raise ValueError(f"Unsupported browser: {self.browser}")
 
+    def _apply_proxy(self, options):
+        if not self.proxy_url:
+            return
+        address = self.proxy_url.split('://', 1)[-1]
+        options.proxy = Proxy({
+            'proxyType': ProxyType.MANUAL,
+            'httpProxy': address,
+            'sslProxy': address,
+        })
+
     def _get_firefox_driver(self):
         options = FirefoxOptions()
         if self.headless:
@@ -30,6 +44,7 @@ class SeleniumDriverFactory:
         profile.set_preference('app.update.enabled', False)
         profile.set_preference('app.update.silent', False)
         options.profile = profile
+        self._apply_proxy(options)
 
         service = FirefoxService()
         return webdriver.Firefox(service=service, options=options)
@@ -42,6 +57,7 @@ class SeleniumDriverFactory:
             options.add_argument("--headless")
             options.add_argument("--disable-gpu")
             options.add_argument("--window-size=1420,1080")
+        self._apply_proxy(options)
 
         service = ChromeService()
         return webdriver.Chrome(service=service, options=options)
@@ -53,6 +69,14 @@ class SeleniumDriverFactory:
             options.add_argument("--headless")
             options.add_argument("--disable-gpu")
             options.add_argument("--window-size=1420,1080")
+        self._apply_proxy(options)
 
         service = EdgeService()
         return webdriver.Edge(service=service, options=options)
+
+    def _get_http_driver(self):
+        # Browserless driver for server-rendered pages, see features/httpdriver.py
+        driver = HttpDriver()
+        if self.proxy_url:
+            driver.session.proxies = {'http': self.proxy_url, 'https': self.proxy_url}
+        return driver
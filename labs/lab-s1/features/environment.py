@@ -1,4 +1,6 @@
 from features.driverfactory import SeleniumDriverFactory
+from features.oracle import DataOracle
+from features.recording_proxy import RecordingProxy
 from config.base import Config
 from pages.celsius_to_fahrenheit_page import CelsiusToFahrenheitPage
 from pages.creditcard_entry_page import CreditCardEntryPage
@@ -14,16 +16,43 @@ from pages.home_page import HomePage
 
 def before_all(context):
     try:
-        driver_factory = SeleniumDriverFactory(Config.BROWSER)
+        context.proxy = start_proxy(context)
+        proxy_url = context.proxy.url if context.proxy else None
+        driver_factory = SeleniumDriverFactory(Config.BROWSER, proxy_url=proxy_url)
         context.browser = driver_factory.get_driver()
+        # stays the configured browser inside @nojs scenarios, e.g. for UI samples of bulk checks
+        context.ui_browser = context.browser
+        context.http_browser = SeleniumDriverFactory('http', proxy_url=proxy_url).get_driver()
         init_pages(context, context.browser)
+        context.oracle = load_oracle(context)
 
     except Exception as e:
         print(f"[ERROR] Failed to initialize browser: {e}")
+        for name in ("browser", "http_browser"):
+            if getattr(context, name, None):
+                getattr(context, name).quit()
         context.browser = None
+        # after_all does not run when before_all fails: release the proxy's socket and thread here
+        if getattr(context, "proxy", None):
+            context.proxy.stop()
+            context.proxy = None
         raise
 
 
+def start_proxy(context):
+    mode = context.config.userdata.get('proxy_mode', Config.PROXY_MODE)
+    if mode == 'off':
+        return None
+    store_dir = context.config.userdata.get('proxy_store_dir', Config.PROXY_STORE_DIR)
+    return RecordingProxy(Config.URL, store_dir, mode=mode).start()
+
+
+def load_oracle(context):
+    db_path = context.config.userdata.get('oracle_db', Config.ORACLE_DB)
+    seed_path = context.config.userdata.get('oracle_seed', Config.ORACLE_SEED)
+    return DataOracle.load(db_path, seed_path or None)
+
+
 def init_pages(context, browser):
     page_classes = {
         'home_page': HomePage,
@@ -45,9 +74,29 @@ def init_pages(context, browser):
 def after_all(context):
     if hasattr(context, "browser") and context.browser:
         context.browser.quit()
+    if getattr(context, "proxy", None):
+        context.proxy.stop()
+    if getattr(context, "http_browser", None):
+        context.http_browser.quit()
     del context
 
 
+def before_scenario(context, scenario):
+    if getattr(context, "proxy", None):
+        context.proxy.namespace = f"{scenario.feature.name}/{scenario.name}"
+        # recordings are keyed by the Cookie header: every scenario starts without the cookies of
+        # the ones before it, so it replays the same when run alone (behave -n) or in a subset
+        for name in ("ui_browser", "http_browser"):
+            if getattr(context, name, None):
+                getattr(context, name).delete_all_cookies()
+    # Scenarios on plain server-rendered pages run on the browserless HttpDriver.
+    # Attributes set here live in the scenario layer of the context and are dropped afterwards.
+    if 'nojs' in scenario.effective_tags:
+        context.http_browser.delete_all_cookies()
+        context.browser = context.http_browser
+        init_pages(context, context.http_browser)
+
+
 def before_feature(context, feature):
     if 'concurrentWindows' in feature.tags:
         print(feature.tags)
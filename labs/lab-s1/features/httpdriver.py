@@ -0,0 +1,175 @@
+from urllib.parse import urljoin
+
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+
+class HttpElement:
+    """Element of an HttpDriver page implementing the WebElement subset used by the page objects."""
+
+    SUBMIT_TYPES = ('submit', 'image')
+
+    def __init__(self, driver, node):
+        self.parent = driver
+        self._node = node
+
+    @property
+    def tag_name(self):
+        return self._node.tag
+
+    @property
+    def text(self):
+        return ' '.join(self._node.text_content().split())
+
+    def get_attribute(self, name):
+        if name == 'value' and self._node.tag in ('input', 'textarea', 'select'):
+            return self._node.value or ''
+        return self._node.get(name)
+
+    def is_displayed(self):
+        node = self._node
+        if node.tag == 'input' and (node.get('type') or '').lower() == 'hidden':
+            return False
+        while node is not None:
+            style = (node.get('style') or '').replace(' ', '').lower()
+            if node.get('hidden') is not None or 'display:none' in style or 'visibility:hidden' in style:
+                return False
+            node = node.getparent()
+        return True
+
+    def is_enabled(self):
+        return self._node.get('disabled') is None
+
+    def is_selected(self):
+        return self._node.get('checked') is not None or self._node.get('selected') is not None
+
+    def clear(self):
+        self._node.value = ''
+
+    def send_keys(self, *values):
+        text = ''.join(str(v) for v in values)
+        submit = Keys.ENTER in text or Keys.RETURN in text
+        text = text.replace(Keys.ENTER, '').replace(Keys.RETURN, '')
+        self._node.value = (self._node.value or '') + text
+        if submit:
+            self.submit()
+
+    def click(self):
+        node = self._node
+        if node.tag == 'a' and node.get('href'):
+            self.parent.get(urljoin(self.parent.current_url, node.get('href')))
+        elif node.tag == 'input' and (node.get('type') or '').lower() in ('checkbox', 'radio'):
+            node.checked = not node.checked if node.get('type').lower() == 'checkbox' else True
+        elif self._is_submit_button():
+            self.submit(submitter=node)
+
+    def submit(self, submitter=None):
+        form = self._node if self._node.tag == 'form' else next(self._node.iterancestors('form'), None)
+        if form is None:
+            raise WebDriverException("Element is not inside a form")
+        self.parent._submit_form(form, submitter)
+
+    def _is_submit_button(self):
+        node = self._node
+        if node.tag == 'input':
+            return (node.get('type') or '').lower() in self.SUBMIT_TYPES
+        return node.tag == 'button' and (node.get('type') or 'submit').lower() == 'submit'
+
+    def find_element(self, by=By.ID, value=None):
+        return self.parent._find(self._node, by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.parent._find(self._node, by, value, single=False)
+
+
+class HttpDriver:
+    """Browserless driver for server-rendered pages.
+
+    Implements the subset of the Selenium WebDriver API that the PageFactory page objects use
+    on top of a pooled requests session and the lxml HTML parser. Pages relying on JavaScript
+    need a real browser.
+    """
+
+    def __init__(self, timeout=(3.05, 30), pool_size=10):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.timeout = timeout
+        self.current_url = None
+        self.page_source = ''
+        self._document = None
+
+    @property
+    def title(self):
+        titles = self._document.xpath('//title') if self._document is not None else []
+        return titles[0].text_content().strip() if titles else ''
+
+    def get(self, url):
+        self._load(self.session.get(url, timeout=self.timeout))
+
+    def _submit_form(self, form, submitter=None):
+        fields = list(form.form_values())
+        if submitter is not None and submitter.get('name'):
+            fields.append((submitter.get('name'), submitter.get('value') or ''))
+
+        action = urljoin(self.current_url, form.get('action') or self.current_url)
+        if (form.get('method') or 'get').lower() == 'post':
+            r = self.session.post(action, data=fields, timeout=self.timeout)
+        else:
+            r = self.session.get(action, params=fields, timeout=self.timeout)
+        self._load(r)
+
+    def _load(self, response):
+        self.current_url = response.url
+        self.page_source = response.text
+        self._document = lxml.html.fromstring(response.content or b'<html></html>', base_url=response.url)
+
+    def _find(self, root, by, value, single):
+        if root is None:
+            raise NoSuchElementException("No page loaded")
+
+        if by == By.ID:
+            nodes = root.xpath('.//*[@id=$v]', v=value)
+        elif by == By.NAME:
+            nodes = root.xpath('.//*[@name=$v]', v=value)
+        elif by == By.XPATH:
+            nodes = root.xpath(value)
+        elif by == By.CSS_SELECTOR:
+            nodes = root.cssselect(value)
+        elif by == By.CLASS_NAME:
+            nodes = root.find_class(value)
+        elif by == By.TAG_NAME:
+            nodes = root.iter(value)
+        elif by == By.LINK_TEXT:
+            nodes = [a for a in root.iter('a') if a.text_content().strip() == value]
+        elif by == By.PARTIAL_LINK_TEXT:
+            nodes = [a for a in root.iter('a') if value in a.text_content()]
+        else:
+            raise WebDriverException(f"Unsupported locator strategy: {by}")
+
+        elements = [HttpElement(self, n) for n in nodes if isinstance(n, lxml.html.HtmlElement)]
+        if not single:
+            return elements
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: ({by}, {value})")
+        return elements[0]
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find(self._document, by, value, single=True)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(self._document, by, value, single=False)
+
+    def execute_script(self, script, *args):
+        raise WebDriverException("HttpDriver cannot execute JavaScript; tag the scenario for a real browser")
+
+    def delete_all_cookies(self):
+        self.session.cookies.clear()
+
+    def quit(self):
+        self.session.close()
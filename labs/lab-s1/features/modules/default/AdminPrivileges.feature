@@ -15,4 +15,12 @@ Feature: Admin Privileges
   @background
   Scenario: Admin can access Sales statistics
     When Admin looks up total sales amount for month "June" in year "2022"
-    Then the total "June" sales amount is "32164"
\ No newline at end of file
+    Then the total "June" sales amount is "32164"
+
+  @background @oracle
+  Scenario: Admin HR records match the data oracle
+    Then every employee in the data oracle is found with their department
+
+  @background @oracle
+  Scenario: Admin sales statistics match the data oracle
+    Then the sales page shows the data oracle's amount for every month of year "2022"
\ No newline at end of file
@@ -1,3 +1,4 @@
+@nojs
 Feature: Convert Celsius Feature
   Description: The purpose of this feature is to illustrate the usage of inline variables
 
@@ -11,4 +12,10 @@ Feature: Convert Celsius Feature
   Scenario: Convert Celsius to correct Fahrenheit high range equivalent
     Given I provide "35" degree Celsius
     When I click the convert button
-    Then I should see as result "95" Fahrenheit
\ No newline at end of file
+    Then I should see as result "95" Fahrenheit
+
+  @sweep
+  Scenario: Convert a sweep of Celsius values to their Fahrenheit equivalents
+    Given I open the Celsius converter
+    When I convert every Celsius value from "-100" to "200" in steps of "0.1"
+    Then every result matches the Fahrenheit formula
\ No newline at end of file
@@ -1,3 +1,4 @@
+@nojs
 Feature: Creditcard Feature
   Description: The purpose of this feature is to illustrate the usage of a scenario outline
 
@@ -11,4 +12,10 @@ Feature: Creditcard Feature
       | name         | cc-number        | expiry-date | cvv | response | reason                      |
       | Joe Doe      | 4242424242424242 | 10/27       | 753 | Success  | You are using VISA          |
       | Hans Hansen  | 5555555555554444 | 02/28       | 159 | Success  | You are using MASTERCARD    |
-      | Eugene Tonya | 4000000000009995 | 07/26       | 741 | Declined | You have insufficient funds |
\ No newline at end of file
+      | Eugene Tonya | 4000000000009995 | 07/26       | 741 | Declined | You have insufficient funds |
+
+  @hybrid
+  Scenario: Responses to generated valid and mistyped card numbers follow the Luhn check
+    Given "200" generated card numbers per issuer with their expected responses
+    When the cards are submitted over HTTP with "10" of them also sent through the browser
+    Then every card response matches the Luhn oracle
\ No newline at end of file
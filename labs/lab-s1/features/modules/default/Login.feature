@@ -1,3 +1,4 @@
+@nojs
 Feature: Login Feature
   Description: The purpose of this feature is to illustrate the usage of horizontal and vertical data tables
 
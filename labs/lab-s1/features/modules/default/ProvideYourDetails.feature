@@ -1,3 +1,4 @@
+@nojs
 Feature: Provide Your Details Feature
   Description: The purpose of this feature is to illustrate the usage of a long vertical table
 
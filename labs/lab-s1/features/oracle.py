@@ -0,0 +1,99 @@
+import calendar
+import json
+import os
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+
+
+class OracleDataMissing(LookupError):
+    """The oracle has no data for what a step wants to verify."""
+
+
+@dataclass(frozen=True)
+class Employee:
+    name: str
+    department: str
+    position: str = ''
+    employee_id: str = ''
+
+
+class DataOracle:
+    """Expected HR and sales data for the UI steps, read once per run and indexed in memory.
+
+    The data comes from the EMPLOYEES (NAME, DEPARTMENT, POSITION, ID) and SALES (YEAR, MONTH,
+    AMOUNT) tables of a SQLite database, by default the sample site's Main.db. Tables the database
+    lacks are taken from a JSON seed ({"EMPLOYEES": [rows], "SALES": [rows]}) if one is given;
+    tables found in neither are listed in ``missing``.
+    """
+
+    TABLES = ('EMPLOYEES', 'SALES')
+
+    def __init__(self, employees, sales, source, missing=()):
+        self.source = source
+        self.missing = tuple(missing)
+        self._employees = {e.name: e for e in employees}
+        self._sales = {}
+        for year, month, amount in sales:
+            self._sales.setdefault(int(year), {})[month] = amount
+
+    @classmethod
+    def load(cls, db_path, seed_path=None):
+        tables = {}
+        if db_path and os.path.exists(db_path):
+            # read-only: the oracle must never change the data it checks against
+            db = sqlite3.connect(Path(db_path).resolve().as_uri() + '?mode=ro', uri=True)
+            db.row_factory = sqlite3.Row
+            try:
+                present = {name.upper(): name for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                for table in cls.TABLES:
+                    if table in present:
+                        rows = db.execute(f'SELECT * FROM "{present[table]}"').fetchall()
+                        tables[table] = [{k.upper(): row[k] for k in row.keys()} for row in rows]
+            finally:
+                db.close()
+        sources = [db_path]
+        if seed_path and any(t not in tables for t in cls.TABLES):
+            with open(seed_path, encoding='utf-8') as f:
+                seed = json.load(f)
+            for table in cls.TABLES:
+                if table not in tables and table in seed:
+                    tables[table] = [{k.upper(): v for k, v in row.items()} for row in seed[table]]
+                    sources.append(f'{seed_path} ({table})')
+
+        employees = [
+            Employee(r['NAME'], r['DEPARTMENT'], r.get('POSITION') or '', str(r.get('ID') or ''))
+            for r in tables.get('EMPLOYEES', [])
+        ]
+        sales = [(r['YEAR'], cls._month_name(r['MONTH']), str(r['AMOUNT'])) for r in tables.get('SALES', [])]
+        return cls(employees, sales, ', '.join(filter(None, sources)), [t for t in cls.TABLES if t not in tables])
+
+    @staticmethod
+    def _month_name(month):
+        if isinstance(month, int) or str(month).isdigit():
+            return calendar.month_name[int(month)]
+        return str(month).strip().capitalize()
+
+    def _require(self, table):
+        if table in self.missing:
+            raise OracleDataMissing(f"No {table} data in the oracle ({self.source})")
+
+    def employees(self):
+        self._require('EMPLOYEES')
+        return [self._employees[name] for name in sorted(self._employees)]
+
+    def employee(self, name):
+        self._require('EMPLOYEES')
+        try:
+            return self._employees[name]
+        except KeyError:
+            raise OracleDataMissing(f"Employee {name!r} is not in the oracle ({self.source})") from None
+
+    def sales_for_year(self, year):
+        """Return {month name: amount} of a year in calendar order."""
+        self._require('SALES')
+        by_month = self._sales.get(int(year), {})
+        if not by_month:
+            raise OracleDataMissing(f"No sales for {year} in the oracle ({self.source})")
+        order = {name: i for i, name in enumerate(calendar.month_name)}
+        return dict(sorted(by_month.items(), key=lambda item: order.get(item[0], 13)))
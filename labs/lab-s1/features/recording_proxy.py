@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import select
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import urllib3
+
+
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'proxy-connection',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'content-length',
+}
+STATIC_ASSET_EXTENSIONS = (
+    '.css', '.js', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.ico', '.woff', '.woff2', '.ttf', '.map',
+)
+
+
+class ResponseStore:
+    """On-disk store of recorded responses keyed by method, URL, body hash and session."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(method, url, body=b'', session=''):
+        body_hash = hashlib.sha256(body or b'').hexdigest()
+        return hashlib.sha256(f"{method.upper()} {url} {body_hash} {session}".encode('utf-8')).hexdigest()
+
+    def _paths(self, key):
+        folder = os.path.join(self.directory, key[:2])
+        return os.path.join(folder, key + '.json'), os.path.join(folder, key + '.bin')
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        entry = (meta['status'], [tuple(h) for h in meta['headers']], body)
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def put(self, key, method, url, status, headers, body):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {'method': method, 'url': url, 'status': status, 'headers': [list(h) for h in headers]}
+
+        # Write to temporary files first so parallel runs never read half-written entries
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(body_path + suffix, 'wb') as f:
+            f.write(body)
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(body_path + suffix, body_path)
+        os.replace(meta_path + suffix, meta_path)
+
+        with self._lock:
+            self._memory[key] = (status, list(headers), body)
+
+
+class RecordingProxy:
+    """Local HTTP proxy that records and replays responses of the site under test.
+
+    Modes:
+        live   - forward everything upstream; static assets are cached on disk and shared by all browsers
+        record - forward everything upstream and store every response of the target site
+        replay - serve the target site from the store only, unknown requests fail with 504
+    """
+
+    MODES = ('live', 'record', 'replay')
+
+    def __init__(self, target_url, store_dir, mode='live', host='127.0.0.1', port=0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported proxy mode: {mode}")
+        self.mode = mode
+        self.target_netloc = urlsplit(target_url).netloc.lower()
+        self.store = ResponseStore(os.path.join(store_dir, 'responses'))
+        self.asset_store = ResponseStore(os.path.join(store_dir, 'assets'))
+        self.pool = urllib3.PoolManager(maxsize=16, block=False)
+        self._server = ThreadingHTTPServer((host, port), _ProxyRequestHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        self._thread = None
+        # set per scenario (see environment.before_scenario) so equal requests of different scenarios never collide
+        self.namespace = ''
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='recording-proxy', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+        self._server.server_close()
+        self.pool.clear()
+
+    def is_target(self, url):
+        return urlsplit(url).netloc.lower() == self.target_netloc
+
+    @staticmethod
+    def is_static_asset(method, url):
+        return method == 'GET' and urlsplit(url).path.lower().endswith(STATIC_ASSET_EXTENSIONS)
+
+    def session_key(self, headers):
+        """Scenario namespace plus a digest of the Cookie header: logged-in and logged-out pages stay apart.
+
+        The cookies are only reproducible because before_scenario starts every scenario with empty
+        cookie jars; otherwise the key would depend on the scenarios that ran before.
+        """
+        cookie = next((v for k, v in headers if k.lower() == 'cookie'), '')
+        return f"{self.namespace} {hashlib.sha256(cookie.encode('utf-8')).hexdigest()}"
+
+    def handle(self, method, url, headers, body):
+        """Return (status, headers, body) for a proxied request."""
+        target = self.is_target(url)
+        static = self.is_static_asset(method, url)
+
+        if static:
+            # assets do not depend on the session: one copy is shared by every scenario and browser
+            key = ResponseStore.make_key(method, url, body)
+            cached = self.asset_store.get(key) or (self.store.get(key) if target else None)
+            if cached:
+                if self.mode == 'record' and target:
+                    self.store.put(key, method, url, *cached)
+                return cached
+        else:
+            key = ResponseStore.make_key(method, url, body, self.session_key(headers))
+        if self.mode == 'replay' and target:
+            cached = self.store.get(key)
+            if cached:
+                return cached
+            return 504, [('Content-Type', 'text/plain')], f"No recorded response for {method} {url}".encode('utf-8')
+
+        status, response_headers, response_body = self._forward(method, url, headers, body)
+        if static and status == 200:
+            self.asset_store.put(key, method, url, status, response_headers, response_body)
+        if self.mode == 'record' and target:
+            self.store.put(key, method, url, status, response_headers, response_body)
+        return status, response_headers, response_body
+
+    def _forward(self, method, url, headers, body):
+        upstream_headers = {k: v for k, v in headers if k.lower() not in HOP_BY_HOP_HEADERS}
+        r = self.pool.request(
+            method, url, body=body or None, headers=upstream_headers,
+            redirect=False, retries=False, preload_content=True, decode_content=False,
+        )
+        response_headers = [(k, v) for k, v in r.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS]
+        return r.status, response_headers, r.data
+
+
+class _ProxyRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Keep the behave output readable
+        pass
+
+    def _absolute_url(self):
+        if self.path.startswith(('http://', 'https://')):
+            return self.path
+        return f"http://{self.headers.get('Host', '')}{self.path}"
+
+    def _handle(self):
+        proxy = self.server.proxy
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        try:
+            status, headers, payload = proxy.handle(self.command, self._absolute_url(), list(self.headers.items()), body)
+        except Exception as e:
+            status, headers, payload = 502, [('Content-Type', 'text/plain')], f"Proxy error: {e}".encode('utf-8')
+
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = do_OPTIONS = do_PATCH = _handle
+
+    def do_CONNECT(self):
+        # HTTPS cannot be recorded without interception; tunnel it through untouched outside replay mode
+        if self.server.proxy.mode == 'replay':
+            self.send_error(502, 'HTTPS tunnelling is disabled in replay mode')
+            return
+
+        host, _, port = self.path.partition(':')
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=30)
+        except OSError as e:
+            self.send_error(502, f"Cannot connect to {self.path}: {e}")
+            return
+
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, 30)
+                if errored or not readable:
+                    break
+                for s in readable:
+                    data = s.recv(65536)
+                    if not data:
+                        return
+                    (upstream if s is self.connection else self.connection).sendall(data)
+        finally:
+            upstream.close()
+            self.close_connection = True
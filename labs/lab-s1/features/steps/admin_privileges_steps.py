@@ -1,6 +1,8 @@
 from behave import *
 from assertpy import assert_that
 
+from features.oracle import OracleDataMissing
+
 
 @given("I navigate to login page")
 def step_impl(context):
@@ -59,3 +61,54 @@ def step_impl(context, month, year):
 def step_impl(context, month, expected_sales_amount):
     actual_sales_amount = context.sales_page.grab_sales_amount_from_month(month)
     assert_that(actual_sales_amount).is_equal_to(expected_sales_amount)
+
+
+def oracle_data(context, lookup, *args):
+    """Return lookup(*args) from the data oracle, or skip the scenario when the oracle lacks the data."""
+    try:
+        return lookup(*args)
+    except OracleDataMissing as e:
+        context.scenario.skip(str(e))
+        return None
+
+
+@then('every employee in the data oracle is found with their department')
+def step_impl(context):
+    employees = oracle_data(context, context.oracle.employees)
+    if employees is None:
+        return
+
+    context.user_account_page.navigate_to_hr_section()
+    visible = context.employee_page.employee_page_is_displayed()
+    assert_that(visible).is_true()
+
+    mismatches = []
+    for employee in employees:
+        context.employee_page.fill_employee_name_input(employee.name)
+        context.employee_page.click_search_btn()
+        records = [r for r in context.employee_page.grab_employee_records() if r.get('Name') == employee.name]
+        if not records:
+            mismatches.append(f"{employee.name}: not found")
+        elif records[0].get('Department') != employee.department:
+            mismatches.append(f"{employee.name}: department {records[0].get('Department')!r}, expected {employee.department!r}")
+    assert_that(mismatches).described_as(f"employees checked against {context.oracle.source}").is_empty()
+
+
+@then('the sales page shows the data oracle\'s amount for every month of year "{year}"')
+def step_impl(context, year):
+    expected = oracle_data(context, context.oracle.sales_for_year, year)
+    if expected is None:
+        return
+
+    context.user_account_page.navigate_to_sales_section()
+    visible = context.sales_page.sales_stats_page_is_displayed()
+    assert_that(visible).is_true()
+    assert_that(context.sales_page.grab_year_month_header()).starts_with(year)
+
+    actual = context.sales_page.grab_all_sales_amounts()
+    mismatches = [
+        f"{month}: {actual.get(month, 'missing')}, expected {amount}"
+        for month, amount in expected.items()
+        if actual.get(month) != amount
+    ]
+    assert_that(mismatches).described_as(f"{year} sales checked against {context.oracle.source}").is_empty()
@@ -1,6 +1,8 @@
 from behave import *
 from assertpy import assert_that
 
+from features.celsius_oracle import celsius_sweep, find_mismatches
+
 
 @given(u'I provide "{celsius_degrees}" degree Celsius')
 def step_impl(context, celsius_degrees):
@@ -17,3 +19,23 @@ def step_impl(context):
 def step_impl(context, expected_fahrenheit):
     actual_fahrenheit = context.celsius_to_fahrenheit_page.read_fahrenheit_field()
     assert_that(actual_fahrenheit).is_equal_to(expected_fahrenheit)
+
+
+@given("I open the Celsius converter")
+def step_impl(context):
+    context.celsius_to_fahrenheit_page.visit()
+
+
+@when('I convert every Celsius value from "{start}" to "{stop}" in steps of "{step}"')
+def step_impl(context, start, stop, step):
+    context.celsius_values = celsius_sweep(start, stop, step)
+    context.fahrenheit_values = context.celsius_to_fahrenheit_page.convert_many(context.celsius_values)
+
+
+@then("every result matches the Fahrenheit formula")
+def step_impl(context):
+    mismatches = find_mismatches(context.celsius_values, context.fahrenheit_values)
+    report = "\n".join(f"{c} C: page shows {actual!r}, expected {expected!r}" for c, actual, expected in mismatches[:20])
+    assert_that(mismatches).described_as(
+        f"{len(mismatches)} of {len(context.celsius_values)} conversions differ\n{report}"
+    ).is_empty()
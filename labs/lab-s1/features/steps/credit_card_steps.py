@@ -1,6 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from behave import *
 from assertpy import assert_that
 
+from features.card_oracle import find_mismatches, generate_cards, sample_cases
+from pages.creditcard_entry_page import CreditCardEntryPage
+from pages.creditcard_response_page import CreditCardResponsePage
+
+CARD_HOLDER, EXPIRY_DATE, CVV = "Test Card", "10/27", "753"
+
 
 @given("User is on credit card entry page")
 def step_impl(context):
@@ -23,3 +31,52 @@ def step_impl(context, expected_response, expected_reason):
 
     actual_reason = context.credit_card_response_page.grab_more_info_from_alert_box()
     assert_that(actual_reason).contains(expected_reason)
+
+
+@given('"{per_issuer:d}" generated card numbers per issuer with their expected responses')
+def step_impl(context, per_issuer):
+    context.card_cases = generate_cards(per_issuer)
+
+
+@when('the cards are submitted over HTTP with "{ui_sample:d}" of them also sent through the browser')
+def step_impl(context, ui_sample):
+    entry_page = context.credit_card_entry_page
+    session = context.http_browser.session
+
+    def submit_over_http(case):
+        html = entry_page.post_card_information(session, CARD_HOLDER, case.number, EXPIRY_DATE, CVV)
+        return CreditCardResponsePage.read_alert(html)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        context.card_http_results = list(pool.map(submit_over_http, context.card_cases))
+
+    ui_entry_page = CreditCardEntryPage(context.ui_browser)
+    ui_response_page = CreditCardResponsePage(context.ui_browser)
+    context.card_ui_cases = sample_cases(context.card_cases, ui_sample)
+    context.card_ui_results = []
+    for case in context.card_ui_cases:
+        ui_entry_page.visit()
+        ui_entry_page.enter_card_information(CARD_HOLDER, case.number, EXPIRY_DATE, CVV)
+        ui_entry_page.submit_payment()
+        context.card_ui_results.append(
+            (ui_response_page.grab_response_from_alert_box(), ui_response_page.grab_more_info_from_alert_box())
+        )
+
+
+@then("every card response matches the Luhn oracle")
+def step_impl(context):
+    mismatches = [
+        (channel, case, response, reason)
+        for channel, cases, results in (
+            ("http", context.card_cases, context.card_http_results),
+            ("browser", context.card_ui_cases, context.card_ui_results),
+        )
+        for case, response, reason in find_mismatches(cases, results)
+    ]
+    report = "\n".join(
+        f"[{channel}] {case.issuer} {case.kind} {case.number!r}: got {response!r} / {reason!r}, "
+        f"expected {case.expected_response!r} / {case.expected_reason!r}"
+        for channel, case, response, reason in mismatches[:20]
+    )
+    checked = len(context.card_cases) + len(context.card_ui_cases)
+    assert_that(mismatches).described_as(f"{len(mismatches)} of {checked} card checks differ\n{report}").is_empty()
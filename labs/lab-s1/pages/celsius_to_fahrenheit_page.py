@@ -1,5 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import lxml.html
 from seleniumpagefactory.Pagefactory import PageFactory
 from config.base import Config
+from features.httpdriver import HttpDriver
 
 
 class CelsiusToFahrenheitPage(PageFactory):
@@ -9,8 +14,32 @@ class CelsiusToFahrenheitPage(PageFactory):
         "input_celsius": ('NAME', 'celsius'),
         "btn_celsius": ('ID', 'btnCelsius'),
         "input_fahrenheit": ('NAME', 'fahrenheit'),
+        "form_convert": ('ID', 'convert-celsius'),
     }
 
+    # Posts every value of a batch to the form from inside the page (same origin and cookies) and
+    # reads the fahrenheit field of each response; one script call per batch.
+    CONVERT_BATCH_SCRIPT = """
+        const [action, values, concurrency, done] = arguments;
+        const results = new Array(values.length);
+        let next = 0;
+        async function worker() {
+            while (next < values.length) {
+                const i = next++;
+                try {
+                    const body = new URLSearchParams({celsius: values[i], Convert: 'Convert'});
+                    const response = await fetch(action, {method: 'POST', body: body, credentials: 'same-origin'});
+                    const page = new DOMParser().parseFromString(await response.text(), 'text/html');
+                    const field = page.querySelector('input[name="fahrenheit"]');
+                    results[i] = field ? field.value : null;
+                } catch (e) {
+                    results[i] = null;
+                }
+            }
+        }
+        Promise.all(Array.from({length: concurrency}, worker)).then(() => done(results));
+    """
+
     def __init__(self, driver):
         super().__init__()
         self.url = Config.URL + '?action=form6'
@@ -28,3 +57,32 @@ class CelsiusToFahrenheitPage(PageFactory):
 
     def read_fahrenheit_field(self):
         return self.input_fahrenheit.get_attribute("value")
+
+    def _convert_action(self):
+        return urljoin(self.driver.current_url, self.form_convert.get_attribute("action") or self.url)
+
+    def _convert_over_http(self, action, celsius_degrees):
+        response = self.driver.session.post(
+            action, data={"celsius": celsius_degrees, "Convert": "Convert"}, timeout=self.driver.timeout
+        )
+        fields = lxml.html.fromstring(response.content).xpath('//input[@name="fahrenheit"]/@value')
+        return fields[0] if fields else None
+
+    def convert_many(self, celsius_values, batch_size=500, concurrency=8):
+        """Convert every value without driving the form field by field; returns the results in order.
+
+        The page has to be open. A real browser posts the values from injected script in batches
+        of batch_size; the browserless HttpDriver posts them over its pooled session. A value whose
+        response has no fahrenheit field yields None.
+        """
+        action = self._convert_action()
+        values = [str(v) for v in celsius_values]
+        if isinstance(self.driver, HttpDriver):
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                return list(pool.map(lambda value: self._convert_over_http(action, value), values))
+
+        results = []
+        for i in range(0, len(values), batch_size):
+            batch = values[i:i + batch_size]
+            results.extend(self.driver.execute_async_script(self.CONVERT_BATCH_SCRIPT, action, batch, concurrency))
+        return results
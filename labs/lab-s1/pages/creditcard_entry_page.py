@@ -16,6 +16,8 @@ class CreditCardEntryPage(PageFactory):
     def __init__(self, driver):
         super().__init__()
         self.url = Config.URL + '?action=form3'
+        # where the entry form POSTs to (views/form-3.twig); lets bulk checks skip the form
+        self.form_action = Config.URL + '?action=responsecc'
         self.driver = driver
 
     def visit(self):
@@ -36,3 +38,9 @@ class CreditCardEntryPage(PageFactory):
 
     def submit_payment(self):
         self.btn_paynow.click()
+
+    def post_card_information(self, session, card_name, cc_number, expiry_date, cvv):
+        """POST the form's fields straight to the response page over a requests session; returns its HTML."""
+        data = {"cardname": card_name, "cardnumber": cc_number, "expdate": expiry_date, "cvv": cvv, "paynow": "Pay Now"}
+        response = session.post(self.form_action, data=data, timeout=(3.05, 30))
+        return response.text
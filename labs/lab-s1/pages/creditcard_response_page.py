@@ -1,3 +1,4 @@
+import lxml.html
 from seleniumpagefactory.Pagefactory import PageFactory
 from config.base import Config
 
@@ -27,3 +28,14 @@ class CreditCardResponsePage(PageFactory):
 
     def grab_more_info_from_alert_box(self):
         return self.more_info_txt.text
+
+    @staticmethod
+    def read_alert(page_source):
+        """Return (response, more info) of the alert box in a page source, without a driver."""
+        document = lxml.html.fromstring(page_source or '<html></html>')
+        response = document.xpath("//strong[@class='response']")
+        more_info = document.find_class('more-info')
+        return (
+            response[0].text_content().strip() if response else None,
+            more_info[0].text_content().strip() if more_info else None,
+        )
@@ -1,5 +1,6 @@
 from seleniumpagefactory.Pagefactory import PageFactory
 from config.base import Config
+from pages.table_reader import read_table
 
 
 class EmployeePage(PageFactory):
@@ -14,6 +15,8 @@ class EmployeePage(PageFactory):
         "employee_department": ('CSS', ".employee.department"),
     }
 
+    employee_table_id = "employee-details"
+
     def __init__(self, driver):
         super().__init__()
         self.url = Config.URL + '?action=employee'
@@ -40,3 +43,8 @@ class EmployeePage(PageFactory):
 
     def grab_department_name(self):
         return self.employee_department.text
+
+    def grab_employee_records(self):
+        """Return the rows of the search result as dicts by column heading, in one read."""
+        headers, rows = read_table(self.driver.page_source, self.employee_table_id)
+        return [dict(zip(headers, row)) for row in rows]
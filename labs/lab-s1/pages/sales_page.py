@@ -2,6 +2,7 @@ from selenium.webdriver.common.by import By
 from seleniumpagefactory import PageFactory
 
 from config.base import Config
+from pages.table_reader import read_table
 
 
 class SalesPage(PageFactory):
@@ -12,6 +13,8 @@ class SalesPage(PageFactory):
         "heading_year_month": ('CSS', ".sales.header-year-month"),
     }
 
+    sales_table_id = "sales-details"
+
     raw_locators = {
         "cell_month": "//td[contains(text(), '%s')]",
         "cell_sales_amount": "//td[contains(text(), '%s')]/following-sibling::td",
@@ -39,3 +42,8 @@ class SalesPage(PageFactory):
     def grab_sales_amount_from_month(self, month):
         complete_xpath = self.raw_locators['cell_sales_amount'] % month
         return self.driver.find_element(By.XPATH, complete_xpath).text
+
+    def grab_all_sales_amounts(self):
+        """Return {month: amount} of the whole table in one read."""
+        _, rows = read_table(self.driver.page_source, self.sales_table_id)
+        return {row[0]: row[1] for row in rows if len(row) >= 2}
@@ -0,0 +1,20 @@
+import lxml.html
+
+
+def read_table(page_source, table_id):
+    """Return (header texts, rows of cell texts) of the table with table_id.
+
+    Parses the page source once instead of asking the driver for every cell, so reading a whole
+    table costs a single round trip to the browser.
+    """
+    document = lxml.html.fromstring(page_source or '<html></html>')
+    tables = document.xpath('//table[@id=$id]', id=table_id)
+    if not tables:
+        return [], []
+    headers, rows = [], []
+    for tr in tables[0].iter('tr'):
+        if tr.xpath('./th'):
+            headers = [th.text_content().strip() for th in tr.xpath('./th')]
+        else:
+            rows.append([td.text_content().strip() for td in tr.xpath('./td')])
+    return headers, rows
@@ -1,26 +1,576 @@
 import os
 import sys
-import time
 import datetime
-import requests
+import hashlib
+import json
+import shutil
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
 import pytest
+import requests
 
 # Make repo root importable for tests (utils is at repo-root/utils)
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+from utils.cassette import MODES as CASSETTE_MODES, open_cassette
+from utils.http_client import ApiClient, DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from utils.spec_cache import SpecCache
+from utils.operation_index import ResponseSchemaError, ResponseSchemaHook
+from utils.reference_cache import ReferenceDataCache
+from utils.mock_server import MockApi, MockServer, load_spec
+from utils.parallel import RUN_UID_ENV, SharedSessionCache, UniqueIds
+from utils.spec_tests import SpecTestsPlugin, discover_path_params
+from utils.spec_diff import SpecDiffPlugin
+from utils.snapshot import build_snapshot
+from utils.health import CircuitBreaker, Deadline, probe
+from utils.latency import LatencyHistory, LatencyRecorder, format_comparison
+from utils.operation_index import get_operation_index
+from utils.postman import format_collection_report
+
+SPEC_URL = "http://ec2-54-188-50-153.us-west-2.compute.amazonaws.com:9966/petclinic/v3/api-docs"
+POSTMAN_COLLECTION = os.path.normpath(os.path.join(
+    ROOT, os.pardir, "lab-0", "sample-site", "api", "postman", "Automatic Test Sample Site.postman_collection.json"
+))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("api", "petclinic API suite")
+    group.addoption("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                    help="TCP connect timeout in seconds for API calls")
+    group.addoption("--read-timeout", type=float, default=DEFAULT_READ_TIMEOUT,
+                    help="read timeout in seconds for API calls")
+    group.addoption("--http-retries", type=int, default=3,
+                    help="retries for idempotent API calls on connection errors and 429/502/503/504")
+    group.addoption("--http-backoff", type=float, default=0.3,
+                    help="exponential backoff factor in seconds between retries")
+    group.addoption("--spec-max-age", type=float, default=60.0,
+                    help="seconds a cached OpenAPI spec is used without revalidating it")
+    group.addoption("--schema-sample", type=float, default=0.1,
+                    help="fraction of list items validated against the item schema (1.0 = all)")
+    group.addoption("--reference-ttl", type=float, default=300.0,
+                    help="seconds cached reference lists (owners, pets, pettypes) stay valid")
+    group.addoption("--sweep-concurrency", type=int, default=8,
+                    help="maximum number of concurrent calls in endpoint sweeps")
+    group.addoption("--validate-responses", action="store_true", default=False,
+                    help="validate every JSON response of the API client against the spec")
+    group.addoption("--spec-diff", action="store_true", default=False,
+                    help="run only the tests calling operations changed since the last green run's spec, plus smoke tests")
+    group.addoption("--cassette-mode", choices=CASSETTE_MODES, default="off",
+                    help="record API responses to --cassette-dir, or replay them without network access")
+    group.addoption("--cassette-dir", default=os.path.join(ROOT, "cassettes", "petclinic"),
+                    help="directory of the recorded API interactions")
+
+    health = parser.getgroup("health", "petclinic API fail-fast guards")
+    health.addoption("--health-timeout", type=float, default=2.0,
+                     help="timeout in seconds of the health probe sent to the API host at session start")
+    health.addoption("--breaker-threshold", type=int, default=3,
+                     help="consecutive connection failures after which remaining API calls fail at once (0 = never)")
+    health.addoption("--session-deadline", type=float, default=900.0,
+                     help="seconds after which the session stops; 0 = no deadline")
+    health.addoption("--unhealthy", choices=("skip", "fail"), default="skip",
+                     help="what happens to API tests once the host is unreachable")
+
+    latency = parser.getgroup("latency", "petclinic API latency baselines")
+    latency.addoption("--latency-gate", choices=("off", "warn", "fail"), default="warn",
+                      help="record request timings and report (warn) or fail on operations slower than the baseline")
+    latency.addoption("--latency-history", default=None,
+                      help="SQLite file of past runs' timings (default: in the pytest cache)")
+    latency.addoption("--latency-baseline-runs", type=int, default=10,
+                      help="number of previous runs forming the rolling baseline")
+    latency.addoption("--latency-threshold", type=float, default=0.2,
+                      help="relative growth of the median time to first byte counted as a regression (0.2 = 20%%)")
+    latency.addoption("--latency-alpha", type=float, default=0.01,
+                      help="significance level of the Mann-Whitney U test against the baseline")
+    latency.addoption("--latency-min-samples", type=int, default=5,
+                      help="operations with fewer samples in the run or the baseline are not judged")
+
+    fuzz = parser.getgroup("fuzz", "petclinic API fuzzing")
+    fuzz.addoption("--fuzz", action="store_true", default=False,
+                   help="fuzz the parameters and bodies of the API under test (tests/test_fuzz.py)")
+    fuzz.addoption("--fuzz-budget", type=float, default=60.0,
+                   help="seconds spent fuzzing, including shrinking the failures")
+    fuzz.addoption("--fuzz-concurrency", type=int, default=8,
+                   help="maximum number of concurrent fuzz requests")
+    fuzz.addoption("--fuzz-seed", type=int, default=0,
+                   help="seed of the input generator")
+    fuzz.addoption("--fuzz-methods", default="get",
+                   help="comma-separated methods to fuzz; add post,put,delete only against the mock or a disposable server")
+    fuzz.addoption("--fuzz-corpus", default=None,
+                   help="directory of interesting inputs, replayed before new ones are generated "
+                        "(default: per API under test in the pytest cache)")
+
+    mock = parser.getgroup("mock", "local mock petclinic")
+    mock.addoption("--mock-server", action="store_true", default=False,
+                   help="run against a local mock petclinic generated from the spec instead of the remote host")
+    mock.addoption("--mock-spec", default=None,
+                   help="spec file or URL for the mock (default: the cached spec of the remote host)")
+    mock.addoption("--mock-latency", type=float, default=0.0,
+                   help="milliseconds the mock adds to every response")
+    mock.addoption("--mock-error-rate", type=float, default=0.0,
+                   help="fraction of mock responses replaced by a 500 error")
+
+    load = parser.getgroup("load", "petclinic API load mode")
+    load.addoption("--load", action="store_true", default=False,
+                   help="run the load test against the API under test (tests/test_load.py)")
+    load.addoption("--load-duration", type=float, default=30.0,
+                   help="seconds the load test sends requests")
+    load.addoption("--load-concurrency", type=int, default=8,
+                   help="number of load workers (connections)")
+    load.addoption("--load-rate", type=float, default=None,
+                   help="target requests per second (open loop); default sends back to back")
+    load.addoption("--load-mix", default=None,
+                   help='weighted request mix, e.g. "GET /api/owners=3,GET /api/pettypes=1" (default: all GETs)')
+    load.addoption("--load-slo", action="append", default=None,
+                   help='SLO failing the load test, repeatable, e.g. "p95<200ms", "error_rate<1%%", "rps>50" '
+                        '(default: p95<200ms and error_rate<1%%)')
+
+    postman = parser.getgroup("postman", "Postman collection runner")
+    postman.addoption("--postman-collection", default=POSTMAN_COLLECTION,
+                      help="Postman collection (v2.1) whose checks tests/test_postman.py runs (default: the sample-site collection)")
+    postman.addoption("--postman-base-url", default=None,
+                      help="send the collection's requests to this scheme://host:port instead, e.g. a local stand-in")
+    postman.addoption("--postman-stand-in", action="store_true", default=False,
+                      help="run the collection against a local sample-site stand-in on lab-0's Main.db (utils.sample_site)")
+    postman.addoption("--postman-var", action="append", default=[], metavar="NAME=VALUE",
+                      help="set a collection variable, repeatable")
+    postman.addoption("--postman-concurrency", type=int, default=8,
+                      help="collection requests in flight at once")
+    postman.addoption("--postman-iterations", type=int, default=1,
+                      help="times every request of the collection is sent")
+
+
+def _cassette(config):
+    """Return the session's cassette (None unless --cassette-mode is record or replay)."""
+    if not hasattr(config, "_api_cassette"):
+        config._api_cassette = open_cassette(config.getoption("cassette_dir"), config.getoption("cassette_mode"))
+    return config._api_cassette
+
+
+def _breaker(config):
+    """Return the circuit breaker shared by every API client of the session."""
+    if not hasattr(config, "_api_breaker"):
+        config._api_breaker = CircuitBreaker(config.getoption("breaker_threshold"))
+    return config._api_breaker
+
+
+def _deadline(config):
+    if not hasattr(config, "_api_deadline"):
+        config._api_deadline = Deadline(config.getoption("session_deadline") or None)
+    return config._api_deadline
+
+
+def _make_client(config):
+    return ApiClient(
+        connect_timeout=config.getoption("connect_timeout"),
+        read_timeout=config.getoption("read_timeout"),
+        retries=config.getoption("http_retries"),
+        backoff_factor=config.getoption("http_backoff"),
+        cassette=_cassette(config),
+        breaker=_breaker(config),
+        deadline=_deadline(config),
+    )
+
+
+def _make_measuring_client(config, pool_maxsize):
+    """A client for traffic that is measured: no retries, so every failure and every slow answer counts."""
+    return ApiClient(
+        connect_timeout=config.getoption("connect_timeout"),
+        read_timeout=config.getoption("read_timeout"),
+        retries=0,
+        pool_maxsize=max(pool_maxsize, 20),
+        breaker=_breaker(config),
+        deadline=_deadline(config),
+    )
+
+
+def _cache_dir(config, name):
+    """Directory `name` in the pytest cache, or None when the cache is disabled (-p no:cacheprovider)."""
+    cache = getattr(config, "cache", None)
+    return str(cache.mkdir(name)) if cache is not None else None
+
+
+def _latency_off(config):
+    return (
+        config.getoption("latency_gate") == "off"
+        or config.getoption("cassette_mode") == "replay"
+        # no history to compare with
+        or (_cache_dir(config, "latency") is None and not config.getoption("latency_history"))
+    )
+
+
+def _latency(config):
+    """Return the session's latency recorder (None when off, or when replaying a cassette)."""
+    if not hasattr(config, "_api_latency"):
+        config._api_latency = None if _latency_off(config) else LatencyRecorder()
+    return config._api_latency
+
+
+def _latency_run(config):
+    """Id of this run in the latency history, shared by the pytest-xdist workers."""
+    workerinput = getattr(config, "workerinput", None)
+    if workerinput is not None:
+        return workerinput.get("testrunuid") or os.environ.get(RUN_UID_ENV, "run")
+    if not hasattr(config, "_latency_run_id"):
+        config._latency_run_id = config.getoption("testrunuid", None) or uuid.uuid4().hex
+    return config._latency_run_id
+
+
+def _spec_target(config):
+    """Name of the API under test for baselines kept across runs."""
+    return "mock" if config.getoption("mock_server") else SPEC_URL
+
+
+def _current_spec(config):
+    """The spec under test (through the spec cache), or None when it cannot be loaded."""
+    if not hasattr(config, "_api_current_spec"):
+        try:
+            if config.getoption("mock_server") and getattr(config, "_mock_server", None) is None:
+                # the xdist controller starts no mock of its own
+                config._api_current_spec = _mock_source_spec(config)
+            else:
+                config._api_current_spec = _make_spec_cache(config, _make_client(config)).load(_spec_url(config))
+        except Exception:
+            config._api_current_spec = None
+    return config._api_current_spec
+
+
+def _latency_target(config):
+    # load and fuzz traffic is shaped differently: each gets its own baseline
+    target = _spec_target(config)
+    modes = [m for m in ("load", "fuzz") if config.getoption(m)]
+    return " ".join([target] + modes)
+
+
+def _latency_history(config):
+    path = config.getoption("latency_history") or os.path.join(_cache_dir(config, "latency"), "history.sqlite")
+    return LatencyHistory(path)
+
+
+def _make_spec_cache(config, client):
+    cache_dir = _cache_dir(config, "openapi-spec")
+    if cache_dir is None:
+        # without the pytest cache the spec is kept for this session only
+        if not hasattr(config, "_spec_tmp_dir"):
+            config._spec_tmp_dir = tempfile.mkdtemp(prefix="openapi-spec-")
+        cache_dir = config._spec_tmp_dir
+    return SpecCache(cache_dir, client, max_age=config.getoption("spec_max_age"))
+
+
+def _spec_url(config):
+    """URL of the spec under test: the mock server's copy with --mock-server, else SPEC_URL."""
+    server = getattr(config, "_mock_server", None)
+    return server.spec_url if server is not None else SPEC_URL
+
+
+def _mock_source_spec(config):
+    """The spec the mock serves: --mock-spec, else the cached spec of the remote host."""
+    source = config.getoption("mock_spec")
+    return load_spec(source) if source else _make_spec_cache(config, _make_client(config)).load(SPEC_URL)
+
+
+def _start_mock_server(config):
+    try:
+        spec = _mock_source_spec(config)
+    except Exception as exc:
+        raise pytest.UsageError(f"--mock-server needs a spec; could not load {config.getoption('mock_spec') or SPEC_URL}: {exc}")
+    api = MockApi(
+        spec,
+        latency=config.getoption("mock_latency") / 1000.0,
+        error_rate=config.getoption("mock_error_rate"),
+    )
+    return MockServer(api, spec_path=urlsplit(SPEC_URL).path).start()
+
+
+def _is_xdist_controller(config):
+    return config.getoption("dist", "no") != "no" and not hasattr(config, "workerinput")
+
+
+def pytest_configure(config):
+    if getattr(config, "cache", None) is None:
+        config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                "pytest cache disabled (-p no:cacheprovider): --spec-diff selection, latency baselines, "
+                "the default fuzz corpus and sharing data between xdist workers are off"
+            ),
+            stacklevel=2,
+        )
+    if _is_xdist_controller(config):
+        if config.getoption("cassette_mode") == "record":
+            raise pytest.UsageError("record cassettes without -n: workers would overwrite each other's recordings")
+        # keep tests marked xdist_group (collection mutations) on one worker; ungrouped tests still spread
+        if config.getoption("dist") == "load":
+            config.option.dist = "loadgroup"
+        # the workers add their timings to one run of the latency history
+        config.option.testrunuid = _latency_run(config)
+    elif config.getoption("mock_server"):
+        # every worker gets its own mock, so workers never see each other's writes
+        config._mock_server = _start_mock_server(config)
+    # generates the spec_case parametrization of tests/test_spec_operations.py from the cached spec
+    config.pluginmanager.register(
+        SpecTestsPlugin(config, _spec_url(config), lambda: _make_spec_cache(config, _make_client(config))), "spec-tests"
+    )
+    # maps tests to the operations they call; with --spec-diff deselects tests a spec change does not affect
+    config.pluginmanager.register(
+        SpecDiffPlugin(
+            config,
+            _spec_target(config),
+            lambda: _current_spec(config),
+            select=config.getoption("spec_diff"),
+            runs_tests=not _is_xdist_controller(config),
+        ),
+        "spec-diff",
+    )
+
+
+def pytest_sessionstart(session):
+    config = session.config
+    # the controller runs no tests, and replayed cassettes need no host
+    if _is_xdist_controller(config) or config.getoption("cassette_mode") == "replay":
+        return
+    result = probe(_spec_url(config), timeout=config.getoption("health_timeout"))
+    config._api_health = result
+    if not result.ok:
+        _breaker(config).trip(f"health probe of {result.url} failed: {result.detail}")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # before any fixture: a dead host or an exhausted session costs no connect timeouts
+    deadline = _deadline(item.config)
+    if deadline.expired:
+        item.session.shouldstop = f"session deadline of {deadline.seconds:g}s reached"
+        pytest.skip(item.session.shouldstop)
+    breaker = _breaker(item.config)
+    if breaker.is_open and "api_client" in item.fixturenames:
+        if item.config.getoption("unhealthy") == "fail":
+            pytest.fail(f"API host unavailable: {breaker.reason}", pytrace=False)
+        pytest.skip(f"API host unavailable: {breaker.reason}")
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    breaker = getattr(config, "_api_breaker", None)
+    if breaker is not None and breaker.is_open:
+        terminalreporter.write_sep("-", "API host unavailable", yellow=True)
+        terminalreporter.write_line(breaker.reason)
+    results = getattr(config, "_latency_results", None)
+    if results:
+        regressed = [c for c in results if c.regressed]
+        terminalreporter.write_sep("-", "latency vs baseline", red=bool(regressed), green=not regressed)
+        terminalreporter.write_line(
+            f"{len(results)} operations compared with the previous {config.getoption('latency_baseline_runs')} runs: "
+            f"{len(regressed)} regressed"
+        )
+        if regressed or config.getoption("verbose") > 0:
+            terminalreporter.write_line(format_comparison(results if config.getoption("verbose") > 0 else regressed))
+    postman_run = getattr(config, "_postman_run", None)
+    if postman_run is not None:
+        terminalreporter.write_sep("-", "Postman collection timings")
+        terminalreporter.write_line(format_collection_report(postman_run))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if _latency_off(config):
+        return
+    recorder = getattr(config, "_api_latency", None)
+    run = _latency_run(config)
+    history = _latency_history(config)
+    try:
+        if recorder is not None and recorder.requests:
+            spec = _current_spec(config)
+            if spec:
+                history.add(run, _latency_target(config), recorder.by_operation(get_operation_index(spec)))
+        if hasattr(config, "workerinput"):
+            return
+        # a plain run or the xdist controller (after every worker added its timings) judges the run
+        config._latency_results = history.compare(
+            run,
+            baseline_runs=config.getoption("latency_baseline_runs"),
+            threshold=config.getoption("latency_threshold"),
+            alpha=config.getoption("latency_alpha"),
+            min_samples=config.getoption("latency_min_samples"),
+        )
+    finally:
+        history.close()
+    regressed = [c for c in config._latency_results if c.regressed]
+    if regressed and config.getoption("latency_gate") == "fail" and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_unconfigure(config):
+    server = getattr(config, "_mock_server", None)
+    if server is not None:
+        server.stop()
+    cassette = getattr(config, "_api_cassette", None)
+    if cassette is not None:
+        cassette.save()
+    spec_tmp_dir = getattr(config, "_spec_tmp_dir", None)
+    if spec_tmp_dir is not None:
+        shutil.rmtree(spec_tmp_dir, ignore_errors=True)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Answers every request with the JSON (status, body) its route returns."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    route = None
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length", 0))
+        code, body = self.route(self.command, self.path, self.rfile.read(length) if length else b"")
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+@pytest.fixture(scope="session")
+def stand_in_server():
+    """Start a local JSON server for route(method, path, raw_body) -> (status, body); returns its base URL.
+
+    Stand-ins let the offline tests exercise the runners (load, fuzz, latency, Postman) without
+    the petclinic host. The servers stop at the end of the session.
+    """
+    servers = []
+
+    def start(route):
+        handler = type("StandInHandler", (_StandInHandler,), {"route": staticmethod(route)})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture(scope="session")
+def stand_in_client():
+    # a plain client without retries: stand-in traffic is local and never belongs in a cassette
+    client = ApiClient(retries=0)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def api_client(pytestconfig):
+    """Session-wide HTTP client: pooled keep-alive connections, retries and split timeouts."""
+    client = _make_client(pytestconfig)
+    client.latency = _latency(pytestconfig)
+    client.hooks["response"].append(pytestconfig.pluginmanager.get_plugin("spec-diff").record_response)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def load_client(pytestconfig, api_client):
+    """Client for --load traffic: api_client's pool and guards, but no retries hiding errors or adding backoff."""
+    client = _make_measuring_client(pytestconfig, pytestconfig.getoption("load_concurrency"))
+    client.latency = api_client.latency
+    client.hooks["response"].append(pytestconfig.pluginmanager.get_plugin("spec-diff").record_response)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def fuzz_client(pytestconfig, api_client):
+    """Client for --fuzz traffic: no retries burning the budget on 5xx and no schema hook raising in the workers."""
+    client = _make_measuring_client(pytestconfig, pytestconfig.getoption("fuzz_concurrency"))
+    client.latency = api_client.latency
+    client.hooks["response"].append(pytestconfig.pluginmanager.get_plugin("spec-diff").record_response)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def fuzz_corpus_dir(pytestconfig):
+    """--fuzz-corpus, else a corpus per API under test in the pytest cache (None without the cache)."""
+    directory = pytestconfig.getoption("fuzz_corpus")
+    if directory:
+        return directory
+    root = _cache_dir(pytestconfig, "fuzz-corpus")
+    if root is None:
+        return None
+    target = hashlib.sha256(_spec_target(pytestconfig).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(root, target)
+
+
+@pytest.fixture(scope="session")
+def session_data(pytestconfig):
+    """File-locked cache shared by the pytest-xdist workers of this run (None without xdist or the pytest cache)."""
+    workerinput = getattr(pytestconfig, "workerinput", None)
+    if workerinput is None:
+        return None
+    root = _cache_dir(pytestconfig, "session-data")
+    if root is None:
+        # every worker fetches its own reference data
+        return None
+    run_id = workerinput.get("testrunuid") or os.environ.get(RUN_UID_ENV, "run")
+    return SharedSessionCache(root, run_id)
+
 
 @pytest.fixture(scope="session")
-def swagger_spec():
+def reference_data(pytestconfig, api_client, session_data):
+    """Read-through cache of reference lists, invalidated by writes through api_client."""
+    return ReferenceDataCache(api_client, ttl=pytestconfig.getoption("reference_ttl"), shared=session_data)
+
+
+@pytest.fixture(scope="session")
+def spec_cache(pytestconfig, api_client):
+    """On-disk OpenAPI spec cache stored under the pytest cache directory."""
+    return _make_spec_cache(pytestconfig, api_client)
+
+
+@pytest.fixture(scope="session")
+def swagger_spec(pytestconfig, spec_cache):
     """Fetch the OpenAPI v3 JSON for the target API.
 
-    Updated spec URL provided by the user.
+    Updated spec URL provided by the user. The spec is revalidated against the cached copy
+    (ETag / Last-Modified) and falls back to it with a warning when the host is unreachable.
+    With --mock-server it is the mock's copy, whose server URL points at the mock.
     """
-    url = "http://ec2-54-188-50-153.us-west-2.compute.amazonaws.com:9966/petclinic/v3/api-docs"
-    r = requests.get(url, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return spec_cache.load(_spec_url(pytestconfig))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def response_schema_validation(request, pytestconfig):
+    """With --validate-responses, route every response through the spec and validate it."""
+    if not pytestconfig.getoption("validate_responses"):
+        yield None
+        return
+    # looked up lazily so that offline tests do not depend on the API client
+    api_client = request.getfixturevalue("api_client")
+    hook = ResponseSchemaHook(request.getfixturevalue("swagger_spec"), sample=pytestconfig.getoption("schema_sample"))
+    api_client.hooks["response"].append(hook)
+    yield hook
+    api_client.hooks["response"].remove(hook)
+
+
+@pytest.fixture(scope="session")
+def schema_sample(pytestconfig):
+    """Fraction of collection items bulk validation checks beyond the always-checked head."""
+    return pytestconfig.getoption("schema_sample")
+
+
+@pytest.fixture(scope="session")
+def sweep_concurrency(pytestconfig):
+    return pytestconfig.getoption("sweep_concurrency")
 
 
 @pytest.fixture(scope="session")
@@ -32,14 +582,28 @@ def base_url(swagger_spec):
     return "http://localhost:9966/petclinic"
 
 
+@pytest.fixture(scope="session")
+def unique_ids():
+    return UniqueIds()
+
+
 @pytest.fixture
-def unique_id():
-    # use timestamp-based id to avoid collisions on the test server
-    return int(time.time() * 1000) % 100000000
+def unique_id(request, unique_ids):
+    # run stamp + worker index + counter: no collisions across tests, workers or runs
+    value = unique_ids.next()
+    cassette = _cassette(request.config)
+    if cassette is not None:
+        # replayed request bodies must carry the ids they were recorded with
+        return cassette.value(f"unique_id {request.node.nodeid}", lambda: value)
+    return value
+
+
+def _first_item(items):
+    return next(items, None)
 
 
 @pytest.fixture
-def created_owner(base_url, unique_id):
+def created_owner(reference_data, base_url, unique_id):
     """Return an existing owner if available.
 
     Creating owners via POST may be rejected by the server configuration; to keep
@@ -47,12 +611,13 @@ def created_owner(base_url, unique_id):
     and return its id. If no owner exists, return None.
     """
     try:
-        r = requests.get(f"{base_url}/api/owners", timeout=10)
-        r.raise_for_status()
-        owners = r.json()
-        if owners:
-            owner = owners[0]
+        # streamed: only the list up to the first owner is downloaded
+        owner = reference_data.derive(f"{base_url}/api/owners", "first", _first_item)
+        if owner:
             return {"id": owner.get("id"), "body": owner}
+    except ResponseSchemaError:
+        # with --validate-responses a schema violation fails the dependent tests instead of skipping them
+        raise
     except Exception:
         # discovery failed; return None to indicate we have no owner to use
         return None
@@ -60,7 +625,7 @@ def created_owner(base_url, unique_id):
 
 
 @pytest.fixture
-def created_pet(base_url, created_owner, unique_id):
+def created_pet(reference_data, base_url, created_owner, unique_id):
     """Discover and return an existing pet if available.
 
     Creating pets via POST may require creating owners and/or authentication.
@@ -69,12 +634,41 @@ def created_pet(base_url, created_owner, unique_id):
     If no pet exists, return None.
     """
     try:
-        r = requests.get(f"{base_url}/api/pets", timeout=10)
-        r.raise_for_status()
-        pets = r.json()
-        if pets:
-            pet = pets[0]
+        pet = reference_data.derive(f"{base_url}/api/pets", "first", _first_item)
+        if pet:
             return {"id": pet.get("id"), "body": pet, "owner_id": pet.get("ownerId")}
+    except ResponseSchemaError:
+        raise
     except Exception:
         return None
     return None
+
+
+@pytest.fixture(scope="session")
+def petclinic_snapshot(reference_data, base_url):
+    """Id-keyed snapshot of owners, pets, pet types and visits, checked once per session."""
+    try:
+        return build_snapshot(reference_data.iter, base_url)
+    except requests.RequestException as e:
+        # only an unreachable host skips; malformed lists (JsonStreamError) and schema violations fail
+        pytest.skip(f"Could not load the petclinic dataset: {e}")
+
+
+@pytest.fixture
+def owner_without_pets(petclinic_snapshot):
+    if petclinic_snapshot.owner_without_pets is None:
+        pytest.skip("No owner without pets in the dataset")
+    return petclinic_snapshot.owner_without_pets
+
+
+@pytest.fixture
+def owner_with_most_pets(petclinic_snapshot):
+    if petclinic_snapshot.owner_with_most_pets is None:
+        pytest.skip("No owner with pets in the dataset")
+    return petclinic_snapshot.owner_with_most_pets
+
+
+@pytest.fixture
+def spec_path_params(created_owner, created_pet):
+    """Path parameter values (ownerId, petId, petTypeId, visitId) of existing data."""
+    return discover_path_params(created_owner, created_pet)
@@ -0,0 +1,115 @@
+"""Whole-dataset integrity checks on the in-memory snapshot (utils.snapshot).
+
+The snapshot costs four list requests however many owners there are; the invariants then run
+over every owner, pet and visit at once instead of one GET per owner.
+"""
+import datetime
+
+import pytest
+import requests
+
+from utils.snapshot import PetclinicSnapshot, build_snapshot
+
+
+@pytest.mark.smoke
+def test_dataset_invariants(petclinic_snapshot: PetclinicSnapshot, record_property):
+    """Referential (pet->owner, pet->type, visit->pet) and business invariants over the whole dataset."""
+    record_property("snapshot", petclinic_snapshot.summary(examples=0))
+    assert not petclinic_snapshot.violations, petclinic_snapshot.summary()
+
+
+def test_owner_with_most_pets_matches_api(api_client, base_url, petclinic_snapshot, owner_with_most_pets):
+    r = api_client.get(f"{base_url}/api/owners/{owner_with_most_pets}")
+    assert r.status_code == 200
+    pet_ids = {p["id"] for p in r.json().get("pets") or []}
+    assert pet_ids == set(petclinic_snapshot.owners[owner_with_most_pets].pet_ids)
+    assert len(pet_ids) == max(len(o.pet_ids) for o in petclinic_snapshot.owners.values())
+
+
+def test_owner_without_pets_matches_api(api_client, base_url, owner_without_pets):
+    r = api_client.get(f"{base_url}/api/owners/{owner_without_pets}")
+    assert r.status_code == 200
+    assert not r.json().get("pets")
+
+
+# -- the snapshot itself, on inline data --------------------------------------------------------
+
+PETTYPES = [{"id": 1, "name": "cat"}, {"id": 2, "name": "dog"}]
+VISITS = [{"id": 1, "petId": 1, "date": "2021-01-01"}]
+PETS = [
+    {"id": 1, "ownerId": 1, "birthDate": "2020-01-01", "type": {"id": 1}, "visits": VISITS},
+    {"id": 2, "ownerId": 1, "birthDate": "2019-05-05", "type": {"id": 2}, "visits": []},
+]
+OWNERS = [
+    {"id": 1, "firstName": "George", "lastName": "Franklin", "address": "a", "city": "c", "telephone": "6085551023", "pets": PETS},
+    {"id": 2, "firstName": "Betty", "lastName": "Davis", "address": "a", "city": "c", "telephone": "6085551749", "pets": []},
+]
+
+
+def _source(data):
+    return lambda url: iter(data[url.rsplit("/", 1)[1]])
+
+
+def _snapshot(**overrides) -> PetclinicSnapshot:
+    data = dict(pettypes=PETTYPES, visits=VISITS, pets=PETS, owners=OWNERS)
+    data.update(overrides)
+    return build_snapshot(_source(data), "http://test")
+
+
+def test_consistent_data_has_no_violations_and_selectors():
+    snapshot = _snapshot()
+    assert snapshot.violations == []
+    assert snapshot.owner_with_most_pets == 1
+    assert snapshot.owner_without_pets == 2
+    assert snapshot.pet_with_most_visits == 1
+
+
+def test_broken_references_and_rules_are_all_reported():
+    future = (datetime.date.today() + datetime.timedelta(days=30)).isoformat()
+    pets = PETS + [
+        {"id": 3, "ownerId": 99, "birthDate": future, "type": {"id": 7}, "visits": []},
+        {"id": 4, "ownerId": 2, "birthDate": "2022-01-01", "type": {"id": 1}, "visits": []},
+    ]
+    visits = VISITS + [{"id": 2, "petId": 42, "date": "2021-01-01"}, {"id": 3, "petId": 2, "date": "2010-01-01"}]
+    owners = OWNERS[:1] + [dict(OWNERS[1], telephone="608-555")]
+    rules = {(v.rule, v.id) for v in _snapshot(pets=pets, visits=visits, owners=owners).violations}
+    assert rules == {
+        ("pet.owner", 3),  # unknown owner
+        ("pet.type", 3),  # unknown pet type
+        ("pet.birthDate", 3),  # born in the future
+        ("owner.telephone", 2),
+        ("owner.pets", 2),  # pet 4 points at owner 2, which does not embed it
+        ("visit.pet", 2),  # unknown pet
+        ("visit.date", 3),  # before the pet was born
+    }
+
+
+def test_missing_list_endpoint_falls_back_to_embedded_rows():
+    def source(url):
+        if url.endswith("/visits"):
+            raise requests.HTTPError("404")
+        return _source(dict(pettypes=PETTYPES, pets=PETS, owners=OWNERS))(url)
+
+    snapshot = build_snapshot(source, "http://test")
+    assert snapshot.missing == ["visits"]
+    assert set(snapshot.visits) == {1}
+    assert snapshot.violations == []
+
+
+def test_large_dataset_is_checked_in_one_pass():
+    n = 20000
+    pettypes = [{"id": i, "name": f"t{i}"} for i in range(1, 7)]
+    pets = [
+        {"id": i, "ownerId": i // 2 + 1, "birthDate": "2018-03-04", "type": {"id": i % 6 + 1},
+         "visits": [{"id": i, "petId": i, "date": "2019-03-04"}]}
+        for i in range(1, n + 1)
+    ]
+    owners = [
+        {"id": o, "firstName": "A", "lastName": "B", "address": "a", "city": "c", "telephone": "1",
+         "pets": [p for p in pets if p["ownerId"] == o] if o < 3 else []}
+        for o in range(1, n // 2 + 2)
+    ]
+    # only two owners embed their pets: every other pet is reported as not embedded
+    snapshot = _snapshot(pettypes=pettypes, pets=pets, owners=owners, visits=[v for p in pets for v in p["visits"]])
+    assert len(snapshot.pets) == n and len(snapshot.visits) == n
+    assert {v.rule for v in snapshot.violations} == {"owner.pets"}
@@ -0,0 +1,149 @@
+"""Property-based fuzzing of parameters and bodies generated from the spec (utils.fuzz).
+
+The stand-in tests fuzz a tiny local server with three planted bugs, so CI exercises generation,
+shrinking and the corpus without the petclinic host. test_fuzz_api fuzzes the API under test and
+only runs with --fuzz, e.g.
+
+    pytest tests/test_fuzz.py --fuzz --fuzz-budget 120
+    pytest tests/test_fuzz.py --fuzz --fuzz-methods get,post,put --mock-server
+"""
+import json
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+from utils.fuzz import INT32_MAX, FuzzCase, FuzzCorpus, FuzzGenerator, format_fuzz_report, fuzz, shrink
+from utils.health import Deadline
+from utils.http_client import ApiClient
+from utils.operation_index import get_operation_index
+
+ID = {"type": "integer", "format": "int32", "minimum": 0}
+
+STAND_IN_SPEC = {
+    "openapi": "3.0.1",
+    "paths": {
+        "/api/owners": {
+            "get": {
+                "parameters": [{"name": "lastName", "in": "query", "schema": {"type": "string", "maxLength": 30}}],
+                "responses": {"200": {"description": "ok"}},
+            },
+        },
+        "/api/owners/{ownerId}": {
+            "get": {
+                "parameters": [{"name": "ownerId", "in": "path", "required": True, "schema": ID}],
+                "responses": {"200": {"description": "ok"}, "404": {"description": "not found"}},
+            },
+        },
+        "/api/pettypes": {
+            "post": {
+                "requestBody": {"content": {"application/json": {"schema": {
+                    "type": "object",
+                    "required": ["name"],
+                    "properties": {"name": {"type": "string", "minLength": 1, "maxLength": 80}},
+                }}}},
+                "responses": {"201": {"description": "created"}},
+            },
+        },
+    },
+}
+
+
+def _route(method, path, raw_body):
+    """Validates like the real service, except for three planted bugs that answer 500."""
+    url = urlsplit(path)
+    if method == "POST":
+        body = json.loads(raw_body or b"null")
+        if not isinstance(body, dict) or "name" not in body:
+            return 400, {"error": "name is required"}
+        if isinstance(body["name"], (int, float)):
+            return 500, {"error": "ClassCastException"}  # planted
+        if not isinstance(body["name"], str) or not 1 <= len(body["name"]) <= 80:
+            return 400, {"error": "invalid name"}
+        return 201, {"id": 5, "name": body["name"]}
+    if url.path == "/api/owners":
+        last_name = parse_qs(url.query).get("lastName", [""])[0]
+        if len(last_name) > 30:
+            return 500, {"error": "value too long for column"}  # planted
+        return 200, []
+    if url.path.startswith("/api/owners/"):
+        raw = unquote(url.path.rsplit("/", 1)[1])
+        if not raw.lstrip("-").isdigit():
+            return 400, {"error": "not an integer"}
+        if int(raw) > INT32_MAX:
+            return 500, {"error": "NumberFormatException"}  # planted
+        return (404 if int(raw) != 1 else 200), {"id": int(raw)}
+    return 404, {"error": "not found"}
+
+
+@pytest.fixture(scope="module")
+def stand_in_url(stand_in_server):
+    return stand_in_server(_route)
+
+
+def test_generator_is_deterministic_and_covers_edges():
+    op = get_operation_index(STAND_IN_SPEC).get("/api/owners/{ownerId}", "get")
+    first, again = FuzzGenerator(STAND_IN_SPEC, seed=3), FuzzGenerator(STAND_IN_SPEC, seed=3)
+    assert [first.case(op).canonical() for _ in range(20)] == [again.case(op).canonical() for _ in range(20)]
+    generator = FuzzGenerator(STAND_IN_SPEC, seed=1)
+    ids = {json.dumps(generator.case(op).path_params["ownerId"]) for _ in range(300)}
+    assert {"-1", str(INT32_MAX + 1), '"abc"'} <= ids
+
+
+def test_shrink_finds_minimal_failing_input():
+    case = FuzzCase("get", "/api/owners", query={"lastName": "x" * 500, "other": 7})
+    shrunk, steps = shrink(case, lambda c: len(c.query.get("lastName", "")) > 30)
+    assert shrunk.query == {"lastName": "x" * 31}
+    assert steps > 0
+
+
+def test_fuzz_finds_and_shrinks_planted_bugs(stand_in_client, stand_in_url, tmp_path, record_property):
+    corpus = FuzzCorpus(str(tmp_path / "corpus"))
+    report = fuzz(stand_in_client, STAND_IN_SPEC, stand_in_url, budget=3.0, concurrency=4,
+                  methods=("get", "post"), corpus=corpus)
+    record_property("fuzz report", format_fuzz_report(report))
+
+    failures = {sig[0]: f.case for sig, f in report.failures.items()}
+    assert set(failures) == {"GET /api/owners", "GET /api/owners/{ownerId}", "POST /api/pettypes"}
+    assert len(failures["GET /api/owners"].query["lastName"]) == 31
+    owner_id = failures["GET /api/owners/{ownerId}"].path_params["ownerId"]
+    assert isinstance(owner_id, int) and owner_id > INT32_MAX
+    assert list(failures["POST /api/pettypes"].body) == ["name"]
+    assert ("GET /api/owners/{ownerId}", 400) in report.coverage
+    assert report.corpus_added >= 3
+
+    # the next run replays the corpus first: every failure is found again before any generation
+    again = fuzz(stand_in_client, STAND_IN_SPEC, stand_in_url, budget=0.0, methods=("get", "post"), corpus=corpus)
+    assert again.replayed == len(corpus.load())
+    assert set(again.failures) == set(report.failures)
+
+
+def test_session_deadline_aborts_the_run(stand_in_url):
+    client = ApiClient(retries=0, deadline=Deadline(1e-9))
+    try:
+        report = fuzz(client, STAND_IN_SPEC, stand_in_url, budget=1.0, concurrency=2, methods=("get",))
+    finally:
+        client.close()
+    assert report.aborted and "deadline" in report.aborted
+    assert not report.failures
+
+
+def test_fuzz_api(pytestconfig, fuzz_client, fuzz_corpus_dir, swagger_spec, base_url, record_property):
+    if not pytestconfig.getoption("fuzz"):
+        pytest.skip("fuzzing the API under test runs only with --fuzz")
+
+    report = fuzz(
+        fuzz_client,
+        swagger_spec,
+        base_url,
+        budget=pytestconfig.getoption("fuzz_budget"),
+        concurrency=pytestconfig.getoption("fuzz_concurrency"),
+        seed=pytestconfig.getoption("fuzz_seed"),
+        methods=pytestconfig.getoption("fuzz_methods").split(","),
+        corpus=FuzzCorpus(fuzz_corpus_dir) if fuzz_corpus_dir else None,
+    )
+    record_property("fuzz report", format_fuzz_report(report))
+    record_property("fuzz requests", report.requests)
+    record_property("fuzz operation_status_pairs", len(report.coverage))
+    if report.aborted:
+        pytest.skip(f"fuzzing aborted: {report.aborted}")
+    assert not report.failures, "\n".join(f"{sig[1]}: {f.case}" for sig, f in report.failures.items())
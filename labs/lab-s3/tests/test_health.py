@@ -0,0 +1,65 @@
+"""Fail-fast guards (utils.health): health probe, circuit breaker and session deadline."""
+import socket
+import time
+
+import pytest
+
+from utils.health import CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, probe
+from utils.http_client import ApiClient
+
+
+@pytest.fixture
+def dead_url():
+    # a port that was just free: connections are refused at once
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/petclinic/v3/api-docs"
+
+
+def test_probe_reports_unreachable_host(dead_url):
+    result = probe(dead_url, timeout=1.0)
+    assert not result.ok
+    assert "ConnectionError" in result.detail
+    assert result.elapsed < 1.0
+
+
+def test_breaker_opens_after_consecutive_failures(dead_url):
+    breaker = CircuitBreaker(threshold=2)
+    client = ApiClient(retries=0, breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(Exception) as exc:
+            client.get(dead_url)
+        assert not isinstance(exc.value, CircuitOpenError)
+    assert breaker.is_open and "2 consecutive connection failures" in breaker.reason
+    with pytest.raises(CircuitOpenError):
+        client.get(dead_url)
+    client.close()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(threshold=2)
+    breaker.failure(OSError("refused"))
+    breaker.success()
+    breaker.failure(OSError("refused"))
+    assert not breaker.is_open
+    assert not CircuitBreaker(threshold=0).is_open
+
+
+def test_tripped_breaker_fails_before_sending():
+    breaker = CircuitBreaker()
+    breaker.trip("health probe failed")
+    breaker.trip("later reason")
+    with pytest.raises(CircuitOpenError, match="health probe failed"):
+        ApiClient(breaker=breaker).get("http://127.0.0.1:9/never-sent")
+
+
+def test_deadline_clamps_timeouts_and_expires():
+    assert Deadline(None).clamp((3.05, 10.0)) == (3.05, 10.0)
+    connect, read = Deadline(1.0).clamp((3.05, 10.0))
+    assert connect <= 1.0 and read <= 1.0
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert deadline.expired
+    with pytest.raises(DeadlineExceeded):
+        ApiClient(deadline=deadline).get("http://127.0.0.1:9/never-sent")
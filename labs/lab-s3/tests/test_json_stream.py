@@ -0,0 +1,93 @@
+"""Streaming JSON array parsing (utils.json_stream) used for large list endpoints."""
+import io
+import json
+
+import pytest
+import requests
+
+from utils.json_stream import JsonStreamError, iter_json_array, iter_json_items
+from utils.operation_index import ResponseSchemaError, ResponseSchemaHook
+
+
+def _response(body: bytes) -> requests.Response:
+    r = requests.Response()
+    r.status_code = 200
+    r.url = "http://test/api/owners"
+    r.raw = io.BytesIO(body)
+    return r
+
+
+ITEMS = [
+    {"id": 1, "firstName": "George", "pets": [{"id": 1, "name": "Leo", "visits": []}]},
+    {"id": 2, "firstName": "José ✓", "note": "a \"quoted\", bracketed ] value"},
+    12345,
+    -1.5e3,
+    None,
+    True,
+    [],
+    {},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 65536])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_items_match_json_loads_for_any_chunking(chunk_size, indent):
+    body = json.dumps(ITEMS, indent=indent, ensure_ascii=False).encode("utf-8")
+    assert list(iter_json_array(_response(body), chunk_size=chunk_size)) == ITEMS
+
+
+def test_empty_array():
+    assert list(iter_json_array(_response(b" [ ] "), chunk_size=1)) == []
+
+
+def test_stops_reading_at_first_match():
+    body = json.dumps([{"id": i} for i in range(100000)]).encode("utf-8")
+    raw = io.BytesIO(body)
+    r = _response(b"")
+    r.raw = raw
+    first = next(item for item in iter_json_array(r, chunk_size=4096) if item["id"] == 3)
+    assert first == {"id": 3}
+    assert raw.tell() == 4096, "only the first chunk should have been read"
+
+
+@pytest.mark.parametrize("body", [b'{"id": 1}', b"[1, 2", b"[1 2]", b"", b"[1,]"])
+def test_malformed_bodies_raise(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array(_response(body), chunk_size=2))
+
+
+def test_not_an_array_raises_stream_error():
+    with pytest.raises(JsonStreamError):
+        list(iter_json_array(_response(b'{"id": 1}')))
+
+
+OWNERS_SPEC = {
+    "paths": {"/api/owners": {"get": {"responses": {"200": {"description": "ok", "content": {"application/json": {
+        "schema": {"type": "array", "items": {"type": "object", "required": ["id"]}}}}}}}}},
+}
+
+
+@pytest.fixture(scope="module")
+def invalid_owners_url(stand_in_server):
+    return stand_in_server(lambda method, path, body: (200, [{"id": 1}, {"id": 2}, {"name": "no id"}]))
+
+
+@pytest.fixture
+def validating_client(stand_in_client):
+    hook = ResponseSchemaHook(OWNERS_SPEC, sample=1.0)
+    stand_in_client.hooks["response"].append(hook)
+    yield stand_in_client
+    stand_in_client.hooks["response"].remove(hook)
+
+
+def test_schema_hook_validates_plain_responses(validating_client, invalid_owners_url):
+    with pytest.raises(ResponseSchemaError, match="missing|required"):
+        validating_client.get(f"{invalid_owners_url}/api/owners")
+
+
+def test_schema_hook_leaves_streamed_body_to_the_parser(validating_client, invalid_owners_url):
+    # the hook must not read the body: the first items arrive before the invalid one is reached
+    items = iter_json_items(validating_client, f"{invalid_owners_url}/api/owners")
+    assert next(items) == {"id": 1}
+    with pytest.raises(ResponseSchemaError, match="item 2"):
+        list(items)
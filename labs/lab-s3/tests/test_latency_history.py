@@ -0,0 +1,93 @@
+"""Request timings, the latency history and regression detection against a rolling baseline (utils.latency)."""
+import random
+import time
+
+import pytest
+
+from utils.http_client import ApiClient
+from utils.latency import LatencyHistory, LatencyRecorder, format_comparison, mann_whitney_greater
+from utils.operation_index import get_operation_index
+
+STAND_IN_SPEC = {
+    "openapi": "3.0.1",
+    "paths": {
+        "/api/pettypes": {"get": {"responses": {"200": {"description": "ok"}}}},
+        "/api/owners/{ownerId}": {"get": {"responses": {"200": {"description": "ok"}}}},
+    },
+}
+
+
+def _route(method, path, body):
+    if path.startswith("/api/owners/"):
+        time.sleep(0.02)
+    return 200, [{"id": 1, "name": "cat"}]
+
+
+@pytest.fixture(scope="module")
+def stand_in_url(stand_in_server):
+    return stand_in_server(_route)
+
+
+def test_client_times_connect_ttfb_and_total(stand_in_url):
+    recorder = LatencyRecorder()
+    client = ApiClient(retries=0, latency=recorder)
+    first = client.get(f"{stand_in_url}/api/owners/1")
+    second = client.get(f"{stand_in_url}/api/owners/1")
+    client.get(f"{stand_in_url}/not-in-the-spec")
+    client.close()
+
+    assert first.timing.connect > 0, "the first request opens the connection"
+    assert second.timing.connect == 0, "the second one reuses it"
+    for r in (first, second):
+        assert r.timing.connect <= r.timing.ttfb <= r.timing.total
+        assert r.timing.ttfb >= 0.02
+    rows = recorder.by_operation(get_operation_index(STAND_IN_SPEC))
+    assert [row[0] for row in rows] == ["GET /api/owners/{ownerId}"] * 2
+
+
+def test_mann_whitney_matches_reference_values():
+    # exact one-sided p for complete separation of 3 vs 3 is 1/20; the approximation is close
+    u, p = mann_whitney_greater([4, 5, 6], [1, 2, 3])
+    assert u == 9 and p == pytest.approx(0.0404, abs=1e-3)
+    assert mann_whitney_greater([1, 2, 3], [4, 5, 6])[1] > 0.95
+    # ties: identical samples are never "greater"
+    assert mann_whitney_greater([5] * 20, [5] * 20)[1] == 1.0
+    rng = random.Random(0)
+    same = mann_whitney_greater([rng.gauss(10, 1) for _ in range(200)], [rng.gauss(10, 1) for _ in range(200)])[1]
+    assert 0.01 < same < 0.99
+
+
+def _run(history, run, ms_by_operation, seed):
+    rng = random.Random(seed)
+    rows = [
+        (operation, 0.0, rng.gauss(ms, ms * 0.1), rng.gauss(ms, ms * 0.1) + 1.0)
+        for operation, ms in ms_by_operation.items()
+        for _ in range(30)
+    ]
+    history.add(run, "petclinic", rows)
+
+
+def test_regression_is_flagged_against_rolling_baseline(tmp_path, record_property):
+    history = LatencyHistory(str(tmp_path / "history.sqlite"), keep_runs=5)
+    for i in range(6):
+        _run(history, f"base{i}", {"GET /api/owners": 20.0, "GET /api/pettypes": 5.0}, seed=i)
+        time.sleep(0.01)
+    _run(history, "now", {"GET /api/owners": 30.0, "GET /api/pettypes": 5.2}, seed=99)
+
+    results = {c.operation: c for c in history.compare("now", baseline_runs=3)}
+    record_property("latency comparison", format_comparison(list(results.values())))
+    assert results["GET /api/owners"].regressed
+    assert results["GET /api/owners"].baseline_samples == 90
+    assert not results["GET /api/pettypes"].regressed, "4% slower is below the threshold"
+
+    # only keep_runs runs are kept
+    assert history._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 5
+    history.close()
+
+
+def test_first_run_has_no_baseline(tmp_path):
+    history = LatencyHistory(str(tmp_path / "history.sqlite"))
+    _run(history, "first", {"GET /api/owners": 20.0}, seed=1)
+    assert history.compare("first") == []
+    assert history.compare("unknown-run") == []
+    history.close()
@@ -0,0 +1,102 @@
+"""Load mode: latency percentiles, throughput and error rates per operation with SLO gates.
+
+The stand-in tests start a tiny local server so CI exercises the load runner without the
+petclinic host. test_load_slo drives the real API and only runs with --load, e.g.
+
+    pytest tests/test_load.py --load --load-duration 60 --load-rate 50 --load-slo "p99<500ms"
+"""
+import time
+
+import pytest
+
+from utils.load import check_slos, format_load_report, parse_mix, parse_slo, run_load
+from utils.operation_index import get_operation_index
+from utils.sweep import build_calls
+
+DEFAULT_SLOS = ["p95<200ms", "error_rate<1%"]
+
+STAND_IN_SPEC = {
+    "openapi": "3.0.1",
+    "servers": [{"url": "http://127.0.0.1/petclinic"}],
+    "paths": {
+        "/api/pettypes": {"get": {"responses": {"200": {"description": "ok"}}}},
+        "/api/owners/{ownerId}": {"get": {"responses": {"200": {"description": "ok"}}}},
+        "/api/visits": {"get": {"responses": {"200": {"description": "ok"}}}},
+    },
+}
+
+
+def _route(method, path, body):
+    if path == "/petclinic/api/pettypes":
+        return 200, [{"id": 1, "name": "cat"}, {"id": 2, "name": "dog"}]
+    if path.startswith("/petclinic/api/owners/"):
+        time.sleep(0.005)
+        return 200, {"id": 1, "firstName": "George"}
+    return 500, {"error": "stand-in failure"}
+
+
+@pytest.fixture(scope="module")
+def stand_in_url(stand_in_server):
+    return f"{stand_in_server(_route)}/petclinic"
+
+
+@pytest.fixture(scope="module")
+def stand_in_calls(stand_in_url):
+    calls, _ = build_calls(get_operation_index(STAND_IN_SPEC).operations(method="get"), stand_in_url, {"ownerId": 1})
+    return calls
+
+
+def test_closed_loop_reports_percentiles_per_operation(stand_in_client, stand_in_calls, record_property):
+    mix = parse_mix("GET /api/pettypes=3, GET /api/owners/{ownerId}=1")
+    report = run_load(stand_in_client, stand_in_calls, duration=1.0, concurrency=4, mix=mix)
+    record_property("load report", format_load_report(report))
+
+    assert set(report.operations) == {"GET /api/pettypes", "GET /api/owners/{ownerId}"}
+    owners = report.operations["GET /api/owners/{ownerId}"].histogram
+    assert owners.percentile(50) >= 5.0, "stand-in sleeps 5ms per owner request"
+    assert owners.percentile(50) <= owners.percentile(95) <= owners.percentile(99) <= owners.max / 1000.0
+    assert report.operations["GET /api/pettypes"].requests > report.operations["GET /api/owners/{ownerId}"].requests
+    assert check_slos(report, [parse_slo(s) for s in DEFAULT_SLOS]) == []
+
+
+def test_open_loop_holds_target_rate(stand_in_client, stand_in_calls):
+    report = run_load(stand_in_client, stand_in_calls, duration=1.0, concurrency=4, rate=50, mix=parse_mix("GET /api/pettypes"))
+    # open loop: every slot scheduled within the duration is sent, however late a busy runner sends it
+    assert report.total.requests == 50
+    # the last slot is scheduled at 49/50 s; the run cannot end before it
+    assert report.duration >= 0.98
+
+
+def test_slo_violations_fail_the_run(stand_in_client, stand_in_calls):
+    report = run_load(stand_in_client, stand_in_calls, duration=0.3, concurrency=2, mix=parse_mix("GET /api/visits"))
+    stats = report.operations["GET /api/visits"]
+    assert stats.error_rate == 1.0
+    assert stats.errors.most_common(1)[0][0] == "unexpected-status: 500"
+    violations = check_slos(report, [parse_slo(s) for s in DEFAULT_SLOS + ["GET /api/pettypes: p99<1s"]])
+    assert any("error_rate" in v for v in violations)
+    assert any("not called" in v for v in violations)
+
+
+def test_load_slo(pytestconfig, load_client, swagger_spec, base_url, spec_path_params, record_property):
+    if not pytestconfig.getoption("load"):
+        pytest.skip("load test against the API under test runs only with --load")
+
+    ops = get_operation_index(swagger_spec).operations(method="get")
+    calls, _ = build_calls(ops, base_url, spec_path_params)
+    mix = pytestconfig.getoption("load_mix")
+    report = run_load(
+        load_client,
+        calls,
+        duration=pytestconfig.getoption("load_duration"),
+        concurrency=pytestconfig.getoption("load_concurrency"),
+        rate=pytestconfig.getoption("load_rate"),
+        mix=parse_mix(mix) if mix else None,
+    )
+    record_property("load report", format_load_report(report))
+    for name, stats in report.operations.items():
+        record_property(f"load {name} p95_ms", round(stats.histogram.percentile(95), 1))
+    record_property("load throughput_rps", round(report.throughput(), 1))
+
+    slos = [parse_slo(s) for s in pytestconfig.getoption("load_slo") or DEFAULT_SLOS]
+    violations = check_slos(report, slos)
+    assert not violations, "SLO violations:\n  " + "\n  ".join(violations)
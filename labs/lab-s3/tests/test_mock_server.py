@@ -0,0 +1,202 @@
+"""Mock petclinic generated from the spec: seeded data, CRUD flows, errors and injected faults.
+
+These tests run the mock on a compact petclinic-shaped spec, so they need no network. To run the
+whole suite against the mock use ``pytest --mock-server``.
+"""
+import time
+
+import pytest
+
+from utils.http_client import ApiClient
+from utils.mock_server import MockApi, MockServer
+from utils.openapi_utils import validate_response, validate_response_collection
+
+
+def _ok(schema, status="200"):
+    return {status: {"description": "ok", "content": {"application/json": {"schema": schema}}}}
+
+
+def _ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def _body(name):
+    return {"content": {"application/json": {"schema": _ref(name)}}}
+
+
+MISSING = {"404": {"description": "not found"}}
+ID = {"type": "integer", "format": "int32", "minimum": 0}
+
+MINI_SPEC = {
+    "openapi": "3.0.1",
+    "servers": [{"url": "http://localhost:9966/petclinic"}],
+    "paths": {
+        "/api/pettypes": {
+            "get": {"responses": _ok({"type": "array", "items": _ref("PetType")})},
+            "post": {"requestBody": _body("PetTypeFields"), "responses": _ok(_ref("PetType"), "201")},
+        },
+        "/api/pettypes/{petTypeId}": {
+            "get": {"responses": dict(_ok(_ref("PetType")), **MISSING)},
+            "put": {"requestBody": _body("PetType"), "responses": dict({"204": {"description": "updated"}}, **MISSING)},
+            "delete": {"responses": dict({"204": {"description": "deleted"}}, **MISSING)},
+        },
+        "/api/owners": {
+            "get": {
+                "parameters": [{"name": "lastName", "in": "query", "schema": {"type": "string"}}],
+                "responses": _ok({"type": "array", "items": _ref("Owner")}),
+            },
+        },
+        "/api/owners/{ownerId}": {"get": {"responses": dict(_ok(_ref("Owner")), **MISSING)}},
+        "/api/owners/{ownerId}/pets": {
+            "post": {"requestBody": _body("PetFields"), "responses": dict(_ok(_ref("Pet"), "201"), **MISSING)},
+        },
+        "/api/pets": {"get": {"responses": _ok({"type": "array", "items": _ref("Pet")})}},
+    },
+    "components": {
+        "schemas": {
+            "PetTypeFields": {
+                "type": "object",
+                "required": ["name"],
+                "properties": {"name": {"type": "string", "minLength": 1, "maxLength": 80}},
+            },
+            "PetType": {"allOf": [_ref("PetTypeFields"), {"type": "object", "required": ["id"], "properties": {"id": ID}}]},
+            "Owner": {
+                "type": "object",
+                "required": ["id", "firstName", "lastName", "telephone", "pets"],
+                "properties": {
+                    "id": ID,
+                    "firstName": {"type": "string", "minLength": 1, "maxLength": 30, "pattern": "^[a-zA-Z]*$"},
+                    "lastName": {"type": "string", "minLength": 1, "maxLength": 30, "pattern": "^[a-zA-Z]*$"},
+                    "telephone": {"type": "string", "minLength": 1, "maxLength": 20, "pattern": "^[0-9]*$"},
+                    "pets": {"type": "array", "items": _ref("Pet")},
+                },
+            },
+            "PetFields": {
+                "type": "object",
+                "required": ["name", "birthDate", "type"],
+                "properties": {
+                    "name": {"type": "string", "maxLength": 30},
+                    "birthDate": {"type": "string", "format": "date"},
+                    "type": _ref("PetType"),
+                },
+            },
+            "Pet": {
+                "allOf": [
+                    _ref("PetFields"),
+                    {"type": "object", "required": ["id", "ownerId"], "properties": {"id": ID, "ownerId": ID}},
+                ]
+            },
+        }
+    },
+}
+
+
+@pytest.fixture
+def mock():
+    with MockServer(MockApi(MINI_SPEC, seed_count=4)) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def mock_client():
+    # a plain client: mock traffic is local and never belongs in a cassette
+    client = ApiClient(retries=0)
+    yield client
+    client.close()
+
+
+def test_serves_spec_pointing_at_the_mock(mock, mock_client):
+    r = mock_client.get(mock.spec_url)
+    assert r.status_code == 200
+    assert r.json()["servers"] == [{"url": mock.url}]
+    assert mock.url.endswith("/petclinic")
+
+
+@pytest.mark.parametrize("path", ["/api/pettypes", "/api/owners", "/api/pets"])
+def test_seeded_lists_match_schemas(mock, mock_client, path):
+    r = mock_client.get(f"{mock.url}{path}")
+    assert r.status_code == 200
+    body = r.json()
+    assert len(body) == 4
+    validate_response_collection(body, MINI_SPEC, path, "get", 200, sample=1.0).raise_for_errors()
+
+
+def test_seeded_data_is_deterministic_and_linked(mock, mock_client):
+    assert MockApi(MINI_SPEC, seed_count=4).store == mock.api.store
+    owners = mock_client.get(f"{mock.url}/api/owners").json()
+    assert [o["firstName"] for o in owners] == ["George", "Betty", "Eduardo", "Harold"]
+    # two pets per owner until the pets run out: owners with several pets and owners with none
+    assert [len(o["pets"]) for o in owners] == [2, 2, 0, 0]
+    pettype_ids = {t["id"] for t in mock_client.get(f"{mock.url}/api/pettypes").json()}
+    for owner in owners:
+        for pet in owner["pets"]:
+            assert pet["ownerId"] == owner["id"]
+            assert pet["type"]["id"] in pettype_ids
+
+
+def test_create_update_delete_pettype(mock, mock_client):
+    r = mock_client.post(f"{mock.url}/api/pettypes", json={"name": "ferret"})
+    assert r.status_code == 201
+    created = r.json()
+    assert created == {"name": "ferret", "id": 5}
+    validate_response(created, MINI_SPEC, "/api/pettypes", "post", 201)
+
+    r = mock_client.put(f"{mock.url}/api/pettypes/5", json=dict(created, name="ferret-updated"))
+    assert r.status_code == 204 and not r.content
+    assert mock_client.get(f"{mock.url}/api/pettypes/5").json()["name"] == "ferret-updated"
+
+    assert mock_client.delete(f"{mock.url}/api/pettypes/5").status_code == 204
+    assert mock_client.get(f"{mock.url}/api/pettypes/5").status_code == 404
+    assert len(mock_client.get(f"{mock.url}/api/pettypes").json()) == 4
+
+
+def test_nested_create_links_to_parent(mock, mock_client):
+    pet = {"name": "Rex", "birthDate": "2020-02-02", "type": {"id": 2, "name": "dog"}}
+    r = mock_client.post(f"{mock.url}/api/owners/3/pets", json=pet)
+    assert r.status_code == 201
+    assert r.json()["ownerId"] == 3
+    owner = mock_client.get(f"{mock.url}/api/owners/3").json()
+    assert [p["name"] for p in owner["pets"]] == ["Rex"]
+    validate_response(owner, MINI_SPEC, "/api/owners/{ownerId}", "get", 200)
+
+    assert mock_client.post(f"{mock.url}/api/owners/99/pets", json=pet).status_code == 404
+
+
+def test_query_parameters_filter_lists(mock, mock_client):
+    owners = mock_client.get(f"{mock.url}/api/owners", params={"lastName": "dav"}).json()
+    assert [o["lastName"] for o in owners] == ["Davis"]
+    # undeclared parameters are ignored
+    assert len(mock_client.get(f"{mock.url}/api/pettypes", params={"unknownParam": "x"}).json()) == 4
+
+
+@pytest.mark.parametrize(
+    "method, path, body, status",
+    [
+        ("GET", "/api/pettypes/abc", None, 400),
+        ("GET", "/api/pettypes/-1", None, 404),
+        ("GET", "/api/pettypes/2147483647", None, 404),
+        ("POST", "/api/pettypes", {"nom": "x"}, 400),
+        ("DELETE", "/api/owners/1", None, 405),
+        ("GET", "/api/unknown", None, 404),
+    ],
+)
+def test_client_errors(mock, mock_client, method, path, body, status):
+    r = mock_client.request(method, f"{mock.url}{path}", json=body)
+    assert r.status_code == status
+    assert r.json()["status"] == status
+
+
+def test_not_acceptable_for_non_json_accept(mock, mock_client):
+    assert mock_client.get(f"{mock.url}/api/pettypes", headers={"Accept": "text/plain"}).status_code == 406
+
+
+def test_injected_latency_and_errors(mock_client):
+    with MockServer(MockApi(MINI_SPEC, latency=0.05)) as slow:
+        start = time.perf_counter()
+        assert mock_client.get(f"{slow.url}/api/pettypes").status_code == 200
+        assert time.perf_counter() - start >= 0.05
+
+    with MockServer(MockApi(MINI_SPEC, error_rate=0.5, seed=1)) as flaky:
+        statuses = [mock_client.get(f"{flaky.url}/api/pettypes").status_code for _ in range(40)]
+        assert set(statuses) == {200, 500}
+        assert 10 <= statuses.count(500) <= 30
@@ -0,0 +1,82 @@
+"""Compiled validators of utils.openapi_utils: OpenAPI dialects, nullable, $ref fragments, patterns and caching."""
+import copy
+
+import jsonschema
+import pytest
+
+from utils.openapi_utils import ValidatorRegistry, get_validator_registry, python_pattern, validate_against_schema
+
+
+def _spec(version, owner_extra=None):
+    owner = {
+        "type": "object",
+        "required": ["id", "firstName"],
+        "properties": {
+            "id": {"type": "integer"},
+            "firstName": {"type": "string", "pattern": "^[\\p{L}]+([ '-][\\p{L}]+){0,2}\\.?$"},
+            "nickname": {"type": "string", "nullable": True},
+            "pet": {"$ref": "#/components/schemas/Pet"},
+        },
+    }
+    owner["properties"].update(owner_extra or {})
+    return {
+        "openapi": version,
+        "paths": {
+            "/api/owners": {"get": {"responses": {"200": {"description": "ok", "content": {"application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Owner"}}}}}}}},
+        },
+        "components": {"schemas": {"Owner": owner, "Pet": {"type": "object", "required": ["name"]}}},
+    }
+
+
+def test_dialect_follows_openapi_version():
+    assert ValidatorRegistry(_spec("3.0.1")).validator_cls is jsonschema.Draft4Validator
+    assert ValidatorRegistry(_spec("3.1.0")).validator_cls is jsonschema.Draft202012Validator
+    assert ValidatorRegistry({"swagger": "2.0", "paths": {}}).validator_cls is jsonschema.Draft4Validator
+
+
+def test_nullable_is_honoured_only_before_3_1():
+    owner = {"id": 1, "firstName": "George", "nickname": None}
+    get_validator_registry(_spec("3.0.1")).validate([owner], "/api/owners", "get", 200)
+    # 3.1 spells it type: [string, "null"]; a leftover nullable keyword does not allow null
+    with pytest.raises(jsonschema.ValidationError):
+        get_validator_registry(_spec("3.1.0")).validate([owner], "/api/owners", "get", 200)
+    spec = _spec("3.1.0", {"nickname": {"type": ["string", "null"]}})
+    get_validator_registry(spec).validate([owner], "/api/owners", "get", 200)
+
+
+def test_refs_resolve_from_schema_fragments():
+    spec = _spec("3.0.1")
+    owner_schema = spec["components"]["schemas"]["Owner"]
+    validate_against_schema({"id": 1, "firstName": "Jean", "pet": {"name": "Leo"}}, owner_schema, spec)
+    with pytest.raises(jsonschema.ValidationError, match="'name' is a required property"):
+        validate_against_schema({"id": 1, "firstName": "Jean", "pet": {}}, owner_schema, spec)
+
+
+@pytest.mark.parametrize("name, valid", [
+    ("George", True), ("José", True), ("Jean-Luc", True), ("Ærøskøbing", True), ("Дмитрий", True),
+    ("O'Brien Jr.", True), ("R2D2", False), ("", False), ("a  b", False),
+])
+def test_unicode_letter_patterns_are_translated(name, valid):
+    registry = get_validator_registry(_spec("3.0.1"))
+    item = registry.item_validator_for("/api/owners", "get", 200)
+    assert item.is_valid({"id": 1, "firstName": name}) is valid
+
+
+def test_python_pattern_inside_and_outside_classes():
+    assert python_pattern("^[a-z]+$") == "^[a-z]+$"
+    assert python_pattern("^\\p{L}+$") == "^[^\\W\\d_]+$"
+    assert python_pattern("^[\\p{L} ]+$").startswith("^[A-Za-z")
+
+
+def test_registry_and_validators_are_reused_until_the_spec_is_replaced():
+    spec = _spec("3.0.1")
+    registry = get_validator_registry(spec)
+    assert get_validator_registry(spec) is registry
+    assert registry.validator_for("/api/owners", "get", 200) is registry.validator_for("/api/owners", "get", 200)
+    fragment = spec["components"]["schemas"]["Pet"]
+    assert registry.validator_for_schema(fragment) is registry.validator_for_schema(fragment)
+
+    replaced = copy.deepcopy(spec)
+    assert get_validator_registry(replaced) is not registry
+    assert get_validator_registry(replaced).spec is replaced
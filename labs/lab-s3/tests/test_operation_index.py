@@ -0,0 +1,71 @@
+"""Routing concrete URLs to spec operations with the trie of utils.operation_index, and its per-spec cache."""
+import copy
+
+import pytest
+
+from utils import operation_index
+from utils.operation_index import OperationIndex, get_operation_index
+
+SPEC = {
+    "openapi": "3.0.1",
+    "servers": [{"url": "http://petclinic.example:9966/petclinic"}],
+    "paths": {
+        "/api/pets": {"get": {"responses": {"200": {"description": "ok"}}}},
+        "/api/pets/pettypes": {"get": {"responses": {"200": {"description": "ok"}}}},
+        "/api/pets/{petId}": {
+            "get": {"responses": {"200": {"description": "ok"}}},
+            "delete": {"responses": {"204": {"description": "ok"}}},
+        },
+        "/api/owners/{ownerId}/pets/{petId}": {"get": {"responses": {"200": {"description": "ok"}}}},
+    },
+}
+
+
+@pytest.fixture
+def index():
+    return OperationIndex(SPEC)
+
+
+def _route(index, method, url):
+    match = index.match(method, url)
+    return (match.operation.path, match.path_params) if match else None
+
+
+def test_literal_segment_wins_over_parameter(index):
+    assert _route(index, "get", "/api/pets/pettypes") == ("/api/pets/pettypes", {})
+    assert _route(index, "get", "/api/pets/7") == ("/api/pets/{petId}", {"petId": "7"})
+    assert _route(index, "get", "/api/owners/3/pets/7") == ("/api/owners/{ownerId}/pets/{petId}", {"ownerId": "3", "petId": "7"})
+
+
+def test_server_base_path_is_stripped(index):
+    assert _route(index, "get", "http://petclinic.example:9966/petclinic/api/pets/7") == ("/api/pets/{petId}", {"petId": "7"})
+    assert _route(index, "get", "/petclinic/api/pets?page=2") == ("/api/pets", {})
+    # only a whole leading segment is a base path
+    assert _route(index, "get", "/petclinicx/api/pets") is None
+
+
+def test_method_must_be_declared(index):
+    assert _route(index, "DELETE", "/api/pets/7") == ("/api/pets/{petId}", {"petId": "7"})
+    assert index.match("delete", "/api/pets/pettypes") is None
+    assert index.match("post", "/api/pets/7") is None
+    assert index.match("get", "/api/pets/7/visits") is None
+
+
+def test_trailing_slashes_are_ignored(index):
+    assert _route(index, "get", "/api/pets/") == ("/api/pets", {})
+    assert _route(index, "get", "/petclinic/api/pets/7/") == ("/api/pets/{petId}", {"petId": "7"})
+
+
+def test_index_is_cached_per_spec_object(monkeypatch):
+    monkeypatch.setattr(operation_index, "_INDEXES", type(operation_index._INDEXES)())
+    spec = copy.deepcopy(SPEC)
+    cached = get_operation_index(spec)
+    assert get_operation_index(spec) is cached
+
+    # a replaced spec may reuse the id of a collected one; the stale index must not be served for it
+    replaced = copy.deepcopy(SPEC)
+    del replaced["paths"]["/api/pets/pettypes"]
+    operation_index._INDEXES[id(replaced)] = cached
+    fresh = get_operation_index(replaced)
+    assert fresh is not cached and fresh.spec is replaced
+    assert _route(fresh, "get", "/api/pets/pettypes") == ("/api/pets/{petId}", {"petId": "pettypes"})
@@ -1,25 +1,69 @@
 import requests
 import pytest
 import datetime
-from typing import Any
+from typing import Any, Iterator
 
+from utils.http_client import ApiClient
+from utils.reference_cache import ReferenceDataCache
+from utils.openapi_utils import validate_response_collection
+from utils.operation_index import ResponseSchemaError
 
-def _fetch_owners(base_url: str) -> list:
-    r = requests.get(f"{base_url}/api/owners", timeout=10)
-    r.raise_for_status()
-    return r.json()
 
+MAX_EXISTING_OWNERS = 15
 
-def _get_pettypes_map(base_url: str) -> dict:
-    r = requests.get(f"{base_url}/api/pettypes", timeout=10)
-    if r.status_code != 200:
-        return {}
-    items = r.json()
-    return {int(i.get("id")): i for i in items if i.get("id") is not None}
+
+def _summarize_owners(owners: Iterator[dict]) -> dict:
+    """Pick the owner ids the cases need, reading the (streamed) list only as far as necessary."""
+    existing_ids = []
+    owner_with_no_pets = None
+    owner_with_many_pets = None
+    for o in owners:
+        oid = o.get("id")
+        if oid is None:
+            continue
+        if len(existing_ids) < MAX_EXISTING_OWNERS:
+            existing_ids.append(int(oid))
+        pets = o.get("pets") or []
+        if not owner_with_no_pets and not pets:
+            owner_with_no_pets = int(oid)
+        if not owner_with_many_pets and len(pets) > 1:
+            owner_with_many_pets = int(oid)
+        if len(existing_ids) == MAX_EXISTING_OWNERS and owner_with_no_pets and owner_with_many_pets:
+            break
+    return {"existing_ids": existing_ids, "no_pets": owner_with_no_pets, "many_pets": owner_with_many_pets}
+
+
+def _owner_candidates(reference_data: ReferenceDataCache, base_url: str) -> dict:
+    return reference_data.derive(f"{base_url}/api/owners", "business-case-candidates", _summarize_owners)
+
+
+def _get_pettype_ids(reference_data: ReferenceDataCache, base_url: str) -> set:
+    try:
+        ids = reference_data.derive(
+            f"{base_url}/api/pettypes", "ids", lambda items: [int(i["id"]) for i in items if i.get("id") is not None]
+        )
+    except requests.HTTPError:
+        return set()
+    return set(ids)
+
+
+@pytest.mark.smoke
+def test_owner_list_matches_schema(reference_data: ReferenceDataCache, base_url: str, swagger_spec: Any, schema_sample: float):
+    """Every owner returned by GET /api/owners (sampled, see --schema-sample) must match the owner schema."""
+    try:
+        # streamed and validated item by item: memory stays flat however many owners there are
+        owners = reference_data.iter(f"{base_url}/api/owners")
+        result = validate_response_collection(owners, swagger_spec, "/api/owners", "get", 200, sample=schema_sample)
+    except requests.RequestException as e:
+        # only the download is optional: a malformed stream or a validation crash is a failure
+        pytest.skip(f"Could not fetch owners list: {e}")
+    if result is None:
+        pytest.skip("No array response schema for GET /api/owners")
+    result.raise_for_errors()
 
 
 @pytest.mark.parametrize("case_index", list(range(20)))
-def test_owner_business_cases(case_index: int, base_url: str, swagger_spec: Any, unique_id: int):
+def test_owner_business_cases(case_index: int, api_client: ApiClient, reference_data: ReferenceDataCache, base_url: str, swagger_spec: Any, unique_id: int):
     """
     Execute a broad set of business-oriented checks against GET /api/owners/{ownerId}.
 
@@ -39,35 +83,21 @@ def test_owner_business_cases(case_index: int, base_url: str, swagger_spec: Any,
 
     # Discover existing owners and some special cases
     try:
-        owners = _fetch_owners(base_url)
+        found = _owner_candidates(reference_data, base_url)
+    except ResponseSchemaError:
+        raise
     except Exception as e:
         pytest.skip(f"Could not fetch owners list: {e}")
 
-    existing_ids = []
-    owner_with_no_pets = None
-    owner_with_many_pets = None
-    for o in owners:
-        oid = o.get("id")
-        if oid is None:
-            continue
-        existing_ids.append(int(oid))
-        pets = o.get("pets") or []
-        if not owner_with_no_pets and not pets:
-            owner_with_no_pets = int(oid)
-        if not owner_with_many_pets and len(pets) > 1:
-            owner_with_many_pets = int(oid)
-
     # Build candidate ids list (aim for 20 distinct cases)
-    candidates = []
     # prefer existing owners first
-    for i in existing_ids[:15]:
-        candidates.append(i)
+    candidates = list(found["existing_ids"])
 
     # add discovered special-case owners
-    if owner_with_no_pets is not None:
-        candidates.append(owner_with_no_pets)
-    if owner_with_many_pets is not None:
-        candidates.append(owner_with_many_pets)
+    if found["no_pets"] is not None:
+        candidates.append(found["no_pets"])
+    if found["many_pets"] is not None:
+        candidates.append(found["many_pets"])
 
     # add boundary and invalid inputs
     candidates.extend([0, -1, 99999999, "abc"])  # include a non-integer id
@@ -82,7 +112,7 @@ def test_owner_business_cases(case_index: int, base_url: str, swagger_spec: Any,
 
     # run the GET
     url = f"{base_url}/api/owners/{owner_id}"
-    r = requests.get(url, timeout=10)
+    r = api_client.get(url)
 
     # If the owner is not found, we expect a client-level error (404/400). If the server
     # returns 200 we run business logic checks below. Other responses (500) will cause
@@ -104,7 +134,7 @@ def test_owner_business_cases(case_index: int, base_url: str, swagger_spec: Any,
 
     # Validate pets consistency
     pets = owner.get("pets") or []
-    pettypes_map = _get_pettypes_map(base_url)
+    pettype_ids = _get_pettype_ids(reference_data, base_url)
 
     pet_ids = set()
     for pet in pets:
@@ -123,7 +153,7 @@ def test_owner_business_cases(case_index: int, base_url: str, swagger_spec: Any,
         if ptype:
             ptype_id = ptype.get("id")
             if ptype_id is not None:
-                assert int(ptype_id) in pettypes_map, f"Pet {pid} references unknown petType id {ptype_id}"
+                assert int(ptype_id) in pettype_ids, f"Pet {pid} references unknown petType id {ptype_id}"
 
         # birthDate should not be in the future
         b = pet.get("birthDate")
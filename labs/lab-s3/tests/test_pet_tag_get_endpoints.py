@@ -4,83 +4,45 @@ This test discovers GET endpoints tagged with 'pet' and issues requests against
 the server described in the OpenAPI `servers[0].url`.
 
 For operations requiring path parameters (ownerId, petId) the test uses the
-`created_owner` and `created_pet` fixtures to provide valid ids.
+`created_owner` and `created_pet` fixtures to provide valid ids. The calls run
+concurrently (see --sweep-concurrency) and the latency of each call is reported.
 
 These tests intentionally avoid strict schema validation and focus on
 existence/availability of the endpoints and JSON parseability for 200 responses.
 """
-import requests
 import pytest
-from typing import Optional
 
+from utils.operation_index import get_operation_index
+from utils.sweep import build_calls, format_latency_report, sweep
 
-def _substitute_path(path: str, owner_id: Optional[int], pet_id: Optional[int]) -> Optional[str]:
-    p = path
-    if "{petId}" in p:
-        if pet_id is None:
-            return None
-        p = p.replace("{petId}", str(pet_id))
-    if "{ownerId}" in p:
-        if owner_id is None:
-            return None
-        p = p.replace("{ownerId}", str(owner_id))
-    # If any other template variables remain, we can't call it
-    if "{" in p:
-        return None
-    return p
 
+def _is_pet_related(op) -> bool:
+    # The original tests relied on a tag named 'pet' and the old /pet paths; the new API exposes
+    # pet resources under /api/pets and may use different tagging. To be robust discover
+    # operations by either tag or path name containing 'pet'.
+    tags = op.tags
+    return any(("pet" in (t.lower() if isinstance(t, str) else "") for t in tags)) or "pet" in op.path.lower()
 
-def test_all_get_pet_endpoints(swagger_spec, base_url, created_owner, created_pet):
-    paths = swagger_spec.get("paths", {})
 
+def test_all_get_pet_endpoints(api_client, swagger_spec, base_url, created_owner, created_pet, sweep_concurrency, record_property):
     owner_id = created_owner.get("id") if created_owner else None
     pet_id = created_pet.get("id") if created_pet else None
 
-    # collect GET endpoints that appear to be pet-related. The original tests
-    # relied on a tag named 'pet' and the old /pet paths; the new API exposes
-    # pet resources under /api/pets and may use different tagging. To be robust
-    # discover operations by either tag or path name containing 'pet'.
-    pet_get_ops = []
-    for path, path_item in paths.items():
-        for method, op in path_item.items():
-            if method.lower() != "get":
-                continue
-            tags = op.get("tags", []) or []
-            path_l = path.lower()
-            if any(("pet" in (t.lower() if isinstance(t, str) else "") for t in tags)) or "pet" in path_l:
-                pet_get_ops.append((path, op))
+    # collect GET endpoints that appear to be pet-related
+    pet_get_ops = get_operation_index(swagger_spec).operations(method="get", predicate=_is_pet_related)
 
     # If there are no discovered pet endpoints, skip the test instead of failing
     # (the API may not expose 'pet' resources in a way this test recognizes).
     if not pet_get_ops:
         pytest.skip("No GET pet-related operations found in spec")
 
-    failures = []
-    for path, op in pet_get_ops:
-        call_path = _substitute_path(path, owner_id, pet_id)
-        if not call_path:
-            # skip endpoints we cannot call due to unknown parameters
-            continue
+    # endpoints we cannot call due to unknown parameters are skipped
+    calls, _ = build_calls(pet_get_ops, base_url, {"ownerId": owner_id, "petId": pet_id})
 
-        url = f"{base_url}{call_path}"
-        try:
-            r = requests.get(url, timeout=10)
-        except Exception as exc:
-            failures.append((url, f"request-failed: {exc}"))
-            continue
-
-        if r.status_code == 200:
-            # ensure JSON parseable when returning 200 with JSON content
-            ct = r.headers.get("Content-Type", "")
-            if "application/json" in ct or ct.startswith("application/"):
-                try:
-                    r.json()
-                except Exception as exc:
-                    failures.append((url, f"invalid-json: {exc}"))
-        elif r.status_code in (204, 201, 304):
-            # Acceptable success-like responses for some endpoints
-            pass
-        else:
-            failures.append((url, f"unexpected-status: {r.status_code}"))
+    results = sweep(api_client, calls, max_workers=sweep_concurrency)
+    for res in results:
+        record_property(f"latency_ms {res.call.url}", round(res.elapsed * 1000, 1))
+    record_property("latency report", format_latency_report(results))
 
+    failures = [(res.call.url, res.failure) for res in results if res.failure]
     assert not failures, f"Some pet GET endpoints failed: {failures}"
@@ -0,0 +1,185 @@
+"""Postman collection runner (utils.postman): script translation, concurrent runs and the collection's own checks.
+
+The stand-in tests run a small collection against a local server. test_postman_check runs every
+pm.test of --postman-collection (by default the sample-site collection of lab-0) as its own
+pytest result and is skipped when the collection's host cannot be reached, e.g.
+
+    pytest tests/test_postman.py --postman-base-url http://localhost:8000 --postman-iterations 20
+
+--postman-stand-in runs it against the Python stand-in of the sample-site API (utils.sample_site).
+"""
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+import pytest
+
+from utils.health import probe
+from utils.http_client import ApiClient
+from utils.sample_site import SampleSiteApi, SampleSiteServer
+from utils.postman import FAILED, PASSED, UNSUPPORTED, format_collection_report, load_collection, parse_tests, run_collection
+
+USERS = [{"ID": 1, "USERNAME": "admin"}, {"ID": 2, "USERNAME": "joe"}]
+
+
+def _route(method, path, body):
+    if path == "/api/allusers":
+        return 200, USERS
+    if path.startswith("/api/user/"):
+        time.sleep(0.05)
+        return 200, [u for u in USERS if str(u["ID"]) == path.rsplit("/", 1)[1]]
+    return 404, {"error": "not found"}
+
+
+@pytest.fixture(scope="module")
+def stand_in_url(stand_in_server):
+    return stand_in_server(_route)
+
+
+def _script(*lines):
+    return {"listen": "test", "script": {"exec": [line + "\r" for line in lines], "type": "text/javascript"}}
+
+
+COLLECTION = {
+    "info": {"name": "stand-in", "schema": "https://schema.getpostman.com/json/collection/v2.1.0/collection.json"},
+    "variable": [{"key": "host", "value": "http://localhost:8000"}, {"key": "user", "value": "1"}],
+    "item": [
+        {"name": "Get All Users", "request": {"method": "GET", "url": {"raw": "{{host}}/api/allusers"}}, "event": [_script(
+            'pm.test("Status code is 200", function () {',
+            "    pm.response.to.have.status(200);",
+            "});",
+            'pm.test("Two users", () => {',
+            "    pm.expect(pm.response.json().length).to.eql(2);",
+            "});",
+        )]},
+        {"name": "Users", "item": [
+            {"name": "Get user", "request": {"method": "GET", "url": "{{host}}/api/user/{{user}}"}, "event": [_script(
+                'pm.test("Username is", function () {',
+                "    var jsonData = pm.response.json();",
+                "    pm.expect(jsonData[0].USERNAME).to.eql('joe');",
+                "});",
+                'pm.test("Response time is less than 20ms", function () {',
+                "    pm.expect(pm.response.responseTime).to.be.below(20);",
+                "});",
+                'pm.test("Schema", function () {',
+                "    pm.response.to.have.jsonSchema({});",
+                "});",
+            )]},
+        ]},
+    ],
+}
+
+
+@pytest.fixture
+def collection_path(tmp_path):
+    path = tmp_path / "stand-in.postman_collection.json"
+    path.write_text(json.dumps(COLLECTION), encoding="utf-8")
+    return str(path)
+
+
+def test_parse_tests_translates_common_assertions():
+    tests = parse_tests(
+        'pm.test("status", function () { pm.response.to.have.status(201); });\n'
+        'pm.test("fields", function () {\n'
+        "  const body = pm.response.json();\n"
+        '  pm.expect(body["name"]).to.equal("Leo; the cat");\n'
+        "  pm.expect(body.owner.id).to.eql(3);\n"
+        "});\n"
+        'pm.test("loop", function () { _.each([], function (x) {}); });'
+    )
+    assert [t.name for t in tests] == ["status", "fields", "loop"]
+    assert [len(t.checks) for t in tests[:2]] == [1, 2]
+    assert tests[2].unsupported and "_.each" in tests[2].unsupported
+
+
+def test_collection_runs_concurrently_with_folders_and_variables(collection_path, stand_in_url, stand_in_client, record_property):
+    name, items = load_collection(collection_path, variables={"user": "2"}, base_url=stand_in_url)
+    assert [i.name for i in items] == ["Get All Users", "Users / Get user"]
+    assert items[1].url == f"{stand_in_url}/api/user/2"
+
+    run = run_collection(stand_in_client, items, name, concurrency=8, iterations=8)
+    record_property("collection report", format_collection_report(run))
+
+    assert run.duration < 8 * 0.05, "the 50ms user requests overlap"
+    assert {outcome for _, outcome, _ in run.outcomes("Users / Get user", "Username is")} == {PASSED}
+    assert {outcome for _, outcome, _ in run.outcomes("Get All Users", "Two users")} == {PASSED}
+    slow = run.outcomes("Users / Get user", "Response time is less than 20ms")
+    assert len(slow) == 8 and all(outcome == FAILED and "expected below 20" in message for _, outcome, message in slow)
+    assert run.outcomes("Users / Get user", "Schema")[0][1] == UNSUPPORTED
+    assert run.histograms["Users / Get user"].percentile(50) >= 50.0
+    assert run.counts() == {PASSED: 24, FAILED: 8, UNSUPPORTED: 8}
+
+
+def test_unreachable_host_fails_every_check(collection_path):
+    _, items = load_collection(collection_path, base_url="http://127.0.0.1:9")
+    run = run_collection(ApiClient(retries=0), items)
+    assert all(outcome == FAILED and "request failed" in message for r in run.results for outcome, message in r.outcomes.values())
+
+
+# --- the checks of --postman-collection --------------------------------------------------------
+
+
+def _postman_variables(config):
+    return dict(v.split("=", 1) for v in config.getoption("postman_var"))
+
+
+def _postman_items(config, base_url=None):
+    return load_collection(
+        config.getoption("postman_collection"), _postman_variables(config), base_url or config.getoption("postman_base_url")
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "postman_check" in metafunc.fixturenames:
+        path = metafunc.config.getoption("postman_collection")
+        if not os.path.exists(path):
+            skip = pytest.mark.skip(reason=f"Postman collection not found: {path}")
+            metafunc.parametrize("postman_check", [pytest.param(None, marks=skip)], ids=["no-collection"])
+            return
+        _, items = _postman_items(metafunc.config)
+        checks = [(item.name, test.name) for item in items for test in item.tests]
+        metafunc.parametrize("postman_check", checks, ids=[f"{i} - {t}" for i, t in checks])
+
+
+@pytest.fixture(scope="module")
+def postman_target(pytestconfig):
+    """Base URL of a sample-site stand-in with --postman-stand-in, else None (the collection's own hosts)."""
+    if not pytestconfig.getoption("postman_stand_in"):
+        yield None
+        return
+    api = SampleSiteApi()
+    with SampleSiteServer(api) as server:
+        yield server.url
+    api.close()
+
+
+@pytest.fixture(scope="module")
+def postman_run(pytestconfig, postman_target):
+    name, items = _postman_items(pytestconfig, postman_target)
+    origins = sorted({"{0.scheme}://{0.netloc}/".format(urlsplit(i.url)) for i in items})
+    for origin in origins:
+        health = probe(origin, timeout=pytestconfig.getoption("health_timeout"))
+        if not health.ok:
+            pytest.skip(f"collection host unavailable: {health.detail}")
+    client = ApiClient(retries=0)
+    try:
+        run = run_collection(
+            client,
+            items,
+            name,
+            concurrency=pytestconfig.getoption("postman_concurrency"),
+            iterations=pytestconfig.getoption("postman_iterations"),
+        )
+    finally:
+        client.close()
+    pytestconfig._postman_run = run
+    return run
+
+
+def test_postman_check(postman_run, postman_check):
+    outcomes = postman_run.outcomes(*postman_check)
+    failed = [f"iteration {i}: {message}" for i, outcome, message in outcomes if outcome == FAILED]
+    if any(outcome == UNSUPPORTED for _, outcome, _ in outcomes):
+        pytest.skip(outcomes[0][2])
+    assert not failed, f"{len(failed)}/{len(outcomes)} runs failed:\n  " + "\n  ".join(failed[:10])
@@ -0,0 +1,90 @@
+"""Sample-site API stand-in (utils.sample_site): the PHP API's reads, CRUD on USERS and the response cache."""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.http_client import ApiClient
+from utils.sample_site import MAIN_DB, SampleSiteApi, SampleSiteServer
+
+pytestmark = pytest.mark.skipif(not os.path.exists(MAIN_DB), reason=f"sample-site database not found: {MAIN_DB}")
+
+
+def _digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+@pytest.fixture
+def site():
+    api = SampleSiteApi(cache_ttl=60.0)
+    with SampleSiteServer(api) as server:
+        client = ApiClient(retries=0)
+        yield api, f"{server.url}/api", client
+        client.close()
+    api.close()
+
+
+def test_reads_match_the_php_api(site):
+    _, url, client = site
+    users = client.get(f"{url}/allusers").json()
+    assert [u["USERNAME"] for u in users] == ["admin", "joe", "blueviolin", "heartsDelight"]
+    assert set(users[0]) == {"ID", "USERNAME", "PW_HASH", "LEVEL"}
+    assert client.get(f"{url}/user/2").json()[0]["USERNAME"] == "joe"
+    assert client.get(f"{url}/user/99").json() == []
+    assert client.get(f"{url}/user/abc").json() == []
+    assert client.get(f"{url}/nothing").status_code == 404
+    assert client.post(f"{url}/allusers", json={}).status_code == 405
+
+
+def test_crud_works_on_a_copy_of_the_database(site):
+    api, url, client = site
+    before = _digest(MAIN_DB)
+
+    r = client.post(f"{url}/user", json={"USERNAME": "carol", "PW_HASH": "x" * 34, "LEVEL": 2})
+    assert r.status_code == 201
+    user_id = r.json()[0]["ID"]
+    assert client.get(f"{url}/user/{user_id}").json()[0]["USERNAME"] == "carol"
+
+    r = client.put(f"{url}/user/{user_id}", json={"LEVEL": 3})
+    assert r.status_code == 200 and r.json()[0]["LEVEL"] == 3 and r.json()[0]["USERNAME"] == "carol"
+    assert client.delete(f"{url}/user/{user_id}").status_code == 204
+    assert client.get(f"{url}/user/{user_id}").json() == []
+    assert client.delete(f"{url}/user/{user_id}").status_code == 404
+
+    assert api.db_path != MAIN_DB and _digest(MAIN_DB) == before
+
+
+@pytest.mark.parametrize("body, problem", [
+    ({"PW_HASH": "x"}, "USERNAME is required"),
+    ({"USERNAME": "", "PW_HASH": "x"}, "USERNAME must be a non-empty string"),
+    ({"USERNAME": "a" * 51, "PW_HASH": "x"}, "longer than 50"),
+    ({"USERNAME": "a", "PW_HASH": "x", "LEVEL": "1"}, "LEVEL must be an integer"),
+    ({"USERNAME": "a", "PW_HASH": "x", "ROLE": 1}, "unknown fields: ROLE"),
+])
+def test_invalid_users_are_rejected(site, body, problem):
+    _, url, client = site
+    r = client.post(f"{url}/user", json=body)
+    assert r.status_code == 400 and problem in r.json()["error"]
+
+
+def test_cache_serves_repeated_reads_until_a_write(site):
+    api, url, client = site
+    assert client.get(f"{url}/allusers").headers["X-Cache"] == "miss"
+    assert client.get(f"{url}/allusers").headers["X-Cache"] == "hit"
+    client.put(f"{url}/user/2", json={"USERNAME": "joseph"})
+    r = client.get(f"{url}/allusers")
+    assert r.headers["X-Cache"] == "miss" and r.json()[1]["USERNAME"] == "joseph"
+    assert (api.cache_hits, api.cache_misses) == (1, 2)
+
+
+def test_concurrent_reads_share_the_connection_pool():
+    api = SampleSiteApi(pool_size=2)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda i: api.handle("GET", f"/api/user/{i % 4 + 1}", b""), range(200)))
+        assert {status for status, _, _ in results} == {200}
+        assert api._readers.qsize() == 2
+    finally:
+        api.close()
@@ -0,0 +1,79 @@
+"""Structural spec diff and test selection (utils.spec_diff) used by --spec-diff."""
+import copy
+
+from utils.spec_diff import SpecDiff, TestOperationMap, diff_specs, resolve_refs, select_tests
+
+
+def _ok(schema):
+    return {"200": {"description": "ok", "content": {"application/json": {"schema": schema}}}}
+
+
+SPEC = {
+    "openapi": "3.0.1",
+    "servers": [{"url": "http://localhost:9966/petclinic"}],
+    "paths": {
+        "/api/owners": {"get": {"responses": _ok({"type": "array", "items": {"$ref": "#/components/schemas/Owner"}})}},
+        "/api/owners/{ownerId}": {
+            "parameters": [{"name": "ownerId", "in": "path", "required": True, "schema": {"type": "integer"}}],
+            "get": {"responses": _ok({"$ref": "#/components/schemas/Owner"})},
+        },
+        "/api/pettypes": {"get": {"responses": _ok({"type": "array", "items": {"$ref": "#/components/schemas/PetType"}})}},
+    },
+    "components": {
+        "schemas": {
+            "PetType": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "Owner": {
+                "type": "object",
+                "properties": {
+                    "telephone": {"type": "string", "pattern": "^[0-9]*$"},
+                    # recursive on purpose: resolution must terminate
+                    "referredBy": {"$ref": "#/components/schemas/Owner"},
+                },
+            },
+        }
+    },
+}
+
+
+def test_resolve_refs_inlines_and_stops_at_recursion():
+    resolved = resolve_refs({"$ref": "#/components/schemas/Owner"}, SPEC)
+    assert resolved["properties"]["telephone"]["pattern"] == "^[0-9]*$"
+    assert resolved["properties"]["referredBy"] == {"$ref": "#/components/schemas/Owner"}
+
+
+def test_unchanged_spec_and_non_operation_changes_have_no_diff():
+    other = copy.deepcopy(SPEC)
+    other["servers"] = [{"url": "http://127.0.0.1:1234/petclinic"}]
+    other["info"] = {"title": "renamed"}
+    assert not diff_specs(SPEC, other)
+
+
+def test_shared_schema_change_reaches_every_operation_using_it():
+    new = copy.deepcopy(SPEC)
+    new["components"]["schemas"]["Owner"]["properties"]["telephone"]["pattern"] = "^[0-9 ]*$"
+    new["paths"]["/api/owners/{ownerId}"]["parameters"][0]["schema"]["minimum"] = 0
+    new["paths"]["/api/visits"] = {"get": {"responses": _ok({"type": "array"})}}
+    del new["paths"]["/api/pettypes"]
+
+    diff = diff_specs(SPEC, new)
+    assert set(diff.changed) == {"GET /api/owners", "GET /api/owners/{ownerId}"}
+    assert diff.added == ["GET /api/visits"] and diff.removed == ["GET /api/pettypes"]
+    owner_changes = diff.changed["GET /api/owners/{ownerId}"]
+    assert any(c.startswith("changed /responses/200/content/application~1json/schema/properties/telephone/pattern") for c in owner_changes)
+    assert any(c.startswith("added /parameters/0/schema/minimum") for c in owner_changes)
+    assert diff.affected == {"GET /api/owners", "GET /api/owners/{ownerId}", "GET /api/pettypes"}
+
+
+def test_select_tests_keeps_affected_smoke_and_unmapped_tests():
+    diff = SpecDiff(changed={"GET /api/owners/{ownerId}": ["changed /x"]})
+    mapping = {"t::owner": ["GET /api/owners/{ownerId}"], "t::pettypes": ["GET /api/pettypes"], "t::offline": [], "t::smoke": []}
+    selected, reasons = select_tests(["t::owner", "t::pettypes", "t::offline", "t::smoke", "t::new"], diff, mapping, {"t::smoke"})
+    assert selected == ["t::owner", "t::smoke", "t::new"]
+    assert reasons == {"t::owner": "calls GET /api/owners/{ownerId}", "t::smoke": "smoke", "t::new": "not mapped yet"}
+
+
+def test_operation_map_updates_only_tests_that_ran(tmp_path):
+    test_map = TestOperationMap(str(tmp_path / "map.json"))
+    test_map.update({"t::a": {"GET /api/owners"}, "t::b": {"GET /api/pettypes"}})
+    test_map.update({"t::a": set()})
+    assert test_map.load() == {"t::a": [], "t::b": ["GET /api/pettypes"]}
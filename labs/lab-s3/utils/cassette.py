@@ -0,0 +1,203 @@
+"""
+Record and replay HTTP interactions (cassettes) for the API tests.
+
+A Cassette plugs into the ApiClient as its transport adapter. In record mode every request goes
+to the real host and the request/response pair is stored; in replay mode responses are served
+from disk without any network access, and a request that was never recorded fails the test with
+CassetteMiss instead of silently going to the network.
+
+Requests are matched by method, path, sorted query and a hash of the body (not by host, so a
+cassette recorded against one server replays for any base URL). Repeated calls of the same
+request are replayed in recorded order, which keeps create/read/delete flows consistent; after
+the last recorded response the last one is served again.
+
+On disk a cassette is a directory with an index (interactions.json) and one zlib-compressed file
+per distinct response body under bodies/, so identical bodies are stored once and consecutive
+identical responses collapse to one entry with a repeat count.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+MODES = ("off", "record", "replay")
+
+# wire-level headers (the body is stored decoded) and the volatile Date, which would defeat deduplication
+_DROPPED_HEADERS = frozenset({"content-encoding", "transfer-encoding", "content-length", "connection", "keep-alive", "date"})
+_CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class CassetteMiss(AssertionError):
+    """Raised in replay mode for a request the cassette does not contain."""
+
+
+def _body_bytes(body: Any) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return bytes(body)
+    raise TypeError(f"cannot record streamed request body of type {type(body).__name__}")
+
+
+def request_key(method: str, url: str, body: Any) -> str:
+    """Return the match key of a request: method, path, sorted query and body hash."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    data = _body_bytes(body)
+    digest = hashlib.sha256(data).hexdigest()[:16] if data else "-"
+    return f"{method.upper()} {parts.path}{'?' + query if query else ''} {digest}"
+
+
+class Cassette:
+    """On-disk store of recorded interactions plus recorded values (see value()).
+
+    mode: "record" starts an empty cassette that save() writes to path; "replay" loads path
+    """
+
+    def __init__(self, path: str, mode: str = "replay") -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"cassette mode must be 'record' or 'replay', not {mode!r}")
+        self.path = path
+        self.mode = mode
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._values: Dict[str, Any] = {}
+        self._positions: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self._load()
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def _index_path(self) -> str:
+        return os.path.join(self.path, "interactions.json")
+
+    def _body_path(self, digest: str) -> str:
+        return os.path.join(self.path, "bodies", f"{digest}.z")
+
+    def _load(self) -> None:
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except OSError as exc:
+            raise CassetteMiss(f"cassette {self.path} not found; record it with --cassette-mode record ({exc})")
+        self._interactions = data.get("interactions", {})
+        self._values = data.get("values", {})
+
+    def save(self) -> None:
+        """Write the index of a recording cassette (bodies are written as they are recorded)."""
+        if not self.recording:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            data = {"version": 1, "values": self._values, "interactions": self._interactions}
+            tmp = f"{self._index_path()}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+            os.replace(tmp, self._index_path())
+
+    def value(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return a recorded value (e.g. a generated unique id) so replayed requests match.
+
+        Record mode stores factory(); replay mode returns the stored value.
+        """
+        with self._lock:
+            if self.recording:
+                return self._values.setdefault(name, factory())
+            if name not in self._values:
+                raise CassetteMiss(f"value {name!r} was not recorded in cassette {self.path}")
+            return self._values[name]
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        body = response.content or b""
+        digest = hashlib.sha256(body).hexdigest()[:32] if body else None
+        if digest and not os.path.exists(self._body_path(digest)):
+            os.makedirs(os.path.dirname(self._body_path(digest)), exist_ok=True)
+            tmp = f"{self._body_path(digest)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(zlib.compress(body, 6))
+            os.replace(tmp, self._body_path(digest))
+
+        entry = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            "body": digest,
+        }
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            seq = self._interactions.setdefault(key, [])
+            if seq and {k: v for k, v in seq[-1].items() if k != "repeat"} == entry:
+                seq[-1]["repeat"] = seq[-1].get("repeat", 1) + 1
+            else:
+                seq.append(entry)
+
+    def play(self, request: requests.PreparedRequest) -> Tuple[Dict[str, Any], bytes]:
+        """Return the next recorded response (entry, body) for a request."""
+        key = request_key(request.method, request.url, request.body)
+        with self._lock:
+            seq = self._interactions.get(key)
+            if not seq:
+                raise CassetteMiss(
+                    f"no recorded response for {key} ({request.url}) in cassette {self.path}; "
+                    "re-record with --cassette-mode record"
+                )
+            index, used = self._positions.get(key, (0, 0))
+            entry = seq[index]
+            used += 1
+            if used >= entry.get("repeat", 1) and index + 1 < len(seq):
+                index, used = index + 1, 0
+            self._positions[key] = (index, used)
+
+        body = b""
+        if entry["body"]:
+            with open(self._body_path(entry["body"]), "rb") as f:
+                body = zlib.decompress(f.read())
+        return entry, body
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter recording through the real connection pool or replaying from a Cassette."""
+
+    def __init__(self, cassette: Cassette, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if self.cassette.recording:
+            # record complete responses, so replays never depend on a local cache (ETag / 304)
+            for name in _CONDITIONAL_HEADERS:
+                request.headers.pop(name, None)
+            response = super().send(request, **kwargs)
+            self.cassette.record(request, response)
+            return response
+
+        entry, body = self.cassette.play(request)
+        headers = dict(entry["headers"], **{"Content-Length": str(len(body))})
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=entry["status"],
+            reason=entry.get("reason"),
+            preload_content=False,
+            decode_content=False,
+        )
+        return self.build_response(request, raw)
+
+
+def open_cassette(path: str, mode: str) -> Optional[Cassette]:
+    """Return the cassette for a --cassette-mode value, None for "off"."""
+    if mode not in MODES:
+        raise ValueError(f"cassette mode must be one of {', '.join(MODES)}, not {mode!r}")
+    return None if mode == "off" else Cassette(path, mode)
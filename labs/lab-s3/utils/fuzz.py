@@ -0,0 +1,473 @@
+"""
+Property-based fuzzing of path, query and body parameters generated from an OpenAPI spec.
+
+For every selected operation, FuzzGenerator builds requests from the parameter and request body
+schemas: mostly boundary and invalid values (out-of-range and overflowing integers, wrong types,
+over-long strings, pattern violations, impossible dates, mutated bodies) plus some valid ones.
+fuzz() sends them concurrently until its time budget is used up and applies a property to every
+response (by default: no 5xx and parseable JSON on success). Each distinct failure is shrunk to a
+minimal reproducing request. Failures and requests reaching a new (operation, status) pair are
+saved to a FuzzCorpus and replayed before anything new is generated on the next run.
+"""
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import quote
+
+import requests
+
+from utils.health import CircuitOpenError, DeadlineExceeded
+from utils.schema_faker import SchemaFaker
+from utils.operation_index import Operation, get_operation_index
+
+BODY_METHODS = frozenset({"post", "put", "patch"})
+
+# the petclinic ids are int32: both sides of the boundary are interesting
+INT32_MAX = 2**31 - 1
+
+_BAD_STRINGS = ["", " ", "%", "../", "'; DROP TABLE owners; --", "<script>x</script>", "ü✓\U0001f600", "null", "\x00"]
+_BAD_DATES = ["2020-02-30", "2020-13-01", "0000-01-01", "9999-12-31", "01/02/2020", "2020-1-1", "today"]
+
+
+@dataclass
+class FuzzCase:
+    """One generated request, serializable to the corpus."""
+
+    method: str
+    path: str
+    path_params: Dict[str, Any] = field(default_factory=dict)
+    query: Dict[str, Any] = field(default_factory=dict)
+    body: Any = None
+    has_body: bool = False
+
+    @property
+    def operation(self) -> str:
+        return f"{self.method.upper()} {self.path}"
+
+    def to_json(self) -> Dict[str, Any]:
+        data = {"method": self.method, "path": self.path, "path_params": self.path_params, "query": self.query}
+        if self.has_body:
+            data["body"] = self.body
+        return data
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "FuzzCase":
+        return cls(
+            data["method"], data["path"], dict(data.get("path_params") or {}), dict(data.get("query") or {}),
+            data.get("body"), "body" in data,
+        )
+
+    def canonical(self) -> str:
+        return json.dumps(self.to_json(), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(self.canonical().encode("utf-8")).hexdigest()[:16]
+
+    def url(self, base_url: str) -> str:
+        path = self.path
+        for name, value in self.path_params.items():
+            path = path.replace("{" + name + "}", quote(_text(value), safe=""))
+        return base_url + path
+
+    def send(self, client: requests.Session, base_url: str) -> requests.Response:
+        kwargs: Dict[str, Any] = {}
+        if self.query:
+            kwargs["params"] = {k: _text(v) for k, v in self.query.items()}
+        if self.has_body:
+            kwargs["json"] = self.body
+        return client.request(self.method.upper(), self.url(base_url), **kwargs)
+
+    def __str__(self) -> str:
+        text = f"{self.method.upper()} {self.url('')}"
+        if self.query:
+            text += "?" + "&".join(f"{k}={_text(v)!r}" for k, v in self.query.items())
+        if self.has_body:
+            text += " " + json.dumps(self.body, ensure_ascii=False)[:300]
+        return text
+
+
+def _text(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+Property = Callable[[Operation, FuzzCase, requests.Response], Optional[str]]
+
+
+def default_property(operation: Operation, case: FuzzCase, response: requests.Response) -> Optional[str]:
+    """Whatever the input, the server answers without a 5xx, and successful JSON answers parse."""
+    if response.status_code >= 500:
+        return f"server-error: {response.status_code}"
+    if 200 <= response.status_code < 300 and "json" in response.headers.get("Content-Type", "") and response.content:
+        try:
+            response.json()
+        except ValueError as exc:
+            return f"invalid-json: {exc}"
+    return None
+
+
+class FuzzGenerator:
+    """Random requests for the operations of a spec; the same seed gives the same sequence."""
+
+    def __init__(self, spec: Dict[str, Any], seed: int = 0, valid_ratio: float = 0.2) -> None:
+        self.spec = spec
+        self.faker = SchemaFaker(spec)
+        self.rng = random.Random(seed)
+        self.valid_ratio = valid_ratio
+
+    def _parameters(self, op: Operation) -> List[Dict[str, Any]]:
+        shared = (self.spec.get("paths") or {}).get(op.path, {}).get("parameters") or []
+        params = {}
+        for p in list(shared) + list(op.definition.get("parameters") or []):
+            p = self.faker.resolve(p)
+            params[(p.get("name"), p.get("in"))] = p
+        return list(params.values())
+
+    def _body_schema(self, op: Operation) -> Optional[Dict[str, Any]]:
+        body = self.faker.resolve(op.definition.get("requestBody") or {})
+        content = body.get("content") or {}
+        for media in ("application/json", *content):
+            if media in content and content[media].get("schema"):
+                return content[media]["schema"]
+        return None
+
+    def case(self, op: Operation) -> FuzzCase:
+        rng = self.rng
+        case = FuzzCase(op.method, op.path)
+        for p in self._parameters(op):
+            where, schema = p.get("in"), p.get("schema") or {}
+            if where == "path":
+                case.path_params[p["name"]] = self.value(schema, p["name"])
+            elif where == "query" and (p.get("required") or rng.random() < 0.6):
+                case.query[p["name"]] = self.value(schema, p["name"])
+        schema = self._body_schema(op)
+        if schema is not None and op.method in BODY_METHODS:
+            case.body, case.has_body = self.body(schema), True
+        return case
+
+    def value(self, schema: Any, hint: str = "") -> Any:
+        """A valid value (valid_ratio of the time) or a boundary/invalid one for the schema."""
+        schema = self.faker.resolve(schema)
+        if not isinstance(schema, dict):
+            return None
+        if self.rng.random() < self.valid_ratio:
+            return self.faker.generate(schema, self.rng.randrange(50), hint)
+        return self.rng.choice(self._edges(schema))
+
+    def _edges(self, schema: Dict[str, Any]) -> List[Any]:
+        kind = schema.get("type")
+        if "enum" in schema:
+            return ["", "not-in-enum", 0, None] + [str(v).upper() for v in schema["enum"][:2]]
+        if kind in ("integer", "number"):
+            low, high = schema.get("minimum"), schema.get("maximum")
+            edges: List[Any] = [0, -1, 1, INT32_MAX, INT32_MAX + 1, -INT32_MAX - 1, -INT32_MAX - 2, 10**20, -(10**20)]
+            edges += [b for b in ((low - 1) if low is not None else None, (high + 1) if high is not None else None) if b is not None]
+            edges += ["abc", "1.5", "1e3", "0x10", "", " ", "１", True, None, 1.5]
+            return edges
+        if kind == "boolean":
+            return [True, False, "yes", "TRUE", 0, 1, "", None]
+        if kind == "array":
+            item = self.faker.generate(schema.get("items") or {}, 0)
+            return [[], [item] * 1000, [None], "not-an-array", {}, None]
+        if kind == "object" or "properties" in schema or "allOf" in schema:
+            return [{}, [], "not-an-object", None, 0]
+        fmt = schema.get("format")
+        edges = list(_BAD_STRINGS) + [0, 123, True, None, [], {}]
+        if fmt in ("date", "date-time"):
+            edges += _BAD_DATES
+        low, high = int(schema.get("minLength", 0)), schema.get("maxLength")
+        if low > 0:
+            edges.append("a" * (low - 1))
+        if high is not None:
+            edges += ["a" * int(high), "a" * (int(high) + 1)]
+        edges.append("a" * 10000)
+        if schema.get("pattern"):
+            edges += ["ab1 !", "1234", "abcd"]
+        return edges
+
+    def body(self, schema: Any) -> Any:
+        """A valid instance of schema with one to three mutations (or none, valid_ratio of the time)."""
+        rng = self.rng
+        body = self.faker.generate(schema, rng.randrange(50))
+        if rng.random() < self.valid_ratio:
+            return body
+        if not isinstance(body, dict) or rng.random() < 0.1:
+            return rng.choice(self._edges(self.faker.resolve(schema)))
+        props = self.faker.properties(schema)
+        for _ in range(rng.randint(1, 3)):
+            mutation = rng.random()
+            names = sorted(body)
+            if names and mutation < 0.3:
+                body.pop(rng.choice(names))
+            elif names and mutation < 0.9:
+                name = rng.choice(names)
+                body[name] = rng.choice(self._edges(self.faker.resolve(props.get(name) or {})))
+            else:
+                body[rng.choice(["unknownField", "id", "__proto__"])] = rng.choice([1, "x", None, -1])
+        return body
+
+
+# -- shrinking ------------------------------------------------------------------------------------
+
+
+def _size(value: Any) -> Tuple[int, str]:
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False)
+    return len(text), text
+
+
+def _simpler_values(value: Any) -> Iterable[Any]:
+    """Candidate replacements for value, roughly simplest first."""
+    if isinstance(value, bool):
+        yield False
+    elif isinstance(value, int):
+        yield 0
+        yield int(value / 2)
+        yield value - 1 if value > 0 else value + 1
+    elif isinstance(value, float):
+        yield 0
+        yield int(value)
+    elif isinstance(value, str):
+        yield ""
+        # cut chunks of decreasing size from either end: over-long strings shrink in O(log n) steps
+        cut = len(value) // 2
+        while cut >= 1:
+            yield value[:-cut]
+            yield value[cut:]
+            cut //= 2
+    elif isinstance(value, list):
+        yield []
+        yield value[: len(value) // 2]
+        for i in range(min(len(value), 8)):
+            yield value[:i] + value[i + 1:]
+        for i, item in enumerate(value[:8]):
+            for simpler in _simpler_values(item):
+                yield value[:i] + [simpler] + value[i + 1:]
+    elif isinstance(value, dict):
+        yield {}
+        for name in sorted(value):
+            yield {k: v for k, v in value.items() if k != name}
+        for name in sorted(value):
+            for simpler in _simpler_values(value[name]):
+                yield dict(value, **{name: simpler})
+
+
+def _simplifications(case: FuzzCase) -> Iterable[FuzzCase]:
+    for name in sorted(case.query):
+        yield FuzzCase(case.method, case.path, case.path_params, {k: v for k, v in case.query.items() if k != name}, case.body, case.has_body)
+    for name in sorted(case.query):
+        for v in _simpler_values(case.query[name]):
+            yield FuzzCase(case.method, case.path, case.path_params, dict(case.query, **{name: v}), case.body, case.has_body)
+    for name in sorted(case.path_params):
+        for v in _simpler_values(case.path_params[name]):
+            yield FuzzCase(case.method, case.path, dict(case.path_params, **{name: v}), case.query, case.body, case.has_body)
+    if case.has_body:
+        for v in _simpler_values(case.body):
+            yield FuzzCase(case.method, case.path, case.path_params, case.query, v, True)
+
+
+def shrink(case: FuzzCase, fails: Callable[[FuzzCase], bool], max_steps: int = 200, deadline: Optional[float] = None) -> Tuple[FuzzCase, int]:
+    """Greedily replace case by strictly smaller variants that still fail; returns (case, steps tried).
+
+    "Smaller" is the length, then the text, of the canonical JSON, so shrinking always terminates.
+    """
+    steps = 0
+    improved = True
+    while improved and steps < max_steps:
+        improved = False
+        current = _size(case.to_json())
+        for candidate in _simplifications(case):
+            if _size(candidate.to_json()) >= current:
+                continue
+            if steps >= max_steps or (deadline is not None and time.monotonic() >= deadline):
+                return case, steps
+            steps += 1
+            if fails(candidate):
+                case, improved = candidate, True
+                break
+    return case, steps
+
+
+# -- corpus ---------------------------------------------------------------------------------------
+
+
+class FuzzCorpus:
+    """Interesting cases as one JSON file each (<key>.json) in a directory, replayed first on the next run."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def load(self) -> List[Tuple[FuzzCase, Dict[str, Any]]]:
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                entries.append((FuzzCase.from_json(entry["case"]), entry))
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def add(self, case: FuzzCase, reason: str, status: Optional[int]) -> bool:
+        """Store case unless already present; returns True when it was new."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{case.key}.json")
+        if os.path.exists(path):
+            return False
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"case": case.to_json(), "reason": reason, "status": status, "found": time.strftime("%Y-%m-%d")}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, path)
+        return True
+
+
+# -- runner ---------------------------------------------------------------------------------------
+
+
+@dataclass
+class FuzzFailure:
+    signature: Tuple[str, str]
+    case: FuzzCase
+    original: FuzzCase
+    status: Optional[int]
+    shrink_steps: int = 0
+
+
+@dataclass
+class FuzzReport:
+    requests: int = 0
+    replayed: int = 0
+    elapsed: float = 0.0
+    coverage: Counter = field(default_factory=Counter)
+    failures: Dict[Tuple[str, str], FuzzFailure] = field(default_factory=dict)
+    corpus_added: int = 0
+    aborted: Optional[str] = None
+
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def fuzz(
+    client: requests.Session,
+    spec: Dict[str, Any],
+    base_url: str,
+    budget: float = 60.0,
+    concurrency: int = 8,
+    seed: int = 0,
+    methods: Iterable[str] = ("get",),
+    corpus: Optional[FuzzCorpus] = None,
+    prop: Property = default_property,
+    shrink_share: float = 0.25,
+) -> FuzzReport:
+    """Fuzz the operations of spec with the given methods for `budget` seconds.
+
+    The corpus is replayed first. Generation stops after (1 - shrink_share) of the budget; the rest
+    is spent shrinking the distinct failures, one (operation, failure) signature each. An open
+    circuit breaker or the session deadline aborts the run (report.aborted). client should not
+    retry (ApiClient(retries=0)) nor raise from response hooks.
+    """
+    index = get_operation_index(spec)
+    methods = {m.lower() for m in methods}
+    operations = [op for op in index if op.method in methods]
+    by_name = {str(op): op for op in operations}
+    generator = FuzzGenerator(spec, seed=seed)
+    report = FuzzReport()
+    start = time.monotonic()
+    generate_until = start + budget * (1 - shrink_share)
+    shrink_until = start + budget
+    seen: Set[Tuple[str, int]] = set()
+
+    def run(case: FuzzCase) -> Tuple[Optional[int], Optional[str]]:
+        try:
+            r = case.send(client, base_url)
+        except (CircuitOpenError, DeadlineExceeded):
+            # the host or the session is gone: abort instead of reporting every case as a finding
+            raise
+        except requests.RequestException as exc:
+            return None, f"request-failed: {type(exc).__name__}"
+        return r.status_code, prop(by_name[case.operation], case, r)
+
+    def record(case: FuzzCase, status: Optional[int], failure: Optional[str], replayed: bool) -> None:
+        report.requests += 1
+        report.replayed += replayed
+        report.coverage[(case.operation, status)] += 1
+        interesting = (case.operation, status) not in seen
+        seen.add((case.operation, status))
+        if failure is not None:
+            signature = (case.operation, failure)
+            if signature not in report.failures:
+                report.failures[signature] = FuzzFailure(signature, case, case, status)
+        elif interesting and corpus is not None and not replayed:
+            report.corpus_added += corpus.add(case, "coverage", status)
+
+    replay = [case for case, _ in corpus.load()] if corpus is not None else []
+    replay = [case for case in replay if case.operation in by_name]
+    if not operations:
+        return report
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="fuzz") as pool:
+        pending: Dict[Future, Tuple[FuzzCase, bool]] = {}
+        queue = iter(replay)
+        turn = 0
+        try:
+            while True:
+                while len(pending) < concurrency:
+                    case = next(queue, None)
+                    replayed = case is not None
+                    if case is None:
+                        if time.monotonic() >= generate_until:
+                            break
+                        case = generator.case(operations[turn % len(operations)])
+                        turn += 1
+                    pending[pool.submit(run, case)] = (case, replayed)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    case, replayed = pending.pop(future)
+                    status, failure = future.result()
+                    record(case, status, failure, replayed)
+        except (CircuitOpenError, DeadlineExceeded) as exc:
+            report.aborted = str(exc)
+            for future in pending:
+                future.cancel()
+
+    if report.aborted is None:
+        try:
+            for signature, failure in report.failures.items():
+
+                def still_fails(candidate: FuzzCase) -> bool:
+                    return run(candidate)[1] == signature[1]
+
+                failure.case, failure.shrink_steps = shrink(failure.case, still_fails, deadline=shrink_until)
+        except (CircuitOpenError, DeadlineExceeded) as exc:
+            report.aborted = str(exc)
+    if corpus is not None:
+        for signature, failure in report.failures.items():
+            report.corpus_added += corpus.add(failure.case, signature[1], failure.status)
+    report.elapsed = time.monotonic() - start
+    return report
+
+
+def format_fuzz_report(report: FuzzReport) -> str:
+    lines = [
+        f"{report.requests} requests ({report.replayed} replayed from the corpus) in {report.elapsed:.1f}s "
+        f"= {report.throughput():.0f}/s, {len(report.coverage)} (operation, status) pairs, "
+        f"{len(report.failures)} distinct failures, {report.corpus_added} new corpus entries"
+    ]
+    if report.aborted:
+        lines.append(f"aborted: {report.aborted}")
+    for (operation, status), count in sorted(report.coverage.items(), key=lambda kv: (kv[0][0], str(kv[0][1]))):
+        lines.append(f"  {status if status is not None else '-':>6}  {count:6d}x  {operation}")
+    for failure in report.failures.values():
+        lines.append(f"FAIL {failure.signature[1]}: {failure.case}  (shrunk in {failure.shrink_steps} steps)")
+    return "\n".join(lines)
@@ -0,0 +1,116 @@
+"""
+Fail-fast guards for runs against an unreachable or hanging API host.
+
+probe() checks the host once at session start with a short timeout. A CircuitBreaker shared by
+the API clients opens after a few consecutive connection failures (or straight away when the
+probe fails); from then on calls fail immediately with CircuitOpenError instead of each waiting
+out its own connect timeout and retries. A Deadline caps the whole session: request timeouts
+are clamped to the time left and calls after it fail with DeadlineExceeded.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import requests
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class DeadlineExceeded(requests.Timeout):
+    """Raised instead of sending a request after the session deadline."""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive connection failures and stays open for the session.
+
+    A test session has no use for half-open probing: once the host is gone, the remaining tests
+    should be skipped or failed at once. threshold=0 disables the breaker (it never opens on its
+    own, though trip() still opens it).
+    """
+
+    def __init__(self, threshold: int = 3) -> None:
+        self.threshold = threshold
+        self.failures = 0
+        self.reason: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.reason is not None
+
+    def trip(self, reason: str) -> None:
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+
+    def before_call(self, url: str) -> None:
+        if self.reason is not None:
+            raise CircuitOpenError(f"circuit open, not calling {url}: {self.reason}")
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+
+    def failure(self, exc: BaseException) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.threshold and self.failures >= self.threshold and self.reason is None:
+                self.reason = f"{self.failures} consecutive connection failures, last: {exc}"
+
+
+class Deadline:
+    """Wall-clock budget for a session; seconds=None means no deadline."""
+
+    def __init__(self, seconds: Optional[float]) -> None:
+        self.seconds = seconds
+        self.ends_at = time.monotonic() + seconds if seconds else None
+
+    def remaining(self) -> Optional[float]:
+        return None if self.ends_at is None else self.ends_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        left = self.remaining()
+        return left is not None and left <= 0
+
+    def clamp(self, timeout: Timeout, url: str = "") -> Timeout:
+        """Shorten a (connect, read) timeout to the time left; raises DeadlineExceeded when none is left."""
+        left = self.remaining()
+        if left is None:
+            return timeout
+        if left <= 0:
+            raise DeadlineExceeded(f"session deadline of {self.seconds:g}s reached, not calling {url}")
+        if isinstance(timeout, tuple):
+            return (min(timeout[0], left), min(timeout[1], left))
+        return min(timeout, left)
+
+
+@dataclass
+class HealthResult:
+    url: str
+    ok: bool
+    detail: str
+    elapsed: float
+
+
+def probe(url: str, timeout: float = 2.0, session: Optional[requests.Session] = None) -> HealthResult:
+    """One GET of url, no retries and without reading the body. Any status below 500 counts as healthy.
+
+    GET rather than HEAD: some servers answer HEAD with 405 or 501 although the host is fine.
+    """
+    http = session or requests.Session()
+    start = time.perf_counter()
+    try:
+        with http.get(url, timeout=(timeout, timeout), stream=True, allow_redirects=False) as r:
+            ok, detail = r.status_code < 500, f"HTTP {r.status_code}"
+    except requests.RequestException as exc:
+        ok, detail = False, f"{type(exc).__name__}: {exc}"
+    finally:
+        if session is None:
+            http.close()
+    return HealthResult(url, ok, detail, time.perf_counter() - start)
@@ -0,0 +1,98 @@
+"""
+Shared HTTP client for the API tests.
+
+A single requests.Session keeps TCP (and TLS) connections alive between tests so only the first
+request to a host pays the handshake. Idempotent calls are retried with exponential backoff on
+connection errors and on the usual transient gateway statuses, and every call gets a split
+(connect, read) timeout unless the caller passes its own. With a Cassette the client records
+responses to disk or replays them without network access (see utils.cassette). A CircuitBreaker
+and a Deadline (see utils.health) make calls fail at once when the host is gone or the session
+has run out of time. Every response carries its RequestTiming (connect, time to first byte,
+total; see utils.latency), which a LatencyRecorder collects by operation.
+"""
+import time
+from typing import Any, Iterable, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.cassette import Cassette, CassetteAdapter
+from utils.health import CircuitBreaker, Deadline
+from utils.latency import LatencyRecorder, RequestTiming, install_connect_timing, take_connect_time
+
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRY_STATUSES = (429, 502, 503, 504)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class ApiClient(requests.Session):
+    """requests.Session with connection pooling, retries on idempotent calls and default timeouts.
+
+    It is a drop-in replacement for the module level requests functions:
+    ``client.get(url)`` instead of ``requests.get(url, timeout=10)``.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        retries: int = 3,
+        backoff_factor: float = 0.3,
+        pool_maxsize: int = 20,
+        retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        cassette: Optional[Cassette] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        deadline: Optional[Deadline] = None,
+        latency: Optional[LatencyRecorder] = None,
+    ) -> None:
+        super().__init__()
+        self.timeout: Timeout = (connect_timeout, read_timeout)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            allowed_methods=frozenset(m.upper() for m in retry_methods),
+            status_forcelist=tuple(retry_statuses),
+            # hand the last response back to the test instead of raising MaxRetryError
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        pool = dict(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.cassette = cassette
+        self.breaker = breaker
+        self.deadline = deadline
+        self.latency = latency
+        adapter = HTTPAdapter(**pool) if cassette is None else CassetteAdapter(cassette, **pool)
+        install_connect_timing(adapter)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method: str, url: Union[str, bytes], *args: Any, timeout: Optional[Timeout] = None, **kwargs: Any) -> requests.Response:
+        timeout = timeout if timeout is not None else self.timeout
+        if self.breaker is not None:
+            self.breaker.before_call(str(url))
+        if self.deadline is not None:
+            timeout = self.deadline.clamp(timeout, str(url))
+        take_connect_time()
+        start = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, timeout=timeout, **kwargs)
+        except requests.ConnectionError as exc:
+            if self.breaker is not None:
+                self.breaker.failure(exc)
+            raise
+        if self.breaker is not None:
+            self.breaker.success()
+        # total is up to the end of the body, or up to the headers for stream=True
+        response.timing = RequestTiming(take_connect_time(), response.elapsed.total_seconds(), time.perf_counter() - start)
+        if self.latency is not None and (self.cassette is None or self.cassette.recording):
+            self.latency.record(method, str(url), response.timing)
+        return response
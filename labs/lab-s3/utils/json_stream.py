@@ -0,0 +1,115 @@
+"""
+Incremental parsing of JSON array responses.
+
+iter_json_array yields the items of a top-level JSON array while the body is still downloading,
+holding only the undecoded tail of the body and the current item in memory. Callers that stop
+iterating early (fixture discovery looking for the first match) close the response, so the rest
+of a large list is never downloaded or parsed.
+"""
+import codecs
+import json
+from typing import Any, Iterator
+
+import requests
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class JsonStreamError(ValueError):
+    """Raised when a streamed body is not a JSON array."""
+
+
+def iter_json_array(response: requests.Response, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Yield the items of a JSON array body one at a time.
+
+    The response should be requested with stream=True; otherwise the body is already in memory
+    and this only saves building the list. A callable ``response.item_check(index, item)`` (set
+    by a response hook such as utils.operation_index.ResponseSchemaHook) is called for every item
+    before it is yielded.
+    """
+    item_check = getattr(response, "item_check", None)
+    index = 0
+    chunks = response.iter_content(chunk_size=chunk_size)
+    text_decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def _more() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            eof = True
+            buf = buf[pos:] + text_decoder.decode(b"", final=True)
+            pos = 0
+            return True
+        # drop the consumed prefix so the buffer stays about one chunk long
+        buf = buf[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        return True
+
+    def _skip_whitespace() -> bool:
+        """Advance pos to the next significant character; False at the end of the body."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return True
+            if not _more():
+                return False
+
+    if not _skip_whitespace() or buf[pos] != "[":
+        raise JsonStreamError(f"expected a JSON array from {response.url}")
+    pos += 1
+
+    first = True
+    while True:
+        if not _skip_whitespace():
+            raise JsonStreamError(f"unterminated JSON array from {response.url}")
+        if buf[pos] == "]":
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise JsonStreamError(f"expected ',' at offset {pos} of streamed array from {response.url}")
+            pos += 1
+            if not _skip_whitespace():
+                raise JsonStreamError(f"unterminated JSON array from {response.url}")
+        first = False
+
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # the item continues in the next chunk
+                if not _more():
+                    raise
+                continue
+            # the item is complete only once its delimiter has arrived: a number cut by the chunk
+            # boundary ("1.5e" + "3,") also decodes, to the wrong value
+            j = end
+            while j < len(buf) and buf[j] in _WHITESPACE:
+                j += 1
+            if (j == len(buf) or buf[j] not in ",]") and _more():
+                continue
+            pos = end
+            break
+        if item_check is not None:
+            item_check(index, item)
+        index += 1
+        yield item
+
+
+def iter_json_items(client: requests.Session, url: str, **kwargs: Any) -> Iterator[Any]:
+    """GET url and yield the items of its JSON array body as they arrive.
+
+    Raises requests.HTTPError for non-2xx responses. The connection is released when the
+    iteration finishes or the generator is closed early.
+    """
+    with client.get(url, stream=True, **kwargs) as r:
+        r.raise_for_status()
+        yield from iter_json_array(r)
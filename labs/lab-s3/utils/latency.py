@@ -0,0 +1,240 @@
+"""
+Per-operation latency history and regression detection.
+
+The ApiClient times every request: connect (TCP and TLS handshakes of new connections; 0 on a
+reused keep-alive connection), time to first byte (until the response headers are parsed,
+including the connect) and total (until the body is read, for non-streamed requests).
+A LatencyRecorder collects the timings of a session; at its end they go into a small SQLite
+LatencyHistory by spec operation. compare() then checks each operation's time to first byte
+against the samples of the previous runs (the rolling baseline) with a one-sided Mann-Whitney U
+test. An operation counts as regressed when the slowdown is significant and its
+median grew by more than a threshold.
+"""
+import math
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from utils.operation_index import OperationIndex
+
+_connect_time = threading.local()
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - start
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def install_connect_timing(adapter: HTTPAdapter) -> None:
+    """Make the connection pools of adapter time their connects (see take_connect_time)."""
+    adapter.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+def take_connect_time() -> float:
+    """Seconds the current thread spent connecting since the last call."""
+    seconds = getattr(_connect_time, "seconds", 0.0)
+    _connect_time.seconds = 0.0
+    return seconds
+
+
+@dataclass(frozen=True)
+class RequestTiming:
+    connect: float
+    ttfb: float
+    total: float
+
+
+class LatencyRecorder:
+    """Thread-safe collection of the request timings of a session.
+
+    Requests are mapped to spec operations only in by_operation(), so recording can start
+    before the spec is loaded.
+    """
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[str, str, RequestTiming]] = []
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, timing: RequestTiming) -> None:
+        with self._lock:
+            self.requests.append((method.upper(), url, timing))
+
+    def by_operation(self, index: OperationIndex) -> List[Tuple[str, float, float, float]]:
+        """Return (operation, connect_ms, ttfb_ms, total_ms) rows; requests unknown to the spec are dropped."""
+        rows = []
+        for method, url, timing in self.requests:
+            match = index.match(method, url)
+            if match is not None:
+                rows.append((str(match.operation), timing.connect * 1000.0, timing.ttfb * 1000.0, timing.total * 1000.0))
+        return rows
+
+
+def mann_whitney_greater(current: Sequence[float], baseline: Sequence[float]) -> Tuple[float, float]:
+    """One-sided Mann-Whitney U test that current tends to be larger than baseline.
+
+    Returns (U of current, p-value) from the normal approximation with tie and continuity
+    corrections; from about five samples per side against a larger baseline it is adequate for a
+    gate that also requires a minimum slowdown.
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 0.0, 1.0
+    pooled = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    n = n1 + n2
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        rank = (i + j) / 2.0 + 1.0
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if pooled[k][1] == 0)
+        i = j + 1
+    u = rank_sum - n1 * (n1 + 1) / 2.0
+    mean = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2.0))
+
+
+@dataclass
+class OperationComparison:
+    operation: str
+    samples: int
+    baseline_samples: int
+    median_ms: float
+    baseline_median_ms: float
+    p_value: float
+    regressed: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.median_ms / self.baseline_median_ms if self.baseline_median_ms > 0 else float("inf")
+
+
+class LatencyHistory:
+    """SQLite store of per-request timings of past runs, keyed by target (the API under test)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run TEXT PRIMARY KEY, target TEXT NOT NULL, started REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS samples (
+            run TEXT NOT NULL, operation TEXT NOT NULL,
+            connect_ms REAL NOT NULL, ttfb_ms REAL NOT NULL, total_ms REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS samples_run_operation ON samples (run, operation);
+    """
+
+    def __init__(self, path: str, keep_runs: int = 50) -> None:
+        self.path = path
+        self.keep_runs = keep_runs
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # pytest-xdist workers write concurrently: wait for the lock instead of failing
+        self._db = sqlite3.connect(path, timeout=60.0, check_same_thread=False)
+        self._db.executescript(self.SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def add(self, run: str, target: str, samples: Sequence[Tuple[str, float, float, float]]) -> None:
+        """Append samples to run (several workers may add to the same run) and drop the oldest runs."""
+        with self._db:
+            self._db.execute("INSERT OR IGNORE INTO runs (run, target, started) VALUES (?, ?, ?)", (run, target, time.time()))
+            self._db.executemany(
+                "INSERT INTO samples (run, operation, connect_ms, ttfb_ms, total_ms) VALUES (?, ?, ?, ?, ?)",
+                [(run, *sample) for sample in samples],
+            )
+            old = [r for (r,) in self._db.execute(
+                "SELECT run FROM runs WHERE target = ? ORDER BY started DESC LIMIT -1 OFFSET ?", (target, self.keep_runs)
+            )]
+            for r in old:
+                self._db.execute("DELETE FROM samples WHERE run = ?", (r,))
+                self._db.execute("DELETE FROM runs WHERE run = ?", (r,))
+
+    def _ttfb_by_operation(self, runs: Sequence[str]) -> Dict[str, List[float]]:
+        by_operation: Dict[str, List[float]] = {}
+        if not runs:
+            return by_operation
+        marks = ",".join("?" * len(runs))
+        for operation, ttfb in self._db.execute(f"SELECT operation, ttfb_ms FROM samples WHERE run IN ({marks})", tuple(runs)):
+            by_operation.setdefault(operation, []).append(ttfb)
+        return by_operation
+
+    def compare(
+        self,
+        run: str,
+        baseline_runs: int = 10,
+        threshold: float = 0.2,
+        alpha: float = 0.01,
+        min_samples: int = 5,
+        min_delta_ms: float = 2.0,
+    ) -> List[OperationComparison]:
+        """Compare the time to first byte of run with the previous baseline_runs runs of its target.
+
+        An operation regresses when the test gives p < alpha, its median grew by more than
+        threshold (0.2 = 20%) and by at least min_delta_ms. Operations with fewer than min_samples
+        samples on either side are not judged.
+        """
+        row = self._db.execute("SELECT target, started FROM runs WHERE run = ?", (run,)).fetchone()
+        if row is None:
+            return []
+        target, started = row
+        previous = [r for (r,) in self._db.execute(
+            "SELECT run FROM runs WHERE target = ? AND started < ? AND run != ? ORDER BY started DESC LIMIT ?",
+            (target, started, run, baseline_runs),
+        )]
+        current = self._ttfb_by_operation([run])
+        baseline = self._ttfb_by_operation(previous)
+        results = []
+        for operation in sorted(current):
+            now, before = current[operation], baseline.get(operation, [])
+            if len(now) < min_samples or len(before) < min_samples:
+                continue
+            median, base_median = statistics.median(now), statistics.median(before)
+            _, p = mann_whitney_greater(now, before)
+            regressed = p < alpha and median > base_median * (1 + threshold) and median - base_median >= min_delta_ms
+            results.append(OperationComparison(operation, len(now), len(before), median, base_median, p, regressed))
+        return results
+
+
+def format_comparison(results: List[OperationComparison]) -> str:
+    lines = [f"{'median ms':>10}  {'baseline':>9}  {'ratio':>6}  {'p':>8}  operation"]
+    for c in sorted(results, key=lambda c: -c.ratio):
+        flag = "  REGRESSED" if c.regressed else ""
+        lines.append(f"{c.median_ms:10.1f}  {c.baseline_median_ms:9.1f}  {c.ratio:6.2f}  {c.p_value:8.1e}  {c.operation}{flag}")
+    return "\n".join(lines)
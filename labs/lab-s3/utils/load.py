@@ -0,0 +1,323 @@
+"""
+Load mode for the API suite: drive a weighted request mix for a fixed duration and report latency.
+
+The calls come from the spec's operations (built with utils.sweep.build_calls) and run on a
+pooled ApiClient built with retries=0: a retried request would hide its failure and add the
+backoff sleeps to its latency. Workers either run closed-loop (each worker sends its next request as
+soon as the previous one finished) or open-loop at a target rate. In open-loop mode latency is
+measured from the request's scheduled start, so a stalled server is not hidden by the load
+generator slowing down with it (coordinated omission). Latencies go into a log-linear histogram
+(HDR style, about 1% relative error) per operation, and SLO thresholds such as "p95<200ms" turn
+the report into a pass/fail gate.
+"""
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from utils.sweep import Check, SweepCall, default_check
+
+_SUB_BUCKET_BITS = 7
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+_HALF = _SUB_BUCKETS >> 1
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies in microseconds.
+
+    Values below 128us are stored exactly; above that every power of two is split into 64
+    buckets, so a reported percentile is within 1.6% of the recorded value regardless of scale.
+    Counts are kept sparse, so memory grows only with the number of distinct buckets hit.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - _SUB_BUCKET_BITS
+        return _SUB_BUCKETS + (shift - 1) * _HALF + ((value >> shift) - _HALF)
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """Return the midpoint of the value range a bucket covers."""
+        if index < _SUB_BUCKETS:
+            return index
+        shift, offset = divmod(index - _SUB_BUCKETS, _HALF)
+        shift += 1
+        low = (offset + _HALF) << shift
+        return low + ((1 << shift) >> 1)
+
+    def record(self, seconds: float) -> None:
+        value = max(0, int(seconds * 1_000_000))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        self.counts.update(other.counts)
+        self.count += other.count
+        self.total += other.total
+        for v in (other.min, other.max):
+            if v is not None:
+                self.min = v if self.min is None else min(self.min, v)
+                self.max = v if self.max is None else max(self.max, v)
+
+    def percentile(self, p: float) -> float:
+        """Return the p-th percentile (0-100) in milliseconds, 0.0 when nothing was recorded."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                value = min(self._value(index), self.max)
+                return max(value, self.min) / 1000.0
+        return self.max / 1000.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count / 1000.0 if self.count else 0.0
+
+
+@dataclass
+class OperationStats:
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: Counter = field(default_factory=Counter)
+
+    @property
+    def requests(self) -> int:
+        return self.histogram.count
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.requests if self.requests else 0.0
+
+    def merge(self, other: "OperationStats") -> None:
+        self.histogram.merge(other.histogram)
+        self.errors.update(other.errors)
+
+
+@dataclass
+class LoadReport:
+    duration: float
+    operations: Dict[str, OperationStats]
+
+    @property
+    def total(self) -> OperationStats:
+        merged = OperationStats()
+        for stats in self.operations.values():
+            merged.merge(stats)
+        return merged
+
+    def throughput(self, name: Optional[str] = None) -> float:
+        stats = self.total if name is None else self.operations[name]
+        return stats.requests / self.duration if self.duration else 0.0
+
+
+def _call_name(call: SweepCall) -> str:
+    return str(call.operation)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse a request mix like "GET /api/owners=3, GET /api/pettypes=1" into weights by operation."""
+    mix: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, sep, weight = part.rpartition("=")
+        if not sep:
+            name, weight = part, "1"
+        method, _, path = name.strip().partition(" ")
+        mix[f"{method.upper()} {path.strip()}"] = float(weight)
+    return mix
+
+
+def run_load(
+    client: requests.Session,
+    calls: Sequence[SweepCall],
+    duration: float,
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+    mix: Optional[Dict[str, float]] = None,
+    check: Check = default_check,
+    seed: int = 0,
+) -> LoadReport:
+    """Send requests drawn from calls (weighted by mix, default uniform) for duration seconds.
+
+    rate: total requests per second across all workers (open loop); None runs closed loop with
+          concurrency workers sending back to back
+
+    client should not retry (ApiClient(retries=0)): every response is counted as it arrives.
+    """
+    if mix:
+        weighted = [(c, mix[_call_name(c)]) for c in calls if mix.get(_call_name(c), 0) > 0]
+        unknown = set(mix) - {_call_name(c) for c in calls}
+        if unknown:
+            raise ValueError(f"request mix names operations that cannot be called: {', '.join(sorted(unknown))}")
+    else:
+        weighted = [(c, 1.0) for c in calls]
+    if not weighted:
+        raise ValueError("no calls to run")
+    targets = [c for c, _ in weighted]
+    weights = [w for _, w in weighted]
+
+    start = time.perf_counter()
+    end = start + duration
+    slot_lock = threading.Lock()
+    next_slot = [0]
+    results: List[Dict[str, OperationStats]] = []
+
+    def _scheduled() -> float:
+        if rate is None:
+            return time.perf_counter()
+        with slot_lock:
+            i = next_slot[0]
+            next_slot[0] += 1
+        return start + i / rate
+
+    def _worker(worker_seed: int) -> None:
+        rnd = random.Random(worker_seed)
+        # per-worker stats, merged after the run, so recording never contends on a lock
+        local: Dict[str, OperationStats] = {}
+        results.append(local)
+        while True:
+            scheduled = _scheduled()
+            if scheduled >= end:
+                return
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            call = rnd.choices(targets, weights)[0]
+            stats = local.setdefault(_call_name(call), OperationStats())
+            try:
+                r = client.request(call.operation.method.upper(), call.url)
+                failure = check(r)
+            except requests.RequestException as exc:
+                failure = f"request-failed: {type(exc).__name__}"
+            stats.histogram.record(time.perf_counter() - scheduled)
+            if failure:
+                stats.errors[failure[:80]] += 1
+
+    threads = [
+        threading.Thread(target=_worker, args=(seed + i,), name=f"load-{i}", daemon=True)
+        for i in range(max(1, concurrency))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    operations: Dict[str, OperationStats] = {}
+    for local in results:
+        for name, stats in local.items():
+            operations.setdefault(name, OperationStats()).merge(stats)
+    return LoadReport(time.perf_counter() - start, operations)
+
+
+@dataclass(frozen=True)
+class Slo:
+    """A threshold on one metric, optionally scoped to a single operation ("GET /api/owners")."""
+
+    metric: str
+    op: str
+    limit: float
+    operation: Optional[str] = None
+
+    def __str__(self) -> str:
+        scope = f"{self.operation}: " if self.operation else ""
+        return f"{scope}{self.metric}{self.op}{self.limit:g}"
+
+
+_SLO = re.compile(r"^(?:(?P<operation>.+?):\s*)?(?P<metric>p\d+(?:\.\d+)?|mean|max|error_rate|rps)\s*(?P<op><=|>=|<|>)\s*(?P<limit>[\d.]+)\s*(?P<unit>ms|s|%)?$")
+
+
+def parse_slo(text: str) -> Slo:
+    """Parse thresholds like "p95<200ms", "error_rate<1%", "rps>50" or "GET /api/owners: p99<500ms".
+
+    Latencies are in milliseconds (a bare number is taken as ms) and error_rate is a fraction
+    unless given in percent.
+    """
+    m = _SLO.match(text.strip())
+    if not m:
+        raise ValueError(f"invalid SLO {text!r}; expected e.g. 'p95<200ms' or 'error_rate<1%'")
+    limit = float(m.group("limit"))
+    unit = m.group("unit")
+    if unit == "s":
+        limit *= 1000.0
+    elif unit == "%":
+        limit /= 100.0
+    operation = m.group("operation")
+    return Slo(m.group("metric"), m.group("op"), limit, operation.strip() if operation else None)
+
+
+def _metric(stats: OperationStats, metric: str, duration: float) -> float:
+    if metric == "error_rate":
+        return stats.error_rate
+    if metric == "rps":
+        return stats.requests / duration if duration else 0.0
+    if metric == "mean":
+        return stats.histogram.mean
+    if metric == "max":
+        return (stats.histogram.max or 0) / 1000.0
+    return stats.histogram.percentile(float(metric[1:]))
+
+
+_COMPARE = {
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def check_slos(report: LoadReport, slos: Iterable[Slo]) -> List[str]:
+    """Return one message per violated SLO; an empty list means the run passed."""
+    violations = []
+    for slo in slos:
+        if slo.operation:
+            if slo.operation not in report.operations:
+                violations.append(f"{slo}: operation was not called")
+                continue
+            scopes = [(slo.operation, report.operations[slo.operation])]
+        else:
+            # unscoped thresholds apply to every operation, except throughput which applies to the total
+            scopes = [("total", report.total)] if slo.metric == "rps" else sorted(report.operations.items())
+        for name, stats in scopes:
+            value = _metric(stats, slo.metric, report.duration)
+            if not _COMPARE[slo.op](value, slo.limit):
+                violations.append(f"{name}: {slo.metric}={value:.3g} violates {slo.metric}{slo.op}{slo.limit:g}")
+    return violations
+
+
+def format_load_report(report: LoadReport) -> str:
+    """Return a fixed-width table of requests, throughput, error rate and latency per operation."""
+    lines = [f"{'reqs':>7}  {'rps':>7}  {'err%':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}  operation (ms)"]
+    rows = sorted(report.operations.items()) + [("total", report.total)]
+    for name, stats in rows:
+        h = stats.histogram
+        lines.append(
+            f"{stats.requests:7d}  {stats.requests / report.duration if report.duration else 0.0:7.1f}  "
+            f"{stats.error_rate * 100:6.2f}  {h.percentile(50):8.1f}  {h.percentile(95):8.1f}  "
+            f"{h.percentile(99):8.1f}  {(h.max or 0) / 1000.0:8.1f}  {name}"
+        )
+        for error, count in stats.errors.most_common(3):
+            lines.append(f"{'':>7}  {count:7d}  {error}")
+    return "\n".join(lines)
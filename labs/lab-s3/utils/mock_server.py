@@ -0,0 +1,461 @@
+"""
+Local mock petclinic generated from the OpenAPI spec.
+
+MockApi serves every operation of a spec from an in-memory store with plain REST semantics: the
+last literal path segment names the collection ("/api/owners/{ownerId}/pets" -> pets), a trailing
+path parameter addresses one record, and the other path parameters link records to their parents
+("ownerId" -> owners). The store is seeded with deterministic records generated from the response
+schemas, so every response validates against the spec, and POST/PUT/DELETE change the store so
+create/update/delete flows behave like the real service. Arrays named after another collection
+(an owner's "pets", a pet's "visits") are filled from the store when a record is rendered.
+
+MockServer puts a MockApi on a local ThreadingHTTPServer that also serves the spec itself (with
+its server URL rewritten to the mock), optionally adding latency and random errors:
+
+    python -m utils.mock_server --spec petclinic.json --port 9966 --latency 5 --error-rate 0.01
+"""
+import argparse
+import copy
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from utils.openapi_utils import get_validator_registry
+from utils.operation_index import Operation, get_operation_index
+from utils.schema_faker import SchemaFaker
+
+JSON = "application/json"
+
+
+def _singular(collection: str) -> str:
+    if collection.endswith("ies"):
+        return collection[:-3] + "y"
+    return collection[:-1] if collection.endswith("s") else collection
+
+
+class MockApi:
+    """In-memory implementation of the operations of a spec.
+
+    seed_count: records generated per collection
+    latency: seconds added to every response, or a (min, max) range drawn per request
+    error_rate: fraction of requests answered with error_status instead of being served
+    """
+
+    def __init__(
+        self,
+        spec: Dict[str, Any],
+        seed_count: int = 4,
+        latency: Union[float, Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0,
+    ) -> None:
+        self.spec = spec
+        self.index = get_operation_index(spec)
+        self.validators = get_validator_registry(spec)
+        self.faker = SchemaFaker(spec)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+
+        # collection name -> item schema, from the 2xx responses of its GET operations
+        self.schemas: Dict[str, Any] = {}
+        for op in self.index:
+            collection, is_item = self._target(op)
+            if collection and op.method == "get" and collection not in self.schemas:
+                schema = self._response_schema(op)
+                if not is_item:
+                    # keep the items' $ref as written, it identifies the collection in other schemas
+                    listed = self.faker.resolve(schema)
+                    schema = listed.get("items") if isinstance(listed, dict) and listed.get("type") == "array" else None
+                if schema is not None:
+                    self.schemas[collection] = schema
+        self._schema_refs = {
+            json.dumps(s, sort_keys=True): name for name, s in self.schemas.items()
+        }
+        self.store: Dict[str, Dict[int, Dict[str, Any]]] = {name: {} for name in self.schemas}
+        self._child_index: Dict[Tuple[str, str], Dict[Any, List[Dict[str, Any]]]] = {}
+        # array properties named after a collection ("pets" of an owner), filled in by render()
+        self._child_fields: Dict[str, List[str]] = {
+            name: [
+                field for field, prop in self.faker.properties(schema).items()
+                if field in self.store and self.faker.resolve(prop).get("type") == "array"
+            ]
+            for name, schema in self.schemas.items()
+        }
+        self.seed(seed_count)
+
+    # -- spec helpers -------------------------------------------------------------------------
+
+    @staticmethod
+    def _target(op: Operation) -> Tuple[Optional[str], bool]:
+        """Return (collection, is_item) addressed by an operation's path template."""
+        segments = [s for s in op.path.strip("/").split("/") if s]
+        literals = [s for s in segments if not s.startswith("{")]
+        if not literals:
+            return None, False
+        return literals[-1].lower(), bool(segments) and segments[-1].startswith("{")
+
+    def _collection_of_param(self, name: str) -> Optional[str]:
+        """Map a path parameter ("ownerId", "petTypeId") to the collection it identifies."""
+        if not name.lower().endswith("id"):
+            return None
+        base = name[:-2].lower()
+        for collection in self.schemas:
+            if _singular(collection) == base:
+                return collection
+        return None
+
+    def _response_schema(self, op: Operation, success_only: bool = True) -> Any:
+        for status, response in sorted(op.responses.items()):
+            if success_only and not str(status).startswith("2"):
+                continue
+            response = self.faker.resolve(response)
+            for media in (response.get("content") or {}).values():
+                if isinstance(media, dict) and media.get("schema"):
+                    return media["schema"]
+            if response.get("schema"):
+                return response["schema"]
+        return None
+
+    def _request_schema(self, op: Operation) -> Any:
+        body = self.faker.resolve(op.definition.get("requestBody") or {})
+        for media in (body.get("content") or {}).values():
+            if isinstance(media, dict) and media.get("schema"):
+                return media["schema"]
+        for param in op.definition.get("parameters") or []:
+            param = self.faker.resolve(param)
+            if param.get("in") == "body":
+                return param.get("schema")
+        return None
+
+    def _success_status(self, op: Operation, default: int) -> int:
+        codes = sorted(int(s) for s in op.responses if str(s).isdigit() and 200 <= int(s) < 300)
+        return codes[0] if codes else default
+
+    def _collection_for_schema(self, schema: Any) -> Optional[str]:
+        return self._schema_refs.get(json.dumps(schema, sort_keys=True))
+
+    def _link_field(self, parent: str) -> str:
+        return f"{_singular(parent)}Id"
+
+    # -- store --------------------------------------------------------------------------------
+
+    def seed(self, count: int) -> None:
+        """Replace the store with count deterministic records per collection."""
+        with self._lock:
+            self._child_index.clear()
+            for name in self.store:
+                self.store[name] = {}
+                for i in range(count):
+                    record = self.faker.generate(self.schemas[name], i, name)
+                    if not isinstance(record, dict):
+                        continue
+                    record["id"] = i + 1
+                    self.store[name][i + 1] = record
+            for name, records in self.store.items():
+                props = self.faker.properties(self.schemas[name])
+                for rid, record in records.items():
+                    self._link(name, rid, record, props, count)
+
+    def _link(self, name: str, rid: int, record: Dict[str, Any], props: Dict[str, Any], count: int) -> None:
+        for field, prop in props.items():
+            if field in self.store and self.faker.resolve(prop).get("type") == "array":
+                # children are rendered from the store
+                record.pop(field, None)
+                continue
+            parent = self._collection_of_param(field)
+            if parent and parent != name:
+                # two consecutive records per parent, so some parents have several children and some none
+                record[field] = (rid - 1) // 2 % count + 1
+                continue
+            ref = self._collection_for_schema(prop)
+            if ref and ref != name and self.store.get(ref):
+                # seeded ids are 1..count
+                record[field] = copy.deepcopy(self.store[ref][(rid - 1) % len(self.store[ref]) + 1])
+
+    def render(self, name: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a record as served: with its child collections filled in from the store."""
+        out = dict(record)
+        link = self._link_field(name)
+        for field in self._child_fields[name]:
+            out[field] = [self.render(field, c) for c in self._children(field, link, record["id"])]
+        return out
+
+    def _children(self, collection: str, link: str, parent_id: int) -> List[Dict[str, Any]]:
+        # grouped once per store version, so rendering a list is linear in the store size
+        groups = self._child_index.get((collection, link))
+        if groups is None:
+            groups = {}
+            for rid in sorted(self.store[collection]):
+                record = self.store[collection][rid]
+                groups.setdefault(record.get(link), []).append(record)
+            self._child_index[(collection, link)] = groups
+        return groups.get(parent_id, [])
+
+    # -- request handling ---------------------------------------------------------------------
+
+    @staticmethod
+    def _problem(status: int, title: str, detail: str = "") -> Tuple[int, Dict[str, str], bytes]:
+        body = {"type": "about:blank", "title": title, "status": status, "detail": detail}
+        return status, {"Content-Type": "application/problem+json"}, json.dumps(body).encode("utf-8")
+
+    @staticmethod
+    def _json(status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        if status == 204 or body is None:
+            return status, dict(headers or {}), b""
+        return status, dict(headers or {}, **{"Content-Type": JSON}), json.dumps(body).encode("utf-8")
+
+    def _delay(self) -> None:
+        if isinstance(self.latency, (tuple, list)):
+            with self._lock:
+                seconds = self._random.uniform(*self.latency)
+        else:
+            seconds = float(self.latency or 0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def handle(self, method: str, url: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Serve one request and return (status, headers, body)."""
+        self._delay()
+        if self.error_rate:
+            with self._lock:
+                failed = self._random.random() < self.error_rate
+            if failed:
+                return self._problem(self.error_status, "Injected error", "error injected by the mock server")
+
+        route = self.index.match(method, url)
+        if route is None:
+            if any(self.index.match(m, url) for m in ("get", "post", "put", "delete", "patch")):
+                return self._problem(405, "Method Not Allowed")
+            return self._problem(404, "Not Found", f"no operation for {method} {urlsplit(url).path}")
+
+        accept = next((v for k, v in headers.items() if k.lower() == "accept"), "*/*")
+        if "json" not in accept and "*/*" not in accept and "application/*" not in accept:
+            return self._problem(406, "Not Acceptable", f"only {JSON} is produced")
+
+        op = route.operation
+        collection, is_item = self._target(op)
+        if collection not in self.store:
+            return self._json(self._success_status(op, 200), self.faker.generate(self._response_schema(op)))
+
+        ids: Dict[str, int] = {}
+        for name, raw in route.path_params.items():
+            if not re.fullmatch(r"-?\d+", raw):
+                return self._problem(400, "Bad Request", f"path parameter {name} must be an integer, got {raw!r}")
+            ids[name] = int(raw)
+
+        with self._lock:
+            # every path parameter before the last names an existing parent record; the record is
+            # linked to its direct parent and to any other parent its schema has a field for
+            params = op.path_params
+            parents = params[:-1] if is_item else params
+            props = self.faker.properties(self.schemas[collection])
+            links: Dict[str, int] = {}
+            for n, name in enumerate(parents):
+                parent = self._collection_of_param(name)
+                if parent is None:
+                    continue
+                if ids[name] not in self.store[parent]:
+                    return self._problem(404, "Not Found", f"{_singular(parent)} {ids[name]} does not exist")
+                if n == len(parents) - 1 or self._link_field(parent) in props:
+                    links[self._link_field(parent)] = ids[name]
+
+            records = self.store[collection]
+            if is_item:
+                rid = ids[params[-1]]
+                record = records.get(rid)
+                if record is None or any(k in record and record[k] != v for k, v in links.items()):
+                    return self._problem(404, "Not Found", f"{_singular(collection)} {rid} does not exist")
+                return self._item(op, collection, record, body)
+            return self._collection(op, collection, links, url, body)
+
+    def _parse_body(self, op: Operation, body: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[int, Dict[str, str], bytes]]]:
+        try:
+            data = json.loads(body or b"null")
+        except ValueError as exc:
+            return None, self._problem(400, "Bad Request", f"invalid JSON: {exc}")
+        schema = self._request_schema(op)
+        if schema is not None:
+            errors = sorted(self.validators.validator_for_schema(schema).iter_errors(data), key=lambda e: list(e.path))
+            if errors:
+                detail = "; ".join(f"{'/'.join(map(str, e.absolute_path)) or '/'}: {e.message}" for e in errors[:5])
+                return None, self._problem(400, "Bad Request", detail)
+        if not isinstance(data, dict):
+            return None, self._problem(400, "Bad Request", "request body must be a JSON object")
+        return data, None
+
+    def _writable(self, collection: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        # child collections are owned by the store, never by the request body
+        return {k: v for k, v in data.items() if k not in self.store and k != "id"}
+
+    def _item(self, op: Operation, collection: str, record: Dict[str, Any], body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        if op.method == "get":
+            return self._json(self._success_status(op, 200), self.render(collection, record))
+        if op.method in ("put", "patch"):
+            data, error = self._parse_body(op, body)
+            if error:
+                return error
+            record.update(self._writable(collection, data))
+            self._child_index.clear()
+            status = self._success_status(op, 204)
+            return self._json(status, None if status == 204 else self.render(collection, record))
+        if op.method == "delete":
+            del self.store[collection][record["id"]]
+            self._child_index.clear()
+            status = self._success_status(op, 204)
+            return self._json(status, None if status == 204 else self.render(collection, record))
+        return self._problem(405, "Method Not Allowed")
+
+    def _collection(self, op: Operation, collection: str, links: Dict[str, int], url: str, body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        records = self.store[collection]
+        if op.method == "get":
+            declared = {p.get("name") for p in (self.faker.resolve(p) for p in op.definition.get("parameters") or []) if p.get("in") == "query"}
+            filters = [(k, v.lower()) for k, v in parse_qsl(urlsplit(url).query) if k in declared]
+            found = []
+            for rid in sorted(records):
+                record = records[rid]
+                if any(k in record and record[k] != v for k, v in links.items()):
+                    continue
+                # query filters match by prefix, like the petclinic lastName search
+                if all(str(record.get(k, "")).lower().startswith(v) for k, v in filters):
+                    found.append(self.render(collection, record))
+            return self._json(self._success_status(op, 200), found)
+        if op.method == "post":
+            data, error = self._parse_body(op, body)
+            if error:
+                return error
+            rid = max(records, default=0) + 1
+            record = dict(self._writable(collection, data), id=rid, **links)
+            records[rid] = record
+            self._child_index.clear()
+            location = f"{urlsplit(url).path.rstrip('/')}/{rid}"
+            return self._json(self._success_status(op, 201), self.render(collection, record), {"Location": location})
+        return self._problem(405, "Method Not Allowed")
+
+
+class MockServer:
+    """Serve a MockApi (and its spec) on a local port; use as a context manager or start()/stop().
+
+    The served spec is a copy whose first server URL points at the mock, so suites that take
+    their base URL from the spec talk to the mock without further configuration.
+    """
+
+    def __init__(self, api: MockApi, host: str = "127.0.0.1", port: int = 0, spec_path: str = "/v3/api-docs") -> None:
+        self.api = api
+        self.spec_path = spec_path
+        servers = api.spec.get("servers") or [{"url": ""}]
+        self.base_path = urlsplit(servers[0].get("url", "")).path.rstrip("/")
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.url = f"http://{host}:{self._httpd.server_address[1]}{self.base_path}"
+        self.spec_url = f"http://{host}:{self._httpd.server_address[1]}{spec_path}"
+        self._spec_body = json.dumps(dict(api.spec, servers=[{"url": self.url}])).encode("utf-8")
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # headers and body are written separately; without TCP_NODELAY every keep-alive
+            # response waits for the client's delayed ACK (~40ms)
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def handle(self) -> None:
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    # the client dropped a keep-alive connection between requests
+                    pass
+
+            def _serve(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if self.command == "GET" and urlsplit(self.path).path == server.spec_path:
+                    status, headers, data = 200, {"Content-Type": JSON}, server._spec_body
+                else:
+                    status, headers, data = server.api.handle(self.command, self.path, dict(self.headers.items()), body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    try:
+                        self.wfile.write(data)
+                    except (BrokenPipeError, ConnectionResetError):
+                        # the client stopped reading early (e.g. a streamed list it no longer needs)
+                        self.close_connection = True
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _serve
+
+        return Handler
+
+    def start(self) -> "MockServer":
+        # a short poll interval keeps stop() (and so per-test mocks) fast
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, name="mock-petclinic", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def load_spec(source: str) -> Dict[str, Any]:
+    """Load a spec from a file path or an http(s) URL."""
+    if source.startswith(("http://", "https://")):
+        import requests
+
+        r = requests.get(source, timeout=(3.05, 30))
+        r.raise_for_status()
+        return r.json()
+    with open(source, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock petclinic generated from an OpenAPI spec")
+    parser.add_argument("--spec", required=True, help="spec file or URL")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9966)
+    parser.add_argument("--spec-path", default="/petclinic/v3/api-docs", help="path the spec is served at")
+    parser.add_argument("--seed-count", type=int, default=4, help="records generated per collection")
+    parser.add_argument("--latency", type=float, default=0.0, help="milliseconds added to every response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    api = MockApi(load_spec(args.spec), seed_count=args.seed_count, latency=args.latency / 1000.0, error_rate=args.error_rate)
+    server = MockServer(api, args.host, args.port, args.spec_path)
+    print(f"mock petclinic on {server.url} (spec: {server.spec_url})")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,23 @@ Utilities to work with OpenAPI/Swagger specs for runtime schema validation.
 This helper supports both OpenAPI v2 (swagger 2.0) and OpenAPI v3+ specs. It lets tests
 extract response schemas for operations and validate JSON responses using jsonschema
 with the spec as the reference store for $ref resolution.
+
+Validators are compiled once and cached: every spec gets one ValidatorRegistry holding a
+`referencing` registry of the spec, and each registry keeps an LRU of compiled validators per
+(path, method, status) and per schema fragment.
 """
-from typing import Any, Dict, Optional
+import random
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
 import jsonschema
+from jsonschema.protocols import Validator
+from referencing import Registry, Resource
+from referencing.jsonschema import DRAFT4, DRAFT202012
+
+SPEC_URI = "urn:openapi-spec"
 
 
 def get_response_schema(spec: Dict[str, Any], path: str, method: str, status_code: int) -> Optional[Dict[str, Any]]:
@@ -46,25 +60,258 @@ def get_response_schema(spec: Dict[str, Any], path: str, method: str, status_cod
     return resp.get("schema")
 
 
+# Unicode letters for use inside a character class (Python's re has no \p{L}): the Latin, Greek,
+# Cyrillic, Armenian, Hebrew, Arabic, Thai and CJK blocks cover the names petclinic accepts
+_LETTER_RANGES = (
+    "A-Za-z\u00aa\u00b5\u00ba\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u02c1\u0370-\u03ff\u0400-\u0481"
+    "\u048a-\u052f\u0531-\u0556\u0561-\u0587\u05d0-\u05ea\u0620-\u064a\u0e01-\u0e30\u1e00-\u1fff"
+    "\u3040-\u30ff\u4e00-\u9fff\uac00-\ud7a3"
+)
+
+
+def python_pattern(pattern: str) -> str:
+    """Translate the \\p{L} (any letter) class of ECMA/Java patterns into Python re syntax."""
+    if "\\p{L}" not in pattern:
+        return pattern
+    out, in_class, i = [], False, 0
+    while i < len(pattern):
+        if pattern.startswith("\\p{L}", i):
+            out.append(_LETTER_RANGES if in_class else "[^\\W\\d_]")
+            i += 5
+            continue
+        ch = pattern[i]
+        if ch == "\\":
+            out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if ch == "[" and not in_class:
+            in_class = True
+        elif ch == "]" and in_class:
+            in_class = False
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _to_json_schema(node: Any, nullable: bool) -> Any:
+    """Return a copy of an OpenAPI schema node that plain JSON Schema validators understand.
+
+    Local refs ("#/components/...") are made absolute against SPEC_URI so they resolve from any
+    fragment, for OpenAPI 3.0 / swagger `nullable: true` becomes a "null" type, and `\\p{L}` in
+    patterns is translated for Python's re.
+    """
+    if isinstance(node, list):
+        return [_to_json_schema(n, nullable) for n in node]
+    if not isinstance(node, dict):
+        return node
+
+    out = {k: _to_json_schema(v, nullable) for k, v in node.items()}
+    if isinstance(out.get("pattern"), str):
+        out["pattern"] = python_pattern(out["pattern"])
+    ref = out.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#"):
+        out["$ref"] = SPEC_URI + ref
+    if nullable and out.pop("nullable", False) is True:
+        if "type" not in out and ("$ref" in out or "allOf" in out or "oneOf" in out or "anyOf" in out):
+            return {"anyOf": [out, {"type": "null"}]}
+        if isinstance(out.get("type"), str):
+            out["type"] = [out["type"], "null"]
+        if "enum" in out and None not in out["enum"]:
+            out["enum"] = list(out["enum"]) + [None]
+    return out
+
+
+class ValidatorRegistry:
+    """Compiled validators for one spec.
+
+    The spec is converted and registered in a `referencing` registry once; validators are compiled
+    on first use and kept in an LRU cache, so repeated validations skip both $ref registry setup
+    and schema checking.
+    """
+
+    def __init__(self, spec: Dict[str, Any], maxsize: int = 256) -> None:
+        self.spec = spec
+        version = str(spec.get("openapi") or spec.get("swagger") or "")
+        # OpenAPI 3.1 schemas are JSON Schema 2020-12; 3.0 and swagger 2.0 are draft 4 based
+        if version.startswith("3.1"):
+            self.validator_cls, specification, nullable = jsonschema.Draft202012Validator, DRAFT202012, False
+        else:
+            self.validator_cls, specification, nullable = jsonschema.Draft4Validator, DRAFT4, True
+        self._nullable = nullable
+        self._schema_spec = _to_json_schema(spec, nullable)
+        self.registry = Registry().with_resource(
+            SPEC_URI, Resource.from_contents(self._schema_spec, default_specification=specification)
+        )
+        self._fragments: "OrderedDict[int, Tuple[Dict[str, Any], Validator]]" = OrderedDict()
+        self._maxsize = maxsize
+        self.validator_for = lru_cache(maxsize=maxsize)(self._compile_operation)
+        self._item_validator_for = lru_cache(maxsize=maxsize)(self._compile_items)
+
+    def _compile(self, schema: Dict[str, Any]) -> Validator:
+        return self.validator_cls(schema, registry=self.registry)
+
+    def _compile_operation(self, path: str, method: str, status_code: int) -> Optional[Validator]:
+        schema = get_response_schema(self._schema_spec, path, method, status_code)
+        if schema is None:
+            return None
+        return self._compile(schema)
+
+    def validator_for_schema(self, schema: Dict[str, Any]) -> Validator:
+        """Return the compiled validator for a schema fragment taken from the spec."""
+        key = id(schema)
+        cached = self._fragments.get(key)
+        # the fragment itself is kept in the cache entry so its id cannot be reused while cached
+        if cached is not None and cached[0] is schema:
+            self._fragments.move_to_end(key)
+            return cached[1]
+
+        validator = self._compile(_to_json_schema(schema, self._nullable))
+        self._fragments[key] = (schema, validator)
+        if len(self._fragments) > self._maxsize:
+            self._fragments.popitem(last=False)
+        return validator
+
+    def item_validator_for(self, path: str, method: str, status_code: int) -> Optional[Validator]:
+        """Return the compiled validator for the items of an array response, if declared."""
+        return self._item_validator_for(path, method.lower(), int(status_code))
+
+    def _compile_items(self, path: str, method: str, status_code: int) -> Optional[Validator]:
+        schema = get_response_schema(self._schema_spec, path, method, status_code)
+        if not schema or schema.get("type") != "array" or not schema.get("items"):
+            return None
+        return self._compile(schema["items"])
+
+    def validate(self, instance: Any, path: str, method: str, status_code: int) -> None:
+        """Validate a response body for an operation; no-op when the spec declares no schema."""
+        validator = self.validator_for(path, method.lower(), int(status_code))
+        if validator is not None:
+            validator.validate(instance)
+
+
+_REGISTRIES: "OrderedDict[int, ValidatorRegistry]" = OrderedDict()
+_MAX_REGISTRIES = 8
+
+
+def get_validator_registry(spec: Dict[str, Any]) -> ValidatorRegistry:
+    """Return the (cached) ValidatorRegistry for a spec, building it on first use."""
+    key = id(spec)
+    registry = _REGISTRIES.get(key)
+    if registry is not None and registry.spec is spec:
+        _REGISTRIES.move_to_end(key)
+        return registry
+
+    registry = ValidatorRegistry(spec)
+    _REGISTRIES[key] = registry
+    if len(_REGISTRIES) > _MAX_REGISTRIES:
+        _REGISTRIES.popitem(last=False)
+    return registry
+
+
 def validate_against_schema(instance: Any, schema: Dict[str, Any], spec: Dict[str, Any]) -> None:
     """Validate a JSON instance against a schema fragment from the spec.
 
-    This uses jsonschema and sets the spec as the resolution scope so $ref like "#/definitions/Pet"
-    resolve correctly.
+    The compiled validator is resolved against the spec's `referencing` registry so $ref like
+    "#/definitions/Pet" or "#/components/schemas/Pet" resolve correctly. Raises
+    jsonschema.exceptions.ValidationError on failure.
     """
     if schema is None:
         # nothing to validate against
         return
 
-    # jsonschema's RefResolver.from_schema builds a resolver that can resolve internal refs
-    try:
-        resolver = jsonschema.RefResolver.from_schema(spec)
-    except Exception:
-        # Fallback: no resolver
-        resolver = None
-
-    # Perform validation (this raises jsonschema.exceptions.ValidationError on failure)
-    if resolver is not None:
-        jsonschema.validate(instance=instance, schema=schema, resolver=resolver)
-    else:
-        jsonschema.validate(instance=instance, schema=schema)
+    get_validator_registry(spec).validator_for_schema(schema).validate(instance)
+
+
+def validate_response(instance: Any, spec: Dict[str, Any], path: str, method: str, status_code: int) -> None:
+    """Validate a response body against the schema the spec declares for (path, method, status)."""
+    get_validator_registry(spec).validate(instance, path, method, status_code)
+
+
+@dataclass
+class BulkValidationResult:
+    """Outcome of validating a collection against an item schema.
+
+    errors counts failures per JSON pointer inside an item (array indices below the item are
+    collapsed to "*"), examples keeps the first message seen for each pointer.
+    """
+
+    total: int = 0
+    checked: int = 0
+    invalid_items: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    examples: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.invalid_items == 0
+
+    def summary(self) -> str:
+        lines = [f"{self.invalid_items} of {self.checked} checked items invalid ({self.total} items seen)"]
+        for pointer, count in sorted(self.errors.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {pointer or '/'}: {count}x, e.g. {self.examples[pointer]}")
+        return "\n".join(lines)
+
+    def raise_for_errors(self) -> None:
+        if not self.ok:
+            raise AssertionError(self.summary())
+
+
+def _pointer(path: Iterable[Any]) -> str:
+    parts = ["*" if isinstance(p, int) else str(p).replace("~", "~0").replace("/", "~1") for p in path]
+    return "/" + "/".join(parts) if parts else ""
+
+
+def validate_items(
+    items: Iterable[Any],
+    validator: Validator,
+    sample: float = 0.1,
+    min_items: int = 20,
+    collect_all: bool = False,
+    seed: Optional[int] = 0,
+) -> BulkValidationResult:
+    """Validate every (or a sampled share of every) item of a collection with one compiled validator.
+
+    items: any iterable, so streamed responses are validated in constant memory
+    sample: fraction of items validated after the first min_items (1.0 validates everything)
+    collect_all: keep going after the first invalid item and aggregate all errors
+    seed: seed for the sampling decisions (None for a random sample per run)
+    """
+    rng = random.Random(seed)
+    result = BulkValidationResult()
+    for index, item in enumerate(items):
+        result.total += 1
+        if index >= min_items and sample < 1.0 and rng.random() >= sample:
+            continue
+        result.checked += 1
+        # is_valid is the cheap path; errors are only materialised for invalid items
+        if validator.is_valid(item):
+            continue
+
+        result.invalid_items += 1
+        for error in validator.iter_errors(item):
+            pointer = _pointer(error.absolute_path)
+            result.errors[pointer] = result.errors.get(pointer, 0) + 1
+            result.examples.setdefault(pointer, f"item {index}: {error.message}")
+        if not collect_all:
+            break
+    return result
+
+
+def validate_collection(
+    items: Iterable[Any], item_schema: Dict[str, Any], spec: Dict[str, Any], **kwargs: Any
+) -> BulkValidationResult:
+    """Validate a collection against an item schema fragment from the spec; see validate_items."""
+    validator = get_validator_registry(spec).validator_for_schema(item_schema)
+    return validate_items(items, validator, **kwargs)
+
+
+def validate_response_collection(
+    items: Iterable[Any], spec: Dict[str, Any], path: str, method: str, status_code: int, **kwargs: Any
+) -> Optional[BulkValidationResult]:
+    """Validate an array response against the item schema of (path, method, status).
+
+    Returns None when the spec declares no array schema for the operation.
+    """
+    validator = get_validator_registry(spec).item_validator_for(path, method, status_code)
+    if validator is None:
+        return None
+    return validate_items(items, validator, **kwargs)
@@ -0,0 +1,262 @@
+"""
+Operation index and path-template router for an OpenAPI spec.
+
+The index is built once per spec: every (path template, method) pair becomes an Operation, and
+the templates are stored in a trie so a concrete request ("GET /petclinic/api/pettypes/3") is
+routed to its operation and path parameters in O(path depth). This lets code that only knows the
+requested URL (for example a requests response hook) look up the response schemas to validate.
+"""
+import random
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, unquote
+
+import requests
+
+from utils.openapi_utils import get_response_schema, get_validator_registry, validate_items
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+
+
+@dataclass(frozen=True)
+class Operation:
+    """One operation of the spec."""
+
+    path: str
+    method: str
+    definition: Dict[str, Any] = field(compare=False, repr=False)
+
+    @property
+    def operation_id(self) -> Optional[str]:
+        return self.definition.get("operationId")
+
+    @property
+    def tags(self) -> List[str]:
+        return list(self.definition.get("tags") or [])
+
+    @property
+    def responses(self) -> Dict[str, Any]:
+        return self.definition.get("responses") or {}
+
+    @property
+    def path_params(self) -> List[str]:
+        return [seg[1:-1] for seg in self.path.strip("/").split("/") if seg.startswith("{") and seg.endswith("}")]
+
+    def declares(self, status_code: int) -> bool:
+        """True when the spec documents this exact status code for the operation."""
+        return str(status_code) in self.responses
+
+    def __str__(self) -> str:
+        return f"{self.method.upper()} {self.path}"
+
+
+@dataclass
+class RouteMatch:
+    operation: Operation
+    path_params: Dict[str, str]
+
+
+class _Node:
+    __slots__ = ("literals", "param", "operations")
+
+    def __init__(self) -> None:
+        self.literals: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        self.operations: Dict[str, Operation] = {}
+
+
+def _segments(path: str) -> List[str]:
+    return [s for s in path.strip("/").split("/") if s]
+
+
+class OperationIndex:
+    """Pre-built index of all operations of a spec with a trie router for concrete URLs."""
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        self.spec = spec
+        self._root = _Node()
+        self._operations: Dict[Tuple[str, str], Operation] = {}
+
+        for path, path_item in (spec.get("paths") or {}).items():
+            node = self._root
+            for seg in _segments(path):
+                if seg.startswith("{") and seg.endswith("}"):
+                    if node.param is None:
+                        node.param = _Node()
+                    node = node.param
+                else:
+                    node = node.literals.setdefault(seg, _Node())
+            for method, op in path_item.items():
+                if method.lower() not in HTTP_METHODS or not isinstance(op, dict):
+                    continue
+                operation = Operation(path, method.lower(), op)
+                node.operations[method.lower()] = operation
+                self._operations[(path, method.lower())] = operation
+
+        # base paths of the declared servers ("/petclinic"), longest first
+        bases = {urlsplit(s.get("url", "")).path.rstrip("/") for s in spec.get("servers") or []}
+        bases.add(str(spec.get("basePath") or "").rstrip("/"))
+        self._base_paths = sorted(bases, key=len, reverse=True)
+
+    def __iter__(self) -> Iterator[Operation]:
+        return iter(self._operations.values())
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def get(self, path: str, method: str) -> Optional[Operation]:
+        """Return the operation for a path template as declared in the spec."""
+        return self._operations.get((path, method.lower()))
+
+    def operations(
+        self,
+        method: Optional[str] = None,
+        tag: Optional[str] = None,
+        predicate: Optional[Callable[[Operation], bool]] = None,
+    ) -> List[Operation]:
+        """Return the operations filtered by method, tag (case-insensitive) and/or a predicate."""
+        ops = []
+        for op in self._operations.values():
+            if method and op.method != method.lower():
+                continue
+            if tag and tag.lower() not in (t.lower() for t in op.tags if isinstance(t, str)):
+                continue
+            if predicate and not predicate(op):
+                continue
+            ops.append(op)
+        return ops
+
+    def _walk(self, node: _Node, segs: List[str], i: int, values: List[str]) -> Optional[_Node]:
+        if i == len(segs):
+            return node if node.operations else None
+        child = node.literals.get(segs[i])
+        if child is not None:
+            found = self._walk(child, segs, i + 1, values)
+            if found is not None:
+                return found
+        if node.param is not None:
+            values.append(unquote(segs[i]))
+            found = self._walk(node.param, segs, i + 1, values)
+            if found is not None:
+                return found
+            values.pop()
+        return None
+
+    def match(self, method: str, url: str) -> Optional[RouteMatch]:
+        """Route a concrete URL (absolute or path only) and method to its operation."""
+        path = urlsplit(url).path
+        for base in self._base_paths:
+            if base and (path == base or path.startswith(base + "/")):
+                path = path[len(base):]
+                break
+
+        values: List[str] = []
+        node = self._walk(self._root, _segments(path), 0, values)
+        if node is None:
+            return None
+        op = node.operations.get(method.lower())
+        if op is None:
+            return None
+        # templates sharing a trie node may name their parameters differently, so name them per operation
+        return RouteMatch(op, dict(zip(op.path_params, values)))
+
+    def response_schema(self, operation: Operation, status_code: int) -> Optional[Dict[str, Any]]:
+        return get_response_schema(self.spec, operation.path, operation.method, status_code)
+
+
+_INDEXES: "OrderedDict[int, OperationIndex]" = OrderedDict()
+_MAX_INDEXES = 8
+
+
+def get_operation_index(spec: Dict[str, Any]) -> OperationIndex:
+    """Return the (cached) OperationIndex for a spec, building it on first use."""
+    key = id(spec)
+    index = _INDEXES.get(key)
+    if index is not None and index.spec is spec:
+        _INDEXES.move_to_end(key)
+        return index
+
+    index = OperationIndex(spec)
+    _INDEXES[key] = index
+    if len(_INDEXES) > _MAX_INDEXES:
+        _INDEXES.popitem(last=False)
+    return index
+
+
+class ResponseSchemaError(AssertionError):
+    """Raised by ResponseSchemaHook when a response does not match its documented schema."""
+
+
+class ResponseSchemaHook:
+    """requests response hook validating every JSON response against the spec.
+
+    Register with ``session.hooks["response"].append(ResponseSchemaHook(spec))``. Responses are
+    routed through the OperationIndex; only status codes the operation documents are validated,
+    and array bodies are bulk validated with the given sample fraction. Streamed responses
+    (stream=True) are not read here: the hook attaches a StreamedItemCheck that
+    utils.json_stream.iter_json_array applies to the items as they arrive.
+    """
+
+    def __init__(self, spec: Dict[str, Any], sample: float = 0.1) -> None:
+        self.index = get_operation_index(spec)
+        self.validators = get_validator_registry(spec)
+        self.sample = sample
+        self.validated = 0
+
+    def __call__(self, response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        if "json" not in response.headers.get("Content-Type", ""):
+            return response
+        # requests passes send()'s stream flag to response hooks; hooks run before any body is read,
+        # so reading a streamed body here would download and parse it whole
+        streamed = bool(kwargs.get("stream"))
+        if not streamed and not response.content:
+            return response
+        route = self.index.match(response.request.method, response.url)
+        if route is None or not route.operation.declares(response.status_code):
+            return response
+
+        op, status = route.operation, response.status_code
+        if streamed:
+            item_validator = self.validators.item_validator_for(op.path, op.method, status)
+            if item_validator is not None:
+                response.item_check = StreamedItemCheck(f"{op} {response.url} returned {status}", item_validator, self.sample)
+                self.validated += 1
+            return response
+
+        try:
+            body = response.json()
+        except ValueError as exc:
+            raise ResponseSchemaError(f"{op} returned {status} with invalid JSON: {exc}")
+
+        item_validator = self.validators.item_validator_for(op.path, op.method, status)
+        if item_validator is not None and isinstance(body, list):
+            result = validate_items(body, item_validator, sample=self.sample, collect_all=True)
+            if not result.ok:
+                raise ResponseSchemaError(f"{op} {response.url} returned {status}:\n{result.summary()}")
+        else:
+            validator = self.validators.validator_for(op.path, op.method, status)
+            if validator is not None:
+                errors = [f"{'/'.join(map(str, e.absolute_path)) or '/'}: {e.message}" for e in validator.iter_errors(body)]
+                if errors:
+                    raise ResponseSchemaError(f"{op} {response.url} returned {status}:\n  " + "\n  ".join(errors))
+        self.validated += 1
+        return response
+
+
+class StreamedItemCheck:
+    """Validates the items of a streamed array body one by one, sampled like validate_items."""
+
+    def __init__(self, context: str, validator: Any, sample: float = 0.1, min_items: int = 20) -> None:
+        self.context = context
+        self.validator = validator
+        self.sample = sample
+        self.min_items = min_items
+        self._rng = random.Random(0)
+
+    def __call__(self, index: int, item: Any) -> None:
+        if index >= self.min_items and self.sample < 1.0 and self._rng.random() >= self.sample:
+            return
+        errors = [f"{'/'.join(map(str, e.absolute_path)) or '/'}: {e.message}" for e in self.validator.iter_errors(item)]
+        if errors:
+            raise ResponseSchemaError(f"{self.context}, item {index}:\n  " + "\n  ".join(errors))
@@ -0,0 +1,119 @@
+"""
+Helpers for running the API suite on several pytest-xdist workers.
+
+Each worker is a separate process, so session fixtures run once per worker and in-process
+counters are not unique across workers. SharedSessionCache computes a session value once per
+test run and hands the same JSON to every worker through a file-locked cache directory, and
+UniqueIds gives ids that are unique per run, per worker and per call.
+"""
+import hashlib
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from filelock import FileLock
+
+WORKER_ENV = "PYTEST_XDIST_WORKER"
+RUN_UID_ENV = "PYTEST_XDIST_TESTRUNUID"
+
+
+def worker_id() -> str:
+    """Return the xdist worker id ("gw0", "gw1", ...) or "master" outside xdist."""
+    return os.environ.get(WORKER_ENV, "master")
+
+
+def worker_index() -> int:
+    wid = worker_id()
+    return int(wid[2:]) if wid.startswith("gw") and wid[2:].isdigit() else 0
+
+
+class UniqueIds:
+    """Collision-free integer ids: run stamp, worker index and a per-worker counter.
+
+    Two workers (or two runs a second apart) never produce the same id, unlike ids derived only
+    from the current time.
+    """
+
+    def __init__(self, worker: Optional[int] = None, stamp: Optional[int] = None) -> None:
+        self.worker = worker_index() if worker is None else worker
+        self.stamp = int(time.time()) % 1_000_000 if stamp is None else stamp
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            n = next(self._counter)
+        return (self.stamp * 100 + self.worker % 100) * 10_000 + n % 10_000
+
+
+class SharedSessionCache:
+    """JSON session values computed by the first worker that needs them and read by the others.
+
+    root: directory shared by the workers (e.g. under the pytest cache)
+    run_id: id of the test run, so values never leak into the next run; directories of runs
+            older than max_run_age seconds are removed
+    """
+
+    def __init__(self, root: str, run_id: str, lock_timeout: float = 120.0, max_run_age: float = 86400.0) -> None:
+        self.root = root
+        self.dir = os.path.join(root, run_id)
+        self.lock_timeout = lock_timeout
+        os.makedirs(self.dir, exist_ok=True)
+        self._prune(run_id, max_run_age)
+
+    def _prune(self, run_id: str, max_age: float) -> None:
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if name != run_id and os.path.isdir(path) and now - os.path.getmtime(path) > max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, hashlib.sha256(name.encode("utf-8")).hexdigest()[:24] + ".json")
+
+    def get(self, name: str, factory: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the shared value for name, computing it with factory() when missing or older than ttl."""
+        path = self._path(name)
+        with FileLock(path + ".lock", timeout=self.lock_timeout):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                if ttl is None or time.time() - entry["created"] < ttl:
+                    return entry["value"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+            value = factory()
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"name": name, "created": time.time(), "value": value}, f)
+            os.replace(tmp, path)
+            return value
+
+    def discard(self, name: str) -> None:
+        path = self._path(name)
+        with FileLock(path + ".lock", timeout=self.lock_timeout):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def discard_where(self, predicate: Callable[[str], bool]) -> None:
+        """Discard every value whose name matches predicate."""
+        for entry in os.listdir(self.dir):
+            if not entry.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.dir, entry), "r", encoding="utf-8") as f:
+                    name = json.load(f)["name"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if predicate(name):
+                self.discard(name)
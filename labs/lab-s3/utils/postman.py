@@ -0,0 +1,420 @@
+"""
+Run Postman collections (format v2.1) without Postman or Newman.
+
+load_collection() flattens the collection's folders into PostmanItems: the request with its
+{{variables}} resolved, and the pm.test blocks of its test script. The common assertions inside
+those blocks are translated into Python checks:
+
+    pm.response.to.have.status(200)
+    pm.response.to.be.ok
+    pm.expect(pm.response.code).to.eql(200)
+    pm.expect(pm.response.responseTime).to.be.below(200)
+    pm.expect(jsonData[0].USERNAME).to.eql('joe')      (jsonData = pm.response.json())
+    pm.response.to.have.header("Content-Type")
+
+A pm.test with any other statement is reported as unsupported rather than silently passed.
+run_collection() sends the requests concurrently over one pooled session, evaluates the checks
+and keeps a latency histogram (utils.load.LatencyHistogram) per request.
+"""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+import requests
+
+from utils.load import LatencyHistogram
+
+PASSED, FAILED, UNSUPPORTED = "passed", "failed", "unsupported"
+
+Check = Callable[["PostmanResponse"], Optional[str]]
+
+
+@dataclass
+class PostmanResponse:
+    """What a test script sees as pm.response."""
+
+    status: int
+    headers: Dict[str, str]
+    text: str
+    elapsed_ms: float
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+@dataclass
+class PostmanTest:
+    """One pm.test block: its name and the checks of its statements, or why it cannot run."""
+
+    name: str
+    checks: List[Tuple[str, Check]] = field(default_factory=list)
+    unsupported: Optional[str] = None
+
+    def evaluate(self, response: PostmanResponse) -> Tuple[str, str]:
+        if self.unsupported:
+            return UNSUPPORTED, self.unsupported
+        for statement, check in self.checks:
+            try:
+                failure = check(response)
+            except (ValueError, LookupError, TypeError) as exc:
+                failure = f"{type(exc).__name__}: {exc}"
+            if failure:
+                # like Postman, the first failing expectation fails the test
+                return FAILED, f"{statement}: {failure}"
+        return PASSED, ""
+
+
+@dataclass
+class PostmanItem:
+    name: str
+    method: str
+    url: str
+    headers: Dict[str, str]
+    body: Optional[str]
+    tests: List[PostmanTest]
+
+
+@dataclass
+class ItemResult:
+    item: PostmanItem
+    iteration: int
+    elapsed_ms: float
+    status: Optional[int]
+    error: Optional[str]
+    outcomes: Dict[str, Tuple[str, str]]
+
+
+@dataclass
+class CollectionRun:
+    name: str
+    duration: float
+    results: List[ItemResult]
+    histograms: Dict[str, LatencyHistogram]
+
+    def outcomes(self, item: str, test: str) -> List[Tuple[int, str, str]]:
+        """Return (iteration, outcome, message) of one pm.test over all iterations."""
+        return [(r.iteration, *r.outcomes[test]) for r in self.results if r.item.name == item and test in r.outcomes]
+
+    def counts(self) -> Dict[str, int]:
+        counts = {PASSED: 0, FAILED: 0, UNSUPPORTED: 0}
+        for r in self.results:
+            for outcome, _ in r.outcomes.values():
+                counts[outcome] += 1
+        return counts
+
+
+_VARIABLE = re.compile(r"{{\s*([^{}]+?)\s*}}")
+
+
+def substitute(text: str, variables: Dict[str, str]) -> str:
+    """Replace {{name}} with its value; unknown variables stay as they are, as in Postman."""
+    return _VARIABLE.sub(lambda m: str(variables.get(m.group(1), m.group(0))), text)
+
+
+def rebase(url: str, base_url: Optional[str]) -> str:
+    """Point url at another scheme://host:port, keeping path and query (base_url None keeps url)."""
+    if not base_url:
+        return url
+    base, target = urlsplit(base_url), urlsplit(url)
+    prefix = base.path.rstrip("/")
+    return urlunsplit((base.scheme, base.netloc, prefix + target.path, target.query, target.fragment))
+
+
+# --- test scripts ------------------------------------------------------------------------------
+
+_TEST_START = re.compile(r"pm\.test\(\s*([\"'])(.*?)\1\s*,\s*(?:function\s*\(\s*\)|\(\s*\)\s*=>)\s*{")
+_JSON_ALIAS = re.compile(r"^(?:var|let|const)\s+(\w+)\s*=\s*pm\.response\.json\(\)$")
+_STATUS = re.compile(r"^pm\.response\.to\.have\.status\((\d+)\)$")
+_OK = re.compile(r"^pm\.response\.to\.be\.ok$")
+_HEADER = re.compile(r"^pm\.response\.to\.have\.header\(\s*([\"'])(.+?)\1\s*\)$")
+_EXPECT = re.compile(r"^pm\.expect\((.+)\)\.to(?:\.be)?\.(eql|equal|eq|below|lessThan|above|greaterThan)\((.+)\)$")
+_ACCESSOR = re.compile(r"\.(\w+)|\[\s*(\d+)\s*\]|\[\s*([\"'])(.*?)\3\s*\]")
+
+
+def _script_blocks(script: str) -> Iterable[Tuple[str, str]]:
+    """Yield (name, body) of the pm.test blocks of a script."""
+    pos = 0
+    while True:
+        m = _TEST_START.search(script, pos)
+        if m is None:
+            return
+        depth, i = 1, m.end()
+        quote = None
+        while i < len(script) and depth:
+            c = script[i]
+            if quote:
+                if c == "\\":
+                    i += 1
+                elif c == quote:
+                    quote = None
+            elif c in "\"'`":
+                quote = c
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                depth -= 1
+            i += 1
+        yield m.group(2), script[m.end():i - 1]
+        pos = i
+
+
+def _statements(body: str) -> Iterable[str]:
+    """Split a block body at semicolons and line breaks outside string literals."""
+    statement, quote, escaped = [], None, False
+    for c in body:
+        if quote:
+            if c == quote and not escaped:
+                quote = None
+            escaped = c == "\\" and not escaped
+        elif c in "\"'`":
+            quote = c
+        elif c in ";\n":
+            yield "".join(statement).strip()
+            statement = []
+            continue
+        statement.append(c)
+    yield "".join(statement).strip()
+
+
+def _literal(text: str) -> Any:
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        text = json.dumps(text[1:-1].replace("\\'", "'"))
+    return json.loads(text)
+
+
+def _json_path(expr: str, aliases: Sequence[str]) -> Optional[List[Any]]:
+    """Parse jsonData[0].USERNAME (or pm.response.json().x) into the keys to walk; None if it is not one."""
+    for root in list(aliases) + ["pm.response.json()"]:
+        if expr == root or expr.startswith(root + ".") or expr.startswith(root + "["):
+            rest, keys = expr[len(root):], []
+            while rest:
+                m = _ACCESSOR.match(rest)
+                if m is None:
+                    return None
+                name, index, _, key = m.groups()
+                keys.append(int(index) if index is not None else key if key is not None else name)
+                rest = rest[m.end():]
+            return keys
+    return None
+
+
+def _walk(data: Any, keys: Sequence[Any]) -> Any:
+    for key in keys:
+        if isinstance(key, str) and key == "length" and isinstance(data, (list, str)):
+            data = len(data)
+        else:
+            data = data[key]
+    return data
+
+
+def _compare(kind: str, expected: Any) -> Callable[[Any], Optional[str]]:
+    if kind in ("eql", "equal", "eq"):
+        return lambda actual: None if actual == expected else f"expected {expected!r}, got {actual!r}"
+    if kind in ("below", "lessThan"):
+        return lambda actual: None if actual < expected else f"expected below {expected!r}, got {actual!r}"
+    return lambda actual: None if actual > expected else f"expected above {expected!r}, got {actual!r}"
+
+
+def _statement_check(statement: str, aliases: List[str]) -> Optional[Check]:
+    m = _STATUS.match(statement)
+    if m:
+        code = int(m.group(1))
+        return lambda r: None if r.status == code else f"expected status {code}, got {r.status}"
+    if _OK.match(statement):
+        return lambda r: None if 200 <= r.status < 300 else f"expected a 2xx status, got {r.status}"
+    m = _HEADER.match(statement)
+    if m:
+        header = m.group(2)
+        return lambda r: None if header.lower() in {k.lower() for k in r.headers} else f"header {header} missing"
+    m = _EXPECT.match(statement)
+    if m is None:
+        return None
+    subject, kind, argument = m.groups()
+    try:
+        compare = _compare(kind, _literal(argument))
+    except ValueError:
+        return None
+    subject = subject.strip()
+    if subject == "pm.response.responseTime":
+        return lambda r: compare(r.elapsed_ms)
+    if subject in ("pm.response.code", "pm.response.status"):
+        return lambda r: compare(r.status)
+    keys = _json_path(subject, aliases)
+    if keys is None:
+        return None
+    return lambda r: compare(_walk(r.json(), keys))
+
+
+def parse_tests(script: str) -> List[PostmanTest]:
+    """Translate the pm.test blocks of a test script."""
+    tests = []
+    for name, body in _script_blocks(script):
+        test = PostmanTest(name)
+        aliases: List[str] = []
+        for statement in _statements(body):
+            if not statement or statement.startswith("//"):
+                continue
+            alias = _JSON_ALIAS.match(statement)
+            if alias:
+                aliases.append(alias.group(1))
+                continue
+            check = _statement_check(statement, aliases)
+            if check is None:
+                test.unsupported = f"unsupported statement: {statement}"
+                break
+            test.checks.append((statement, check))
+        tests.append(test)
+    return tests
+
+
+# --- collections -------------------------------------------------------------------------------
+
+
+def _script(events: Sequence[Dict[str, Any]], listen: str) -> str:
+    lines = []
+    for event in events or ():
+        if event.get("listen") == listen and not event.get("disabled"):
+            exec_ = event.get("script", {}).get("exec", [])
+            lines.extend([exec_] if isinstance(exec_, str) else exec_)
+    return "\n".join(line.rstrip("\r") for line in lines)
+
+
+def _raw_url(url: Any) -> str:
+    return url if isinstance(url, str) else url.get("raw", "")
+
+
+def _body(body: Optional[Dict[str, Any]], variables: Dict[str, str], headers: Dict[str, str]) -> Optional[str]:
+    if not body or body.get("disabled"):
+        return None
+    mode = body.get("mode")
+    if mode == "raw":
+        return substitute(body.get("raw", ""), variables)
+    if mode == "urlencoded":
+        headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        pairs = [(p["key"], substitute(str(p.get("value", "")), variables)) for p in body.get("urlencoded", []) if not p.get("disabled")]
+        return urlencode(pairs)
+    raise ValueError(f"request body mode {mode!r} is not supported")
+
+
+def load_collection(
+    path: str,
+    variables: Optional[Dict[str, str]] = None,
+    base_url: Optional[str] = None,
+) -> Tuple[str, List[PostmanItem]]:
+    """Read a v2.1 collection and return its name and requests in collection order.
+
+    variables override the collection's own; base_url replaces scheme, host and port of every
+    request, e.g. to run the checks against a local stand-in.
+    """
+    with open(path, encoding="utf-8") as f:
+        collection = json.load(f)
+    schema = collection.get("info", {}).get("schema", "")
+    if "v2.1" not in schema and "v2.0" not in schema:
+        raise ValueError(f"{path}: not a Postman collection v2.1 ({schema or 'no schema'})")
+    values = {v["key"]: str(v.get("value", "")) for v in collection.get("variable", []) if not v.get("disabled")}
+    values.update(variables or {})
+
+    items: List[PostmanItem] = []
+
+    def _walk_items(entries: Sequence[Dict[str, Any]], prefix: str, scripts: str) -> None:
+        for entry in entries:
+            name = f"{prefix}{entry.get('name', '')}"
+            script = "\n".join(filter(None, [scripts, _script(entry.get("event"), "test")]))
+            if "item" in entry:
+                # folder scripts run for every request in the folder
+                _walk_items(entry["item"], f"{name} / ", script)
+                continue
+            request = entry["request"]
+            if isinstance(request, str):
+                request = {"method": "GET", "url": request}
+            headers = {
+                h["key"]: substitute(str(h.get("value", "")), values)
+                for h in request.get("header", []) if not h.get("disabled")
+            }
+            items.append(PostmanItem(
+                name=name,
+                method=request.get("method", "GET").upper(),
+                url=rebase(substitute(_raw_url(request.get("url", "")), values), base_url),
+                headers=headers,
+                body=_body(request.get("body"), values, headers),
+                tests=parse_tests(script),
+            ))
+
+    _walk_items(collection.get("item", []), "", _script(collection.get("event"), "test"))
+    return collection.get("info", {}).get("name", path), items
+
+
+def _send(session: requests.Session, item: PostmanItem, iteration: int) -> Tuple[ItemResult, float]:
+    start = time.perf_counter()
+    try:
+        r = session.request(item.method, item.url, headers=item.headers, data=item.body)
+    except requests.RequestException as exc:
+        elapsed = time.perf_counter() - start
+        error = f"{type(exc).__name__}: {exc}"
+        outcomes = {t.name: (FAILED, f"request failed: {error}") for t in item.tests}
+        return ItemResult(item, iteration, elapsed * 1000.0, None, error, outcomes), elapsed
+    timing = getattr(r, "timing", None)
+    # Postman's responseTime runs until the response is complete
+    elapsed = timing.total if timing is not None else time.perf_counter() - start
+    response = PostmanResponse(r.status_code, dict(r.headers), r.text, elapsed * 1000.0)
+    outcomes = {t.name: t.evaluate(response) for t in item.tests}
+    return ItemResult(item, iteration, response.elapsed_ms, r.status_code, None, outcomes), elapsed
+
+
+def run_collection(
+    session: requests.Session,
+    items: Sequence[PostmanItem],
+    name: str = "collection",
+    concurrency: int = 8,
+    iterations: int = 1,
+) -> CollectionRun:
+    """Send every item iterations times, concurrency at a time, and evaluate its tests.
+
+    Requests of a collection run in parallel, so the collection must not rely on the order of its
+    requests (no variables set by one request for the next).
+    """
+    jobs = [(item, i) for i in range(iterations) for item in items]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="postman") as pool:
+        done = list(pool.map(lambda job: _send(session, *job), jobs))
+    histograms: Dict[str, LatencyHistogram] = {}
+    for result, elapsed in done:
+        histograms.setdefault(result.item.name, LatencyHistogram()).record(elapsed)
+    return CollectionRun(name, time.perf_counter() - start, [result for result, _ in done], histograms)
+
+
+def format_histogram(histogram: LatencyHistogram, width: int = 30) -> List[str]:
+    """Return one bar per power-of-two millisecond range that has samples."""
+    bins: Dict[int, int] = {}
+    for index, count in histogram.counts.items():
+        ms = LatencyHistogram._value(index) / 1000.0
+        upper = 1
+        while upper < ms:
+            upper *= 2
+        bins[upper] = bins.get(upper, 0) + count
+    if not bins:
+        return []
+    top = max(bins.values())
+    return [
+        f"{'<=' + str(upper) + 'ms':>10} {'#' * max(1, round(count / top * width)):<{width}} {count}"
+        for upper, count in sorted(bins.items())
+    ]
+
+
+def format_collection_report(run: CollectionRun) -> str:
+    """Return per-request latency percentiles and histograms plus the test outcome counts."""
+    counts = run.counts()
+    lines = [
+        f"{run.name}: {len(run.results)} requests in {run.duration:.2f}s, "
+        f"{counts[PASSED]} passed, {counts[FAILED]} failed, {counts[UNSUPPORTED]} unsupported",
+        f"{'reqs':>7}  {'p50':>8}  {'p95':>8}  {'max':>8}  request (ms)",
+    ]
+    for name, h in run.histograms.items():
+        lines.append(f"{h.count:7d}  {h.percentile(50):8.1f}  {h.percentile(95):8.1f}  {(h.max or 0) / 1000.0:8.1f}  {name}")
+        lines.extend(format_histogram(h))
+    return "\n".join(lines)
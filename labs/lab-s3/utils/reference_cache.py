@@ -0,0 +1,140 @@
+"""
+Read-through cache for reference data (owner, pet and pet type lists) shared by a test session.
+
+Tests and fixtures ask the cache instead of downloading a whole list again. Entries expire after
+a TTL and are dropped automatically when the shared HTTP client sends a POST/PUT/PATCH/DELETE to
+the same collection, so tests that mutate data never read stale lists. With a SharedSessionCache
+the lists are fetched once per test run and shared by all pytest-xdist workers.
+
+Callers that need one record or a small summary of a large list use derive(), which streams the
+list (utils.json_stream) and caches only the summary.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from utils.json_stream import iter_json_items
+from utils.parallel import SharedSessionCache
+
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def _collections(path: str) -> Set[str]:
+    """Return the resource names (non-parameter segments) of a path, e.g. {'owners', 'pets'}."""
+    return {seg for seg in path.strip("/").split("/") if seg and not seg.isdigit() and seg != "api"}
+
+
+def _collection(path: str) -> str:
+    """Return the collection a list URL belongs to: the last resource segment of its path."""
+    names = [seg for seg in path.strip("/").split("/") if seg and not seg.isdigit()]
+    return names[-1] if names else ""
+
+
+def _close(items: Iterator[Any]) -> None:
+    # closing a streaming generator early releases its connection
+    close = getattr(items, "close", None)
+    if close is not None:
+        close()
+
+
+class ReferenceDataCache:
+    """Session-wide read-through cache of JSON GET responses with TTL and write invalidation.
+
+    Register ``cache.on_response`` as a response hook of the client used for mutations (done by
+    the constructor for the client passed in). Cached values are shared: do not mutate them.
+    """
+
+    def __init__(self, client: requests.Session, ttl: float = 300.0, shared: Optional[SharedSessionCache] = None) -> None:
+        self.client = client
+        self.ttl = ttl
+        self.shared = shared
+        self.fetches = 0
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        client.hooks["response"].append(self.on_response)
+
+    def _lock_for(self, url: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(url, threading.Lock())
+
+    def _fresh(self, key: str) -> Optional[Tuple[float, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry
+        return None
+
+    def _cached(self, key: str, load: Callable[[], Any]) -> Any:
+        entry = self._fresh(key)
+        if entry is not None:
+            return entry[1]
+
+        # one fetch per key even when several threads ask at once
+        with self._lock_for(key):
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[1]
+            if self.shared is not None:
+                value = self.shared.get(key, load, ttl=self.ttl)
+            else:
+                value = load()
+            self._entries[key] = (time.monotonic(), value)
+            return value
+
+    def get(self, url: str) -> Any:
+        """Return the parsed JSON body of GET url, fetching it only when missing or expired.
+
+        Raises requests.HTTPError for non-2xx responses (nothing is cached then).
+        """
+        return self._cached(url, lambda: self._fetch(url))
+
+    def iter(self, url: str) -> Iterator[Any]:
+        """Iterate the items of the list at url: from the cache when cached, else streamed (not cached)."""
+        entry = self._fresh(url)
+        if entry is not None:
+            return iter(entry[1])
+        self.fetches += 1
+        return iter_json_items(self.client, url)
+
+    def derive(self, url: str, name: str, summarize: Callable[[Iterator[Any]], Any]) -> Any:
+        """Return summarize(items of url), cached like a list and invalidated with it.
+
+        summarize gets an iterator over the (streamed) list and may stop early; only its JSON
+        result is kept, so a summary of a huge list costs no more memory than the summary.
+        """
+        def _load() -> Any:
+            items = self.iter(url)
+            try:
+                return summarize(items)
+            finally:
+                _close(items)
+
+        return self._cached(f"{url}#{name}", _load)
+
+    def _fetch(self, url: str) -> Any:
+        r = self.client.get(url)
+        r.raise_for_status()
+        self.fetches += 1
+        return r.json()
+
+    def invalidate(self, url: str) -> None:
+        """Drop every cached list (and summary of one) belonging to a collection named in url's path."""
+        names = _collections(urlsplit(url).path)
+        with self._guard:
+            for cached in list(self._entries):
+                if _collection(urlsplit(cached).path) in names:
+                    self._entries.pop(cached, None)
+        if self.shared is not None:
+            self.shared.discard_where(lambda cached: _collection(urlsplit(cached).path) in names)
+
+    def clear(self) -> None:
+        with self._guard:
+            self._entries.clear()
+
+    def on_response(self, response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        if response.request is not None and response.request.method in MUTATING_METHODS:
+            self.invalidate(response.request.url)
+        return response
@@ -0,0 +1,300 @@
+"""
+Local stand-in for the sample-site API of lab-0 (sample-site/api/index.php) over its SQLite database.
+
+It answers the same requests as the PHP API, with the same JSON (every USERS column, a user
+as a one-element list):
+
+    GET    /api/allusers       all users
+    GET    /api/user/{id}      [user], or [] when there is none
+
+and adds the writes the PHP API lacks:
+
+    POST   /api/user           create from {"USERNAME", "PW_HASH", "LEVEL"}  -> 201 [user]
+    PUT    /api/user/{id}      update the given fields                       -> 200 [user]
+    DELETE /api/user/{id}                                                    -> 204
+
+Reads go through a small pool of read-only connections instead of a new connection per request,
+every statement is parameterized (sqlite3 caches the prepared statements per connection), and
+with cache_ttl > 0 GET responses are cached until they expire or the next write. By default the
+stand-in works on a temporary copy of the database, so writes never touch the file in the repo:
+
+    python -m utils.sample_site --db ../lab-0/sample-site/data/Main.db --port 8000 --cache-ttl 5
+"""
+import argparse
+import json
+import os
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+JSON = "application/json"
+MAIN_DB = os.path.normpath(os.path.join(
+    os.path.dirname(__file__), os.pardir, os.pardir, "lab-0", "sample-site", "data", "Main.db"
+))
+
+# column -> (type, required on create, maximum length) as declared in Main.db
+USER_FIELDS: Dict[str, Tuple[type, bool, Optional[int]]] = {
+    "USERNAME": (str, True, 50),
+    "PW_HASH": (str, True, 64),
+    "LEVEL": (int, False, None),
+}
+
+Response = Tuple[int, Dict[str, str], bytes]
+
+
+class SampleSiteApi:
+    """The sample-site API over a USERS table; handle() maps a request to (status, headers, body)."""
+
+    def __init__(self, db_path: str = MAIN_DB, cache_ttl: float = 0.0, pool_size: int = 8, copy: bool = True) -> None:
+        self._tmpdir = None
+        if copy:
+            self._tmpdir = tempfile.mkdtemp(prefix="sample-site-")
+            db_path = shutil.copy(db_path, os.path.join(self._tmpdir, os.path.basename(db_path)))
+        elif not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        self.db_path = db_path
+        self.cache_ttl = cache_ttl
+        self.cache_hits = self.cache_misses = 0
+        self._cache: Dict[str, Tuple[float, bytes]] = {}
+        self._generation = 0
+        self._cache_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = sqlite3.connect(db_path, timeout=10.0, check_same_thread=False)
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        read_uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+        for _ in range(max(1, pool_size)):
+            self._readers.put(sqlite3.connect(read_uri, uri=True, timeout=10.0, check_same_thread=False))
+
+    def close(self) -> None:
+        self._writer.close()
+        while not self._readers.empty():
+            self._readers.get_nowait().close()
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        # blocks while all pooled connections are in use, so the pool caps concurrent reads
+        connection = self._readers.get()
+        try:
+            yield connection
+        finally:
+            self._readers.put(connection)
+
+    @staticmethod
+    def _rows(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def all_users(self) -> List[Dict[str, Any]]:
+        with self._reader() as db:
+            return self._rows(db.execute("SELECT * FROM USERS"))
+
+    def user(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._reader() as db:
+            return self._rows(db.execute("SELECT * FROM USERS WHERE ID = ?", (user_id,)))
+
+    @staticmethod
+    def _json(status: int, body: Any) -> Response:
+        return status, {"Content-Type": JSON}, json.dumps(body).encode("utf-8")
+
+    @classmethod
+    def _error(cls, status: int, message: str) -> Response:
+        return cls._json(status, {"error": message})
+
+    @staticmethod
+    def _fields(data: Any, partial: bool) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return the validated USERS columns of a request body, or None and the reason."""
+        if not isinstance(data, dict):
+            return None, "body must be a JSON object"
+        unknown = set(data) - set(USER_FIELDS)
+        if unknown:
+            return None, f"unknown fields: {', '.join(sorted(unknown))}"
+        fields = {}
+        for name, (kind, required, max_length) in USER_FIELDS.items():
+            if name not in data:
+                if required and not partial:
+                    return None, f"{name} is required"
+                continue
+            value = data[name]
+            if value is None and not required:
+                fields[name] = None
+                continue
+            if not isinstance(value, kind) or isinstance(value, bool) or (kind is str and not value.strip()):
+                return None, f"{name} must be {'a non-empty string' if kind is str else 'an integer'}"
+            if max_length is not None and len(value) > max_length:
+                return None, f"{name} is longer than {max_length} characters"
+            fields[name] = value
+        if not fields:
+            return None, "no fields to update"
+        return fields, ""
+
+    def _write(self, sql: str, params: Tuple[Any, ...]) -> sqlite3.Cursor:
+        with self._write_lock, self._writer:
+            cursor = self._writer.execute(sql, params)
+        with self._cache_lock:
+            self._cache.clear()
+            self._generation += 1
+        return cursor
+
+    def _cached(self, key: str, load: Any) -> Response:
+        if self.cache_ttl <= 0:
+            return self._json(200, load())
+        now = time.monotonic()
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self.cache_hits += 1
+                return 200, {"Content-Type": JSON, "X-Cache": "hit"}, entry[1]
+            self.cache_misses += 1
+            generation = self._generation
+        status, headers, data = self._json(200, load())
+        with self._cache_lock:
+            # a write while loading may have changed the data; do not cache what it replaced
+            if generation == self._generation:
+                self._cache[key] = (now + self.cache_ttl, data)
+        return status, dict(headers, **{"X-Cache": "miss"}), data
+
+    def handle(self, method: str, url: str, body: bytes) -> Response:
+        path = urlsplit(url).path.rstrip("/")
+        action, _, parameter = path.partition("/api/")[2].partition("/")
+        if path.partition("/api/")[1] == "" or action not in ("allusers", "user"):
+            return self._error(404, "Not found")
+        user_id: Optional[int] = None
+        if parameter:
+            try:
+                user_id = int(parameter)
+            except ValueError:
+                # like intval() in the PHP API: a non-numeric id matches no user
+                user_id = 0
+
+        if method == "GET":
+            if action == "allusers":
+                return self._cached(path, self.all_users)
+            if user_id is None:
+                return self._error(404, "Not found")
+            return self._cached(path, lambda: self.user(user_id))
+        if action != "user" or method not in ("POST", "PUT", "DELETE"):
+            return self._error(405, "Method not allowed")
+        if (method == "POST") != (user_id is None):
+            return self._error(405, "Method not allowed")
+
+        if method == "DELETE":
+            cursor = self._write("DELETE FROM USERS WHERE ID = ?", (user_id,))
+            return (204, {}, b"") if cursor.rowcount else self._error(404, f"user {user_id} not found")
+        try:
+            data = json.loads(body or b"null")
+        except ValueError:
+            return self._error(400, "body is not valid JSON")
+        fields, problem = self._fields(data, partial=method == "PUT")
+        if fields is None:
+            return self._error(400, problem)
+        if method == "POST":
+            columns = ", ".join(fields)
+            marks = ", ".join("?" * len(fields))
+            cursor = self._write(f"INSERT INTO USERS ({columns}) VALUES ({marks})", tuple(fields.values()))
+            return self._json(201, self.user(cursor.lastrowid))
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        cursor = self._write(f"UPDATE USERS SET {assignments} WHERE ID = ?", (*fields.values(), user_id))
+        if not cursor.rowcount:
+            return self._error(404, f"user {user_id} not found")
+        return self._json(200, self.user(user_id))
+
+
+class SampleSiteServer:
+    """Serve a SampleSiteApi on a local port; use as a context manager or start()/stop()."""
+
+    def __init__(self, api: SampleSiteApi, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.api = api
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.url = f"http://{host}:{self._httpd.server_address[1]}"
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # see utils.mock_server: avoids ~40ms delayed-ACK stalls on keep-alive connections
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def handle(self) -> None:
+                try:
+                    super().handle()
+                except ConnectionResetError:
+                    pass
+
+            def _serve(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, headers, data = server.api.handle(self.command, self.path, body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    self.close_connection = True
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _serve
+
+        return Handler
+
+    def start(self) -> "SampleSiteServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, name="sample-site", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "SampleSiteServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve the sample-site API from its SQLite database")
+    parser.add_argument("--db", default=MAIN_DB, help="SQLite database with a USERS table")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-ttl", type=float, default=0.0, help="seconds GET responses are cached (0: no cache)")
+    parser.add_argument("--pool-size", type=int, default=8, help="pooled read connections")
+    parser.add_argument("--in-place", action="store_true", help="write to --db itself instead of a temporary copy")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    api = SampleSiteApi(args.db, cache_ttl=args.cache_ttl, pool_size=args.pool_size, copy=not args.in_place)
+    server = SampleSiteServer(api, args.host, args.port)
+    print(f"sample-site API on {server.url}/api (database: {api.db_path})")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+        api.close()
+
+
+if __name__ == "__main__":
+    main()
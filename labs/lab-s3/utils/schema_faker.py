@@ -0,0 +1,113 @@
+"""
+Deterministic example values generated from OpenAPI schemas.
+
+SchemaFaker follows $ref and allOf through the spec and builds an instance of a schema from its
+example, enum, type, format, length limits and pattern. The same (schema, index) always gives the
+same value; a "<collection>.<field>" hint picks realistic petclinic words where a field has them.
+The mock server seeds its store with it, and the spec cases and the fuzzer build request bodies.
+"""
+import copy
+import datetime
+import re
+from typing import Any, Dict, List
+
+from utils.openapi_utils import python_pattern
+
+# deterministic seed values by "<collection>.<field>" or "<field>"; other fields are derived from the schema
+_WORDS: Dict[str, List[str]] = {
+    "pettypes.name": ["cat", "dog", "lizard", "snake", "bird", "hamster"],
+    "firstName": ["George", "Betty", "Eduardo", "Harold", "Peter", "Jean", "Jeff", "Maria"],
+    "lastName": ["Franklin", "Davis", "Rodriquez", "Black", "McTavish", "Coleman", "Escobito", "Schroeder"],
+    "address": ["110 W. Liberty St.", "638 Cardinal Ave.", "2693 Commerce St.", "563 Friendly St."],
+    "city": ["Madison", "Sun Prairie", "McFarland", "Windsor", "Monona"],
+    "telephone": ["6085551023", "6085551749", "6085558763", "6085553198", "6085552765"],
+    "name": ["Leo", "Basil", "Rosy", "Jewel", "Iggy", "George", "Samantha", "Max"],
+    "description": ["rabies shot", "neutered", "spayed", "checkup"],
+}
+_BASE_DATE = datetime.date(2010, 1, 1)
+
+
+def _pattern(pattern: str) -> "re.Pattern[str]":
+    return re.compile(python_pattern(pattern))
+
+
+class SchemaFaker:
+    """Deterministic instances of spec schemas: the same (schema, index) always gives the same value."""
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        self.spec = spec
+
+    def resolve(self, node: Any) -> Any:
+        while isinstance(node, dict) and isinstance(node.get("$ref"), str) and node["$ref"].startswith("#/"):
+            target: Any = self.spec
+            for part in node["$ref"][2:].split("/"):
+                target = target[part.replace("~1", "/").replace("~0", "~")]
+            node = target
+        return node
+
+    def properties(self, schema: Any) -> Dict[str, Any]:
+        """Return the merged properties of an object schema (following $ref and allOf)."""
+        schema = self.resolve(schema)
+        if not isinstance(schema, dict):
+            return {}
+        props: Dict[str, Any] = {}
+        for part in schema.get("allOf") or []:
+            props.update(self.properties(part))
+        props.update(schema.get("properties") or {})
+        return props
+
+    def generate(self, schema: Any, index: int = 0, hint: str = "") -> Any:
+        schema = self.resolve(schema)
+        if not isinstance(schema, dict):
+            return None
+        if "example" in schema:
+            return copy.deepcopy(schema["example"])
+        if "enum" in schema:
+            return schema["enum"][index % len(schema["enum"])]
+        for key in ("oneOf", "anyOf"):
+            if schema.get(key):
+                return self.generate(schema[key][0], index, hint)
+        if "allOf" in schema or schema.get("type") == "object" or "properties" in schema:
+            collection = hint.split(".")[0]
+            return {
+                name: self.generate(prop, index, f"{collection}.{name}")
+                for name, prop in self.properties(schema).items()
+            }
+
+        kind = schema.get("type")
+        if kind == "array":
+            return [self.generate(schema.get("items") or {}, index, hint)]
+        if kind == "integer":
+            low = int(schema.get("minimum", 0))
+            value = max(low, index + 1)
+            return min(value, int(schema["maximum"])) if "maximum" in schema else value
+        if kind == "number":
+            low = float(schema.get("minimum", 0))
+            return max(low, index + 1.5)
+        if kind == "boolean":
+            return index % 2 == 0
+        if kind == "string":
+            return self._string(schema, index, hint)
+        return None
+
+    def _string(self, schema: Dict[str, Any], index: int, hint: str) -> str:
+        fmt = schema.get("format")
+        if fmt == "date":
+            return (_BASE_DATE + datetime.timedelta(days=97 * index)).isoformat()
+        if fmt == "date-time":
+            return datetime.datetime.combine(_BASE_DATE + datetime.timedelta(days=97 * index), datetime.time(9)).isoformat() + "Z"
+        if fmt == "email":
+            return f"user{index}@example.com"
+        if fmt == "uuid":
+            return f"00000000-0000-4000-8000-{index:012d}"
+
+        field = hint.split(".")[-1]
+        words = _WORDS.get(hint) or _WORDS.get(field) or []
+        candidates = [words[(index + i) % len(words)] for i in range(len(words))]
+        candidates += [f"{field or 'value'}{index}", "a" * max(1, int(schema.get("minLength", 1))), "1" * max(1, int(schema.get("minLength", 1)))]
+        low, high = int(schema.get("minLength", 0)), int(schema.get("maxLength", 1 << 16))
+        pattern = _pattern(schema["pattern"]) if schema.get("pattern") else None
+        for value in candidates:
+            if low <= len(value) <= high and (pattern is None or pattern.search(value)):
+                return value
+        return candidates[0][:high] if candidates else ""
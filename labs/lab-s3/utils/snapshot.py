@@ -0,0 +1,249 @@
+"""
+In-memory relational snapshot of the petclinic dataset.
+
+The snapshot reads the owner, pet, pet type and visit lists once (four requests, streamed) and
+keeps compact id-keyed rows of the fields the invariants need. All referential and business
+invariants are then checked over the whole dataset in one pass per collection, instead of one
+GET and a handful of checks per owner. Selectors computed while loading ("owner without pets",
+"owner with most pets") let fixtures pick interesting records without scanning lists again.
+"""
+import datetime
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+REQUIRED_OWNER_FIELDS = ("id", "firstName", "lastName", "address", "city", "telephone")
+
+
+class OwnerRow(NamedTuple):
+    id: int
+    telephone: str
+    pet_ids: Tuple[int, ...]
+
+
+class PetRow(NamedTuple):
+    id: int
+    owner_id: Optional[int]
+    type_id: Optional[int]
+    birth_date: Optional[datetime.date]
+    visit_ids: Tuple[int, ...]
+
+
+class VisitRow(NamedTuple):
+    id: int
+    pet_id: Optional[int]
+    date: Optional[datetime.date]
+
+
+@dataclass(frozen=True)
+class Violation:
+    rule: str
+    entity: str
+    id: Any
+    message: str
+
+    def __str__(self) -> str:
+        return f"[{self.rule}] {self.entity} {self.id}: {self.message}"
+
+
+def _date(value: Any) -> Tuple[Optional[datetime.date], bool]:
+    """Parse an ISO date; returns (date, ok) where ok is False for present but unparseable values."""
+    if not value:
+        return None, True
+    try:
+        return datetime.date.fromisoformat(str(value)[:10]), True
+    except ValueError:
+        return None, False
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class PetclinicSnapshot:
+    """Id-keyed rows of one petclinic dataset plus the violations found while loading it."""
+
+    owners: Dict[int, OwnerRow] = field(default_factory=dict)
+    pets: Dict[int, PetRow] = field(default_factory=dict)
+    pettypes: Dict[int, str] = field(default_factory=dict)
+    visits: Dict[int, VisitRow] = field(default_factory=dict)
+    # collections whose list endpoint was unavailable; pets and visits then come from the owners
+    missing: List[str] = field(default_factory=list)
+    violations: List[Violation] = field(default_factory=list)
+    owner_without_pets: Optional[int] = None
+    owner_with_most_pets: Optional[int] = None
+    pet_with_most_visits: Optional[int] = None
+
+    def _violate(self, rule: str, entity: str, id: Any, message: str) -> None:
+        self.violations.append(Violation(rule, entity, id, message))
+
+    # -- loading ------------------------------------------------------------------------------
+
+    def add_owner(self, raw: Dict[str, Any]) -> None:
+        oid = _int(raw.get("id"))
+        if oid is None:
+            self._violate("owner.id", "owner", raw.get("id"), "missing or non-integer id")
+            return
+        if oid in self.owners:
+            self._violate("owner.unique", "owner", oid, "listed twice")
+        for name in REQUIRED_OWNER_FIELDS:
+            if name not in raw:
+                self._violate("owner.required", "owner", oid, f"missing {name}")
+        tel = str(raw.get("telephone") or "")
+        if tel and not tel.isdigit():
+            self._violate("owner.telephone", "owner", oid, f"telephone not digits-only: {tel}")
+
+        pet_ids: List[int] = []
+        for pet in raw.get("pets") or []:
+            pid = _int(pet.get("id"))
+            if pid is None:
+                self._violate("pet.id", "owner", oid, "embedded pet without id")
+                continue
+            if pid in pet_ids:
+                self._violate("owner.pets.unique", "owner", oid, f"pet {pid} listed twice")
+            pet_ids.append(pid)
+            embedded_owner = _int(pet.get("ownerId"))
+            if embedded_owner is not None and embedded_owner != oid:
+                self._violate("pet.owner", "pet", pid, f"embedded under owner {oid} but ownerId is {embedded_owner}")
+            if "pets" in self.missing or pid not in self.pets:
+                # without a pets list the embedded pets are the only source
+                self.add_pet(dict(pet, ownerId=pet.get("ownerId", oid)), embedded=True)
+        self.owners[oid] = OwnerRow(oid, tel, tuple(pet_ids))
+
+    def add_pet(self, raw: Dict[str, Any], embedded: bool = False) -> None:
+        pid = _int(raw.get("id"))
+        if pid is None:
+            self._violate("pet.id", "pet", raw.get("id"), "missing or non-integer id")
+            return
+        if pid in self.pets and not embedded:
+            self._violate("pet.unique", "pet", pid, "listed twice")
+        birth, ok = _date(raw.get("birthDate"))
+        if not ok:
+            self._violate("pet.birthDate", "pet", pid, f"unparseable birthDate {raw.get('birthDate')!r}")
+        ptype = raw.get("type") or raw.get("petType") or {}
+        visit_ids = []
+        for visit in raw.get("visits") or []:
+            vid = _int(visit.get("id"))
+            if vid is None:
+                self._violate("visit.id", "pet", pid, "embedded visit without id")
+                continue
+            visit_ids.append(vid)
+            embedded_pet = _int(visit.get("petId"))
+            if embedded_pet is not None and embedded_pet != pid:
+                self._violate("visit.pet", "visit", vid, f"embedded under pet {pid} but petId is {embedded_pet}")
+            if "visits" in self.missing or vid not in self.visits:
+                self.add_visit(dict(visit, petId=visit.get("petId", pid)), embedded=True)
+        self.pets[pid] = PetRow(pid, _int(raw.get("ownerId")), _int(ptype.get("id")), birth, tuple(visit_ids))
+
+    def add_pettype(self, raw: Dict[str, Any]) -> None:
+        tid = _int(raw.get("id"))
+        if tid is None:
+            self._violate("pettype.id", "pettype", raw.get("id"), "missing or non-integer id")
+            return
+        self.pettypes[tid] = str(raw.get("name") or "")
+
+    def add_visit(self, raw: Dict[str, Any], embedded: bool = False) -> None:
+        vid = _int(raw.get("id"))
+        if vid is None:
+            self._violate("visit.id", "visit", raw.get("id"), "missing or non-integer id")
+            return
+        if vid in self.visits and not embedded:
+            self._violate("visit.unique", "visit", vid, "listed twice")
+        when, ok = _date(raw.get("date"))
+        if not ok:
+            self._violate("visit.date", "visit", vid, f"unparseable date {raw.get('date')!r}")
+        self.visits[vid] = VisitRow(vid, _int(raw.get("petId")), when)
+
+    # -- invariants ---------------------------------------------------------------------------
+
+    def check(self, today: Optional[datetime.date] = None) -> List[Violation]:
+        """Run the referential and business invariants over the whole dataset; returns all violations."""
+        today = today or datetime.date.today()
+        pets_per_owner: Counter = Counter()
+
+        for pid, pet in self.pets.items():
+            if pet.owner_id is not None:
+                if pet.owner_id not in self.owners:
+                    self._violate("pet.owner", "pet", pid, f"references unknown owner {pet.owner_id}")
+                else:
+                    pets_per_owner[pet.owner_id] += 1
+            if pet.type_id is None:
+                self._violate("pet.type", "pet", pid, "has no type")
+            elif pet.type_id not in self.pettypes:
+                self._violate("pet.type", "pet", pid, f"references unknown pet type {pet.type_id}")
+            if pet.birth_date and pet.birth_date > today:
+                self._violate("pet.birthDate", "pet", pid, f"birthDate {pet.birth_date} is in the future")
+
+        for oid, owner in self.owners.items():
+            listed = set(owner.pet_ids)
+            for pid in listed:
+                if pid not in self.pets:
+                    self._violate("owner.pets", "owner", oid, f"embeds pet {pid} that the pets list lacks")
+            # every pet pointing at the owner is embedded in it
+            if "pets" not in self.missing and pets_per_owner[oid] != len(listed):
+                self._violate("owner.pets", "owner", oid, f"embeds {len(listed)} pets, {pets_per_owner[oid]} pets reference it")
+
+        for vid, visit in self.visits.items():
+            if visit.pet_id is None:
+                continue
+            pet = self.pets.get(visit.pet_id)
+            if pet is None:
+                self._violate("visit.pet", "visit", vid, f"references unknown pet {visit.pet_id}")
+            elif visit.date and pet.birth_date and visit.date < pet.birth_date:
+                self._violate("visit.date", "visit", vid, f"date {visit.date} before pet {pet.id} was born ({pet.birth_date})")
+
+        self._select()
+        return self.violations
+
+    def _select(self) -> None:
+        most = max(self.owners.values(), key=lambda o: (len(o.pet_ids), -o.id), default=None)
+        self.owner_with_most_pets = most.id if most is not None and most.pet_ids else None
+        self.owner_without_pets = next((oid for oid in sorted(self.owners) if not self.owners[oid].pet_ids), None)
+        busiest = max(self.pets.values(), key=lambda p: (len(p.visit_ids), -p.id), default=None)
+        self.pet_with_most_visits = busiest.id if busiest is not None and busiest.visit_ids else None
+
+    def summary(self, examples: int = 5) -> str:
+        counts = Counter(v.rule for v in self.violations)
+        lines = [
+            f"{len(self.owners)} owners, {len(self.pets)} pets, {len(self.pettypes)} pet types, "
+            f"{len(self.visits)} visits: {len(self.violations)} violations"
+        ]
+        for rule, count in counts.most_common():
+            lines.append(f"  {rule}: {count}x")
+            lines.extend(f"    {v}" for v in [v for v in self.violations if v.rule == rule][:examples])
+        return "\n".join(lines)
+
+
+def build_snapshot(iter_items: Callable[[str], Iterable[Dict[str, Any]]], base_url: str) -> PetclinicSnapshot:
+    """Load a snapshot from the four list endpoints and check it.
+
+    iter_items(url) yields the items of a list endpoint (e.g. ReferenceDataCache.iter, which
+    streams); list endpoints answering with an HTTP error are recorded in snapshot.missing.
+    """
+    snapshot = PetclinicSnapshot()
+    sources: List[Tuple[str, Callable[[Dict[str, Any]], None]]] = [
+        ("pettypes", snapshot.add_pettype),
+        ("visits", snapshot.add_visit),
+        ("pets", snapshot.add_pet),
+        ("owners", snapshot.add_owner),
+    ]
+    for name, add in sources:
+        items: Optional[Iterator[Dict[str, Any]]] = None
+        try:
+            items = iter(iter_items(f"{base_url}/api/{name}"))
+            for raw in items:
+                add(raw)
+        except requests.HTTPError:
+            snapshot.missing.append(name)
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+    snapshot.check()
+    return snapshot
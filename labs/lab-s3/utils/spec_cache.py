@@ -0,0 +1,136 @@
+"""
+Disk cache for OpenAPI specs keyed by URL.
+
+The cached copy is revalidated with ETag / Last-Modified so an unchanged spec costs one 304
+response, and the parsed document is pickled per spec version so JSON parsing also happens only
+once per version. Parallel test workers share a single fetch through a file lock, and when the
+host is unreachable the cached copy is used with a warning instead of failing the whole run.
+"""
+import hashlib
+import json
+import os
+import pickle
+import time
+import warnings
+from typing import Any, Dict, Optional
+
+import requests
+from filelock import FileLock
+
+
+class SpecCache:
+    """Fetch OpenAPI specs through an on-disk cache.
+
+    cache_dir: directory holding the cached specs (one set of files per URL)
+    client: requests.Session (or ApiClient) used for downloads
+    max_age: seconds a cached copy is trusted without revalidation, so workers that start
+             together reuse the copy the first one fetched
+    """
+
+    def __init__(self, cache_dir: str, client: requests.Session, max_age: float = 60.0, lock_timeout: float = 120.0) -> None:
+        self.cache_dir = cache_dir
+        self.client = client
+        self.max_age = max_age
+        self.lock_timeout = lock_timeout
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{key}{suffix}")
+
+    def _read_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url, ".meta.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path: str, data: bytes) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def _load_cached(self, url: str, meta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached spec, or None when neither the pickle nor the JSON copy can be read."""
+        pickled = self._path(url, f".{meta['sha256'][:16]}.pickle")
+        try:
+            with open(pickled, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+        try:
+            with open(self._path(url, ".json"), "rb") as f:
+                spec = json.loads(f.read())
+        except (OSError, ValueError):
+            # metadata without a usable copy (partial cleanup, pruned cache): a cache miss
+            return None
+        self._write(pickled, pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL))
+        return spec
+
+    def _store(self, url: str, response: requests.Response) -> Dict[str, Any]:
+        body = response.content
+        spec = json.loads(body)
+        digest = hashlib.sha256(body).hexdigest()
+        meta = self._read_meta(url)
+        if meta and meta.get("sha256") != digest:
+            # drop the parsed copy of the previous version
+            try:
+                os.remove(self._path(url, f".{meta['sha256'][:16]}.pickle"))
+            except OSError:
+                pass
+
+        self._write(self._path(url, ".json"), body)
+        self._write(self._path(url, f".{digest[:16]}.pickle"), pickle.dumps(spec, protocol=pickle.HIGHEST_PROTOCOL))
+        meta = {
+            "url": url,
+            "sha256": digest,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self._write(self._path(url, ".meta.json"), json.dumps(meta, indent=2).encode("utf-8"))
+        return spec
+
+    def _touch(self, url: str, meta: Dict[str, Any]) -> None:
+        meta = dict(meta, fetched_at=time.time())
+        self._write(self._path(url, ".meta.json"), json.dumps(meta, indent=2).encode("utf-8"))
+
+    def cached_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata (sha256, etag, fetched_at, ...) of the cached copy without any network call."""
+        meta = self._read_meta(url)
+        if meta and os.path.exists(self._path(url, ".json")):
+            return meta
+        return None
+
+    def load(self, url: str) -> Dict[str, Any]:
+        """Return the parsed spec for url, downloading it only when it changed."""
+        with FileLock(self._path(url, ".lock"), timeout=self.lock_timeout):
+            meta = self._read_meta(url)
+            cached = self._load_cached(url, meta) if meta else None
+            if cached is None:
+                # nothing usable on disk: fetch unconditionally
+                meta = None
+            elif time.time() - meta.get("fetched_at", 0) < self.max_age:
+                return cached
+
+            headers = {}
+            if meta:
+                if meta.get("etag"):
+                    headers["If-None-Match"] = meta["etag"]
+                if meta.get("last_modified"):
+                    headers["If-Modified-Since"] = meta["last_modified"]
+
+            try:
+                r = self.client.get(url, headers=headers)
+                if r.status_code == 304 and meta:
+                    self._touch(url, meta)
+                    return cached
+                r.raise_for_status()
+                return self._store(url, r)
+            except (requests.RequestException, ValueError) as exc:
+                if not meta:
+                    raise
+                warnings.warn(f"Could not revalidate OpenAPI spec {url} ({exc}); using cached copy", RuntimeWarning)
+                return cached
+
@@ -0,0 +1,317 @@
+"""
+Structural diff of two OpenAPI specs by operation, and selection of the tests a diff affects.
+
+Every operation is compared with its $refs resolved, so a change to a shared schema (say the
+telephone pattern of Owner) shows up in every operation that uses it. A change outside the
+operations, for example to servers or info, changes no test.
+
+TestOperationMap remembers which operations each test called in earlier runs. It is recorded
+from the requests of the session's API client and stored as JSON under a file lock, so
+pytest-xdist workers can add to it. select_tests() keeps the tests that call a changed or
+removed operation, the smoke tests, and the tests not mapped yet. SpecDiffPlugin does this at
+collection time with --spec-diff, against the spec of the last green run.
+
+Requests made in a session-scoped fixture are credited to the first test using it; the smoke
+set is there to cover the basic lists that such fixtures read.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import pytest
+from filelock import FileLock
+
+from utils.operation_index import OperationIndex, get_operation_index
+
+
+def resolve_refs(node: Any, spec: Dict[str, Any], _stack: Tuple[str, ...] = ()) -> Any:
+    """Return node with every local $ref inlined; a recursive reference is kept as {"$ref": ...}."""
+    if isinstance(node, list):
+        return [resolve_refs(item, spec, _stack) for item in node]
+    if not isinstance(node, dict):
+        return node
+    ref = node.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/"):
+        if ref in _stack:
+            return {"$ref": ref}
+        target: Any = spec
+        try:
+            for part in ref[2:].split("/"):
+                target = target[part.replace("~1", "/").replace("~0", "~")]
+        except (KeyError, IndexError, TypeError):
+            return {"$ref": ref, "unresolved": True}
+        siblings = {k: v for k, v in node.items() if k != "$ref"}
+        resolved = resolve_refs(target, spec, _stack + (ref,))
+        return dict(resolved, **resolve_refs(siblings, spec, _stack)) if siblings and isinstance(resolved, dict) else resolved
+    return {key: resolve_refs(value, spec, _stack) for key, value in node.items()}
+
+
+def resolved_operations(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Map "METHOD /path" to the operation definition with path-level parameters merged and $refs resolved."""
+    index = get_operation_index(spec)
+    operations = {}
+    for op in index:
+        shared = (spec.get("paths") or {}).get(op.path, {}).get("parameters") or []
+        definition = dict(op.definition)
+        if shared:
+            definition["parameters"] = list(shared) + list(definition.get("parameters") or [])
+        operations[str(op)] = resolve_refs(definition, spec)
+    return operations
+
+
+def fingerprint(definition: Any) -> str:
+    canonical = json.dumps(definition, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def _pointer(parts: Iterable[Any]) -> str:
+    return "/" + "/".join(str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+
+def structural_diff(old: Any, new: Any, limit: int = 20, _path: Tuple[Any, ...] = (), _out: Optional[List[str]] = None) -> List[str]:
+    """JSON pointers (with the kind of change) where new differs from old, at most limit of them."""
+    out = [] if _out is None else _out
+    if len(out) >= limit:
+        return out
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in sorted(set(old) | set(new), key=str):
+            if key not in old:
+                out.append(f"added {_pointer(_path + (key,))}")
+            elif key not in new:
+                out.append(f"removed {_pointer(_path + (key,))}")
+            elif old[key] != new[key]:
+                structural_diff(old[key], new[key], limit, _path + (key,), out)
+            if len(out) >= limit:
+                break
+    elif isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        for i, (a, b) in enumerate(zip(old, new)):
+            if a != b:
+                structural_diff(a, b, limit, _path + (i,), out)
+    elif old != new:
+        out.append(f"changed {_pointer(_path)}: {json.dumps(old)[:60]} -> {json.dumps(new)[:60]}")
+    return out[:limit]
+
+
+@dataclass
+class SpecDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def affected(self) -> Set[str]:
+        """Operations whose tests should run: changed and removed ones (added ones have no tests yet)."""
+        return set(self.changed) | set(self.removed)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self, details: int = 3) -> str:
+        lines = [f"{len(self.changed)} changed, {len(self.added)} added, {len(self.removed)} removed operations"]
+        lines += [f"  added   {op}" for op in self.added]
+        lines += [f"  removed {op}" for op in self.removed]
+        for op, changes in sorted(self.changed.items()):
+            lines.append(f"  changed {op}")
+            lines += [f"      {c}" for c in changes[:details]]
+            if len(changes) > details:
+                lines.append(f"      ... {len(changes) - details} more")
+        return "\n".join(lines)
+
+
+def diff_specs(old: Dict[str, Any], new: Dict[str, Any]) -> SpecDiff:
+    before, after = resolved_operations(old), resolved_operations(new)
+    diff = SpecDiff(added=sorted(set(after) - set(before)), removed=sorted(set(before) - set(after)))
+    for op in sorted(set(before) & set(after)):
+        if fingerprint(before[op]) != fingerprint(after[op]):
+            diff.changed[op] = structural_diff(before[op], after[op])
+    return diff
+
+
+class TestOperationMap:
+    """Operations called by each test ({nodeid: ["GET /api/owners", ...]}) in a JSON file."""
+
+    __test__ = False  # not a test class, despite the name
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def load(self) -> Dict[str, List[str]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def update(self, calls: Dict[str, Set[str]]) -> None:
+        """Replace the entries of the tests in calls (tests that ran); the others are kept."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with FileLock(self.path + ".lock", timeout=60):
+            mapping = self.load()
+            mapping.update({nodeid: sorted(ops) for nodeid, ops in calls.items()})
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(mapping, f, indent=0, sort_keys=True)
+            os.replace(tmp, self.path)
+
+
+def operations_called(index: OperationIndex, requests: Iterable[Tuple[str, str]]) -> Set[str]:
+    ops = set()
+    for method, url in requests:
+        match = index.match(method, url)
+        if match is not None:
+            ops.add(str(match.operation))
+    return ops
+
+
+def select_tests(nodeids: Iterable[str], diff: SpecDiff, mapping: Dict[str, List[str]], smoke: Set[str]) -> Tuple[List[str], Dict[str, str]]:
+    """Return (selected node ids, reason per selected id)."""
+    affected = diff.affected
+    selected, reasons = [], {}
+    for nodeid in nodeids:
+        if nodeid in smoke:
+            reason = "smoke"
+        elif nodeid not in mapping:
+            reason = "not mapped yet"
+        else:
+            hit = affected.intersection(mapping[nodeid])
+            reason = f"calls {', '.join(sorted(hit))}" if hit else ""
+        if reason:
+            selected.append(nodeid)
+            reasons[nodeid] = reason
+    return selected, reasons
+
+
+class SpecDiffPlugin:
+    """Records the operations each test calls and, with select=True, deselects unaffected tests.
+
+    The spec of the last green run is the baseline. It is replaced at the end of a run that
+    passed and that ran every test the diff affected, so an unfinished or narrowed run never
+    hides a change from the next run. Both live in the pytest cache; without it (-p
+    no:cacheprovider) the plugin records nothing and selects every test.
+    """
+
+    HOST_UNAVAILABLE = "API host unavailable"
+
+    def __init__(self, config: "pytest.Config", target: str, load_spec: Callable[[], Optional[Dict[str, Any]]], select: bool, runs_tests: bool = True) -> None:
+        self.config = config
+        self.load_spec = load_spec
+        self.select = select
+        self.runs_tests = runs_tests
+        cache = getattr(config, "cache", None)
+        self.enabled = cache is not None
+        self.baseline_path: Optional[str] = None
+        self.test_map: Optional[TestOperationMap] = None
+        if cache is not None:
+            root = str(cache.mkdir("spec-diff"))
+            self.baseline_path = os.path.join(root, hashlib.sha256(target.encode("utf-8")).hexdigest()[:16] + "-last-green-spec.json")
+            self.test_map = TestOperationMap(os.path.join(root, "test-operations.json"))
+        self.current_test: Optional[str] = None
+        self.requests: Dict[str, List[Tuple[str, str]]] = {}
+        self.outcomes: Dict[str, str] = {}
+        self.host_unavailable = False
+        self.note: Optional[str] = None
+        self.reasons: Dict[str, str] = {}
+        self._loaded = False
+        self._spec: Optional[Dict[str, Any]] = None
+        self._diff: Optional[SpecDiff] = None
+
+    def _load(self) -> None:
+        if self._loaded or not self.enabled:
+            return
+        self._loaded = True
+        self._spec = self.load_spec()
+        try:
+            with open(self.baseline_path, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, ValueError):
+            baseline = None
+        if self._spec is not None and baseline is not None:
+            self._diff = diff_specs(baseline, self._spec)
+
+    @property
+    def diff(self) -> Optional[SpecDiff]:
+        """Diff of the current spec against the last green run's (None when either is missing)."""
+        self._load()
+        return self._diff
+
+    def record_response(self, response: Any, *args: Any, **kwargs: Any) -> None:
+        """requests response hook crediting the request to the running test."""
+        if self.current_test is not None:
+            self.requests.setdefault(self.current_test, []).append((response.request.method, response.request.url))
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config: "pytest.Config", items: List["pytest.Item"]) -> None:
+        if not self.select:
+            return
+        if not self.enabled:
+            self.note = "no pytest cache (-p no:cacheprovider) to keep a previous spec in: running every test"
+            return
+        diff = self.diff
+        if diff is None:
+            self.note = "no spec of a previous green run to compare with: running every test"
+            return
+        smoke = {item.nodeid for item in items if item.get_closest_marker("smoke")}
+        selected, self.reasons = select_tests([item.nodeid for item in items], diff, self.test_map.load(), smoke)
+        keep = set(selected)
+        deselected = [item for item in items if item.nodeid not in keep]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if item.nodeid in keep]
+        self.note = f"{len(items)} of {len(items) + len(deselected)} tests selected"
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: "pytest.Item", nextitem: Optional["pytest.Item"]) -> Any:
+        self.current_test = item.nodeid
+        yield
+        self.current_test = None
+
+    def pytest_runtest_logreport(self, report: "pytest.TestReport") -> None:
+        # on the xdist controller this sees the reports of every worker
+        if report.when == "call" or (report.outcome != "passed" and report.nodeid not in self.outcomes):
+            self.outcomes[report.nodeid] = report.outcome
+        if report.skipped and self.HOST_UNAVAILABLE in str(report.longrepr):
+            self.host_unavailable = True
+
+    def pytest_sessionfinish(self, session: "pytest.Session") -> None:
+        if not self.enabled:
+            return
+        if self.runs_tests and self.outcomes:
+            self._load()
+            spec = self._spec
+            if spec is not None:
+                index = get_operation_index(spec)
+                # skipped tests may not have reached their calls: keep what earlier runs recorded
+                ran = {n: operations_called(index, self.requests.get(n, [])) for n, o in self.outcomes.items() if o != "skipped"}
+                if ran:
+                    self.test_map.update(ran)
+        if hasattr(session.config, "workerinput"):
+            return
+        if session.exitstatus != pytest.ExitCode.OK or self.host_unavailable:
+            return
+        self._load()
+        if self._spec is None:
+            return
+        if self._diff:
+            mapping = self.test_map.load()
+            affected = {n for n, ops in mapping.items() if self._diff.affected.intersection(ops)}
+            if not affected <= set(self.outcomes):
+                return
+        tmp = f"{self.baseline_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._spec, f)
+        os.replace(tmp, self.baseline_path)
+
+    def pytest_terminal_summary(self, terminalreporter: Any) -> None:
+        diff = self.diff if self.select else self._diff
+        if not self.select and not diff:
+            return
+        terminalreporter.write_sep("-", "spec diff against the last green run")
+        if diff is not None:
+            terminalreporter.write_line(diff.summary())
+        if self.note:
+            terminalreporter.write_line(self.note)
+        if self.config.getoption("verbose") > 0:
+            for nodeid, reason in self.reasons.items():
+                terminalreporter.write_line(f"  {nodeid}: {reason}")
@@ -0,0 +1,131 @@
+"""
+pytest plugin generating one test case per OpenAPI operation and documented status code.
+
+Any test that takes a ``spec_case`` argument is parametrized with a SpecCase for every
+(path, method, status) the cached spec documents. The case list is stored in the pytest cache
+under the spec's sha256, so collection reads one small cache entry instead of parsing the spec
+again until the spec changes.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import pytest
+
+from utils.schema_faker import SchemaFaker
+from utils.operation_index import Operation, get_operation_index
+from utils.spec_cache import SpecCache
+
+READ_METHODS = ("get", "head")
+
+
+@dataclass(frozen=True)
+class SpecCase:
+    path: str
+    method: str
+    status: int
+
+    @property
+    def id(self) -> str:
+        return f"{self.method.upper()} {self.path} -> {self.status}"
+
+
+def spec_cases(spec: Dict[str, Any]) -> List[SpecCase]:
+    """Return a SpecCase for every operation and every numeric status code it documents."""
+    cases = []
+    for op in get_operation_index(spec):
+        for status in op.responses:
+            if str(status).isdigit():
+                cases.append(SpecCase(op.path, op.method, int(status)))
+    return cases
+
+
+def discover_path_params(
+    owner: Optional[Dict[str, Any]], pet: Optional[Dict[str, Any]], path_params: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """Map path parameter names to ids of existing data discovered by the created_* fixtures.
+
+    The discovered pet need not belong to the discovered owner, so a path that also takes petId
+    (/api/owners/{ownerId}/pets/{petId}) gets the pet's owner instead of the owner fixture's id.
+    """
+    params: Dict[str, Any] = {}
+    if owner:
+        params["ownerId"] = owner.get("id")
+    if pet:
+        body = pet.get("body") or {}
+        params["petId"] = pet.get("id")
+        if pet.get("owner_id") is not None and ("petId" in path_params or "ownerId" not in params):
+            params["ownerId"] = pet["owner_id"]
+        pet_type = body.get("type") or body.get("petType") or {}
+        params["petTypeId"] = pet_type.get("id")
+        visits = body.get("visits") or []
+        if visits:
+            params["visitId"] = visits[0].get("id")
+    return {k: v for k, v in params.items() if v is not None}
+
+
+def request_body_schema(spec: Dict[str, Any], op: Operation) -> Optional[Dict[str, Any]]:
+    """Return the JSON request body schema of an operation, or None when it takes no body."""
+    faker = SchemaFaker(spec)
+    content = (faker.resolve(op.definition.get("requestBody") or {}).get("content")) or {}
+    for media in ("application/json", *content):
+        if media in content and content[media].get("schema"):
+            return content[media]["schema"]
+    return None
+
+
+def fake_request_body(spec: Dict[str, Any], op: Operation, index: int = 0) -> Optional[Any]:
+    """Return a valid request body for op generated from its schema (None when it takes no body)."""
+    schema = request_body_schema(spec, op)
+    if schema is None:
+        return None
+    collections = [seg for seg in op.path.strip("/").split("/") if seg and not seg.startswith("{")]
+    return SchemaFaker(spec).generate(schema, index, collections[-1] if collections else "")
+
+
+class SpecTestsPlugin:
+    """Parametrizes ``spec_case`` tests from the cached spec.
+
+    spec_cache_factory builds the SpecCache lazily, so a run that selects no spec tests never
+    touches the spec. When nothing is cached yet the spec is fetched once at collection time.
+    """
+
+    CACHE_KEY = "spec-tests/cases"
+
+    def __init__(self, config: "pytest.Config", spec_url: str, spec_cache_factory: Callable[[], SpecCache]) -> None:
+        self.config = config
+        self.spec_url = spec_url
+        self.spec_cache_factory = spec_cache_factory
+        self._cases: Optional[List[SpecCase]] = None
+
+    def _load_cases(self) -> List[SpecCase]:
+        cache = self.spec_cache_factory()
+        # without the pytest cache (-p no:cacheprovider) the cases are derived from the spec every run
+        store = getattr(self.config, "cache", None)
+        meta = cache.cached_meta(self.spec_url) if store is not None else None
+        if meta:
+            stored = store.get(f"{self.CACHE_KEY}/{meta['sha256'][:16]}", None)
+            if stored is not None:
+                return [SpecCase(*c) for c in stored]
+
+        try:
+            spec = cache.load(self.spec_url)
+        except Exception:
+            # no spec available: the generated test collects as a single skipped empty parameter set
+            return []
+        meta = cache.cached_meta(self.spec_url) if store is not None else None
+        cases = spec_cases(spec)
+        if meta:
+            store.set(f"{self.CACHE_KEY}/{meta['sha256'][:16]}", [[c.path, c.method, c.status] for c in cases])
+        return cases
+
+    def pytest_generate_tests(self, metafunc: "pytest.Metafunc") -> None:
+        if "spec_case" not in metafunc.fixturenames:
+            return
+        if self._cases is None:
+            self._cases = self._load_cases()
+        # write cases mutate shared collections: keep them on one pytest-xdist worker
+        params = [
+            pytest.param(c, marks=pytest.mark.xdist_group("spec-writes")) if c.method not in READ_METHODS else c
+            for c in self._cases
+        ]
+        metafunc.parametrize("spec_case", params, ids=[c.id for c in self._cases])
@@ -0,0 +1,105 @@
+"""
+Concurrent endpoint sweep over operations discovered from an OpenAPI spec.
+
+Operations are selected from the OperationIndex (by method, tag or any predicate), their path
+templates are filled from known parameter values, and the resulting calls run on a bounded thread
+pool sharing the pooled ApiClient. Every call records its latency and, through a check function,
+an optional failure message, so a sweep costs roughly the slowest call instead of the sum of all.
+"""
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from utils.operation_index import Operation
+
+_PLACEHOLDER = re.compile(r"{([^}]+)}")
+
+Check = Callable[[requests.Response], Optional[str]]
+
+
+@dataclass
+class SweepCall:
+    operation: Operation
+    url: str
+
+
+@dataclass
+class SweepResult:
+    call: SweepCall
+    status: Optional[int]
+    elapsed: float
+    failure: Optional[str] = None
+
+
+def fill_path(path: str, params: Dict[str, Any]) -> Optional[str]:
+    """Substitute {name} placeholders from params; None when any value is missing."""
+    missing = False
+
+    def _sub(m: "re.Match[str]") -> str:
+        nonlocal missing
+        value = params.get(m.group(1))
+        if value is None:
+            missing = True
+            return m.group(0)
+        return str(value)
+
+    filled = _PLACEHOLDER.sub(_sub, path)
+    return None if missing else filled
+
+
+def build_calls(operations: List[Operation], base_url: str, params: Dict[str, Any]) -> Tuple[List[SweepCall], List[Operation]]:
+    """Return the callable operations as SweepCalls plus the operations skipped for missing parameters."""
+    calls, skipped = [], []
+    for op in operations:
+        path = fill_path(op.path, params)
+        if path is None:
+            skipped.append(op)
+        else:
+            calls.append(SweepCall(op, f"{base_url}{path}"))
+    return calls, skipped
+
+
+def default_check(response: requests.Response) -> Optional[str]:
+    """Accept 200 with parseable JSON (for JSON content types) and the success-like 201/204/304."""
+    if response.status_code == 200:
+        ct = response.headers.get("Content-Type", "")
+        if "application/json" in ct or ct.startswith("application/"):
+            try:
+                response.json()
+            except ValueError as exc:
+                return f"invalid-json: {exc}"
+        return None
+    if response.status_code in (204, 201, 304):
+        return None
+    return f"unexpected-status: {response.status_code}"
+
+
+def sweep(client: requests.Session, calls: List[SweepCall], max_workers: int = 8, check: Check = default_check) -> List[SweepResult]:
+    """Run the calls concurrently (at most max_workers in flight) and return results in call order."""
+
+    def _run(call: SweepCall) -> SweepResult:
+        start = time.perf_counter()
+        try:
+            r = client.request(call.operation.method.upper(), call.url)
+        except requests.RequestException as exc:
+            return SweepResult(call, None, time.perf_counter() - start, f"request-failed: {exc}")
+        elapsed = time.perf_counter() - start
+        return SweepResult(call, r.status_code, elapsed, check(r))
+
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls))), thread_name_prefix="sweep") as pool:
+        return list(pool.map(_run, calls))
+
+
+def format_latency_report(results: List[SweepResult]) -> str:
+    """Return a fixed-width table of status and latency per call, slowest first."""
+    lines = [f"{'ms':>8}  {'status':>6}  call"]
+    for res in sorted(results, key=lambda r: -r.elapsed):
+        status = res.status if res.status is not None else "-"
+        lines.append(f"{res.elapsed * 1000:8.1f}  {status:>6}  {res.call.operation.method.upper()} {res.call.url}")
+    return "\n".join(lines)